@@ -0,0 +1,81 @@
+"""Benchmark: rendering a ``CREATE TABLE`` statement with 1000 columns
+
+Compares :py:class:`ralsei.jinja.SqlAdapter` with its type-dispatch cache
+against the previous implementation, which walked the MRO of every rendered value
+
+Usage: ``python benchmarks/render_create_table.py [--columns N] [--number N]``
+"""
+
+import argparse
+import inspect
+import timeit
+from typing import Any
+
+from ralsei.jinja import SqlAdapter, SqlEnvironment
+from ralsei.types import Table, ValueColumnRendered
+
+CREATE_TABLE = """\
+CREATE TABLE {{table}}(
+    {{columns | join(',\\n    ', attribute='definition')}}
+);
+INSERT INTO {{table}}(
+    {{columns | join(',\\n    ', attribute='identifier')}}
+)
+VALUES (
+    {{columns | join(',\\n    ', attribute='value')}}
+);"""
+
+
+class LegacySqlAdapter(SqlAdapter):
+    def to_sql(self, value: Any) -> str:
+        for parent_class in inspect.getmro(type(value)):
+            if parent_class in self._mapping:
+                return self._mapping[parent_class](value)
+
+        raise KeyError("Unsupported type", type(value))
+
+
+def create_env(adapter_class: type[SqlAdapter]) -> SqlEnvironment:
+    env = SqlEnvironment()
+
+    adapter = adapter_class()
+    for type_, to_sql in env.adapter._mapping.items():
+        adapter.register_type(type_, to_sql)
+    env._adapter = adapter
+
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--columns", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    table = Table("wide", "public")
+    columns = [ValueColumnRendered(f"col_{i}", "TEXT") for i in range(args.columns)]
+
+    timings = []
+    for adapter_class in [LegacySqlAdapter, SqlAdapter]:
+        env = create_env(adapter_class)
+        template = env.from_string(CREATE_TABLE)
+
+        timings.append(
+            min(
+                timeit.repeat(
+                    lambda: template.render(table=table, columns=columns),
+                    number=args.number,
+                    repeat=5,
+                )
+            )
+            / args.number
+        )
+
+    before, after = timings
+    print(f"CREATE TABLE + INSERT with {args.columns} columns")
+    print(f"MRO walk:       {before * 1e3:.2f} ms")
+    print(f"dispatch cache: {after * 1e3:.2f} ms ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Microbenchmark: rendering of Table, Identifier and column primitives
+
+Compares the direct string-building implementations
+against the previous ones, which went through jinja and :py:meth:`SqlAdapter.format`
+
+Usage: ``python benchmarks/render_primitives.py [--number N]``
+"""
+
+import argparse
+import timeit
+from typing import Callable
+
+from ralsei.jinja import SqlEnvironment
+from ralsei.types import (
+    Table,
+    Identifier,
+    ColumnRendered,
+    ValueColumnRendered,
+    IdColumn,
+)
+
+
+def legacy_table(env: SqlEnvironment, table: Table) -> str:
+    return env.render(
+        "{%if schema%}{{schema | identifier}}.{%endif%}{{name | identifier}}",
+        name=table.name,
+        schema=table.schema,
+    )
+
+
+def legacy_identifier(env: SqlEnvironment, identifier: Identifier) -> str:
+    return '"{}"'.format(identifier.value.replace('"', '""'))
+
+
+def legacy_definition(env: SqlEnvironment, column: ColumnRendered) -> str:
+    return env.adapter.format("{} {}", column.identifier, column.type)
+
+
+def legacy_set_statement(env: SqlEnvironment, column: ValueColumnRendered) -> str:
+    return env.adapter.format("{} = {}", column.identifier, column.value)
+
+
+def legacy_id_column(env: SqlEnvironment, id_column: IdColumn) -> str:
+    return env.adapter.format("{} = {}", id_column.identifier, id_column.value)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    env = SqlEnvironment()
+    table = Table("pages", "crawl")
+    identifier = Identifier("html")
+    column = ValueColumnRendered("html", "TEXT")
+    id_column = IdColumn("id")
+
+    cases: list[tuple[str, Callable[[], str], Callable[[], str]]] = [
+        ("Table", lambda: legacy_table(env, table), lambda: table.to_sql(env)),
+        (
+            "Identifier",
+            lambda: legacy_identifier(env, identifier),
+            lambda: identifier.to_sql(env),
+        ),
+        (
+            "ColumnDefinition",
+            lambda: legacy_definition(env, column),
+            lambda: column.definition.to_sql(env),
+        ),
+        (
+            "ValueColumnSetStatement",
+            lambda: legacy_set_statement(env, column),
+            lambda: column.set_statement.to_sql(env),
+        ),
+        (
+            "IdColumn",
+            lambda: legacy_id_column(env, id_column),
+            lambda: id_column.to_sql(env),
+        ),
+    ]
+
+    print(f"{'primitive':<24} {'before, us':>11} {'after, us':>10} {'speedup':>8}")
+    for name, legacy, current in cases:
+        assert legacy() == current(), name
+
+        before = min(timeit.repeat(legacy, number=args.number, repeat=5))
+        after = min(timeit.repeat(current, number=args.number, repeat=5))
+        print(
+            f"{name:<24} {before / args.number * 1e6:>11.2f}"
+            f" {after / args.number * 1e6:>10.2f} {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from .types import (
     Sql,
     Identifier,
     Table,
+    View,
     Placeholder,
     Column,
     ColumnRendered,
@@ -20,6 +21,7 @@ from .task import (
 from .graph import Pipeline, OutputOf, Resolves, CyclicGraphError
 from .app import Ralsei
 from .utils import folder
+from .jinja import SqlFile
 
 __all__ = [
     "ConnectionEnvironment",
@@ -27,6 +29,7 @@ __all__ = [
     "Sql",
     "Identifier",
     "Table",
+    "View",
     "Placeholder",
     "Column",
     "ColumnRendered",
@@ -35,6 +38,8 @@ __all__ = [
     "IdColumn",
     "OneToOne",
     "OneToMany",
+    "AsyncOneToOne",
+    "AsyncOneToMany",
     "into_many",
     "into_one",
     "pop_id_fields",
@@ -54,4 +59,5 @@ __all__ = [
     "CyclicGraphError",
     "Ralsei",
     "folder",
+    "SqlFile",
 ]
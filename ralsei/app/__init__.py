@@ -1,12 +1,13 @@
 import sys
 import click
 from pathlib import Path
-from typing import Callable, Sequence
+from typing import Callable, ClassVar, Optional, Sequence
 from rich.console import Console
 from rich.prompt import Prompt
 import sqlalchemy
+import sqlalchemy.exc
 
-from ralsei.graph import Pipeline, TreePath, TaskSequence, DAG
+from ralsei.graph import Pipeline, TreePath, TaskSequence, DAG, RunHistory
 from ralsei.connection import (
     create_engine as create_engine_default,
     ConnectionEnvironment,
@@ -14,12 +15,20 @@ from ralsei.connection import (
 )
 from ralsei.task.rowcontext import ROW_CONTEXT_ATRRIBUTE
 from ralsei.jinja import SqlEnvironment
+from ralsei.profiling import TaskProfiler
 from ralsei.dialect import get_dialect
 from ralsei.utils import expect
 
-from ._parsers import type_treepath, type_sqlalchemy_url
+from ._parsers import type_treepath, type_sqlalchemy_url, type_resource_limit
 from ._decorators import extend_params
-from ._rich import print_task_scripts
+from ._rich import (
+    print_task_scripts,
+    print_task_warnings,
+    print_diagnostics_skipped,
+    print_critical_path,
+    print_task_runs,
+    print_trends,
+)
 from ._opener import open_in_default_app
 
 traceback_console = Console(stderr=True)
@@ -66,6 +75,12 @@ class Ralsei:
     engine: sqlalchemy.Engine
     env: SqlEnvironment
     dag: DAG
+    history: Optional[RunHistory]
+    """Where the durations of task runs are recorded, ``None`` disables recording"""
+
+    resource_limits: ClassVar[dict[str, int]] = {}
+    """Default limits for :py:attr:`ralsei.task.TaskDef.resources` tags
+    when running in parallel, overridden by the ``--limit`` option"""
 
     def __init__(self, url: sqlalchemy.URL, pipeline: Pipeline) -> None:
         self.pipeline = pipeline
@@ -76,6 +91,7 @@ class Ralsei:
         self.env = env
 
         self.dag = pipeline.build_dag(self.env)
+        self.history = RunHistory()
 
     def _create_engine(self, url: sqlalchemy.URL) -> sqlalchemy.Engine:
         """Override this to customize engine creation"""
@@ -83,7 +99,8 @@ class Ralsei:
         return create_engine_default(url)
 
     def _prepare_env(self, env: SqlEnvironment):
-        """Here you can add your own filters/globals to the jinja environment"""
+        """Here you can add your own filters/globals to the jinja environment,
+        or set the directories of template files with :py:meth:`ralsei.jinja.SqlEnvironment.set_template_dirs`"""
 
     def connect(self) -> ConnectionEnvironment:
         """Creates a new connection, returns connection + jinja env"""
@@ -117,9 +134,9 @@ class Ralsei:
         def cli(ctx: click.Context, db: sqlalchemy.URL, **kwargs):
             ctx.obj = cls(db, **kwargs)
 
-        cls.__build_subcommand(cli, "run", TaskSequence.run)
+        cls.__build_subcommand(cli, "run", TaskSequence.run, runs=True)
         cls.__build_subcommand(cli, "delete", TaskSequence.delete, ask=True)
-        cls.__build_subcommand(cli, "redo", TaskSequence.redo, ask=True)
+        cls.__build_subcommand(cli, "redo", TaskSequence.redo, ask=True, runs=True)
 
         @click.argument("task_name", metavar="TASK", type=type_treepath)
         @cli.command("describe")
@@ -128,7 +145,73 @@ class Ralsei:
             this = expect(
                 ctx.find_object(Ralsei), RuntimeError("click context not set")
             )
-            print_task_scripts(this.dag.tasks[task_name])
+            task = this.dag.tasks[task_name]
+            print_task_scripts(task)
+            try:
+                conn = this.connect()
+            except sqlalchemy.exc.DBAPIError as err:
+                # Scripts are rendered without a connection, so describe still works offline
+                print_diagnostics_skipped(err)
+                return
+            with conn:
+                print_task_warnings(task.diagnose(conn.sqlalchemy))
+
+        @cli.command("critical-path")
+        @click.pass_context
+        def critical_path_cmd(ctx: click.Context):
+            this = expect(
+                ctx.find_object(Ralsei), RuntimeError("click context not set")
+            )
+            history = expect(this.history, RuntimeError("Run history is disabled"))
+
+            with this.connect() as conn:
+                durations = history.expected_durations(conn.sqlalchemy)
+            total, chain = this.dag.topological_sort().critical_path(durations)
+            print_critical_path(total, chain, durations)
+
+        @click.option(
+            "--threshold",
+            help="flag runs that are more than this many percent slower"
+            " than the median of recent runs",
+            type=click.FloatRange(min=0),
+            default=20,
+            show_default=True,
+        )
+        @click.option(
+            "--last",
+            help="number of runs shown for a single task",
+            type=click.IntRange(min=1),
+            default=10,
+            show_default=True,
+        )
+        @click.argument("task_name", metavar="[TASK]", type=type_treepath, required=False)
+        @cli.command("history")
+        @click.pass_context
+        def history_cmd(
+            ctx: click.Context,
+            task_name: Optional[TreePath],
+            last: int,
+            threshold: float,
+        ):
+            this = expect(
+                ctx.find_object(Ralsei), RuntimeError("click context not set")
+            )
+            history = expect(this.history, RuntimeError("Run history is disabled"))
+
+            with this.connect() as conn:
+                if task_name is None:
+                    print_trends(history.trends(conn.sqlalchemy), threshold / 100)
+                else:
+                    print_task_runs(
+                        history.runs(
+                            conn.sqlalchemy,
+                            task_name,
+                            limit=last + history.recent,
+                        ),
+                        history.recent,
+                        last,
+                        threshold / 100,
+                    )
 
         @click.argument("filename", type=Path, default="graph.dot")
         @cli.command("graph")
@@ -147,8 +230,9 @@ class Ralsei:
     def __build_subcommand(
         group: click.Group,
         name: str,
-        action: Callable[[TaskSequence, ConnectionExt], None],
+        action: Callable[..., None],
         ask: bool = False,
+        runs: bool = False,
     ):
         @click.option(
             "--from",
@@ -170,15 +254,57 @@ class Ralsei:
             ctx: click.Context,
             from_filters: Sequence[TreePath],
             single_filters: Sequence[TreePath],
+            **kwargs,
         ):
             this = expect(
                 ctx.find_object(Ralsei), RuntimeError("click context not set")
             )
 
+            if runs:
+                kwargs["limits"] = {**this.resource_limits, **dict(kwargs["limits"])}
+                kwargs["history"] = this.history
+                kwargs["profiler"] = (
+                    TaskProfiler(profile_dir)
+                    if (profile_dir := kwargs.pop("profile_dir"))
+                    else None
+                )
+
             sequence = this.dag.sort_filtered(from_filters, single_filters)
             if not ask or confirm_sequence(sequence):
                 with this.connect() as conn:
-                    action(sequence, conn.sqlalchemy)
+                    action(sequence, conn.sqlalchemy, **kwargs)
+
+        if runs:
+            click.option(
+                "--profile",
+                "profile_dir",
+                help="profile each task, saving the profiles to DIR"
+                " (pyinstrument if installed, otherwise cProfile)."
+                " Only the calling thread is profiled, so time spent in a task's workers"
+                " is missing, and with cProfile, --jobs runs tasks one at a time",
+                type=click.Path(file_okay=False),
+                metavar="[DIR]",
+                is_flag=False,
+                flag_value="profile",
+                default=None,
+            )(cmd)
+            click.option(
+                "--limit",
+                "limits",
+                help="at most this combined weight of tasks holding the resource tag"
+                " run at the same time",
+                type=type_resource_limit,
+                metavar="TAG=N",
+                multiple=True,
+            )(cmd)
+            click.option(
+                "--jobs",
+                "-j",
+                help="number of independent tasks run at the same time",
+                type=click.IntRange(min=1),
+                default=1,
+                show_default=True,
+            )(cmd)
 
     @classmethod
     def run_cli(cls, *args, **kwargs):
@@ -31,5 +31,29 @@ class SqlalchemyUrlType(click.ParamType):
             self.fail("Expected string or URL")
 
 
+class ResourceLimitType(click.ParamType):
+    name = "tag=limit"
+
+    def convert(
+        self, value: Any, param: Optional[click.Parameter], ctx: Optional[click.Context]
+    ) -> Any:
+        if isinstance(value, tuple):
+            return value
+        elif isinstance(value, str):
+            tag, sep, limit = value.rpartition("=")
+            if not sep or not tag:
+                self.fail(f"Expected TAG=LIMIT, got {value!r}", param, ctx)
+            try:
+                limit = int(limit)
+            except ValueError:
+                self.fail(f"Limit must be an integer, got {limit!r}", param, ctx)
+            if limit < 1:
+                self.fail(f"Limit must be at least 1, got {limit}", param, ctx)
+            return tag, limit
+        else:
+            self.fail("Must be of type str or tuple")
+
+
 type_treepath = TreePathType()
 type_sqlalchemy_url = SqlalchemyUrlType()
+type_resource_limit = ResourceLimitType()
@@ -1,8 +1,12 @@
+import statistics
+from typing import Mapping, Optional
 from rich.rule import Rule
 from rich.syntax import Syntax
+from rich.table import Table
 
 from ralsei.console import console
 from ralsei.task import Task
+from ralsei.graph import NamedTask, TreePath, TaskRun, TaskTrend
 
 
 def _print_sql(sql_like: object):
@@ -31,3 +35,143 @@ def print_task_scripts(task: Task):
             _print_separated(script)
         else:
             _print_sql(script)
+
+
+def print_task_warnings(warnings: list[str]):
+    if len(warnings) == 0:
+        return
+
+    console.print(Rule("Warnings", align="right", style="yellow"))
+    for warning in warnings:
+        console.print(warning, style="yellow", markup=False)
+
+
+def print_diagnostics_skipped(error: Exception):
+    console.print(Rule("Warnings", align="right", style="yellow"))
+    console.print(
+        "Couldn't connect to the database, diagnostics skipped: {}".format(
+            str(error).splitlines()[0] if str(error) else type(error).__name__
+        ),
+        style="yellow",
+        markup=False,
+    )
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    if hours:
+        return f"{hours}h {minutes:02}m {seconds:04.1f}s"
+    elif minutes:
+        return f"{minutes}m {seconds:04.1f}s"
+    elif seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    elif seconds < 10:
+        return f"{seconds:.2f}s"
+    else:
+        return f"{seconds:.1f}s"
+
+
+def print_critical_path(
+    total: float, chain: list[NamedTask], durations: Mapping[TreePath, float]
+):
+    table = Table("Task", "Expected", "Finished by")
+    elapsed = 0.0
+    for named_task in chain:
+        duration = durations.get(named_task.path)
+        elapsed += duration or 0
+        table.add_row(
+            named_task.name,
+            "?" if duration is None else _format_duration(duration),
+            _format_duration(elapsed),
+        )
+
+    console.print(table)
+    console.print(f"Expected end-to-end time: [bold]{_format_duration(total)}")
+    if unknown := sum(1 for named_task in chain if named_task.path not in durations):
+        console.print(
+            f"{unknown} of the tasks have never been run and are counted as 0s",
+            style="yellow",
+        )
+
+
+def _format_optional(value: Optional[object]) -> str:
+    return "-" if value is None else str(value)
+
+
+def _format_change(change: Optional[float], threshold: float) -> str:
+    if change is None:
+        return ""
+
+    text = f"{change:+.0%}"
+    return f"[bold red]{text}[/bold red]" if change > threshold else text
+
+
+def _format_split(run: TaskRun) -> str:
+    if run.fn_time is None or run.db_time is None:
+        return ""
+    return f"{_format_duration(run.fn_time)} / {_format_duration(run.db_time)}"
+
+
+def print_trends(trends: list[TaskTrend], threshold: float):
+    if len(trends) == 0:
+        console.print("No runs have been recorded")
+        return
+
+    table = Table(
+        "Task",
+        "Last run",
+        "Duration",
+        "Median",
+        "Change",
+        "Rows in / out",
+        "fn / DB",
+    )
+    for trend in sorted(trends, key=lambda trend: str(trend.last.task)):
+        run = trend.last
+        table.add_row(
+            str(run.task),
+            f"{run.started_at:%Y-%m-%d %H:%M}",
+            _format_duration(run.duration),
+            "" if trend.median is None else _format_duration(trend.median),
+            _format_change(trend.change, threshold),
+            f"{_format_optional(run.rows_read)} / {_format_optional(run.rows_written)}",
+            _format_split(run),
+        )
+
+    console.print(table)
+    if regressions := [trend for trend in trends if trend.is_regression(threshold)]:
+        console.print(
+            f"{len(regressions)} task(s) ran more than {threshold:.0%} slower"
+            " than the median of their recent runs",
+            style="bold red",
+        )
+
+
+def print_task_runs(runs: list[TaskRun], recent: int, last: int, threshold: float):
+    """Print up to ``last`` runs of a task (newest first), each compared
+    to the median of up to ``recent`` runs preceding it"""
+
+    if len(runs) == 0:
+        console.print("No runs have been recorded")
+        return
+
+    table = Table(
+        "Started", "Finished", "Duration", "Change", "Rows in / out", "fn / DB"
+    )
+    for i, run in enumerate(runs[:last]):
+        previous = runs[i + 1 : i + 1 + recent]
+        trend = TaskTrend(
+            run,
+            statistics.median(run.duration for run in previous) if previous else None,
+        )
+        table.add_row(
+            f"{run.started_at:%Y-%m-%d %H:%M:%S}",
+            f"{run.finished_at:%Y-%m-%d %H:%M:%S}",
+            _format_duration(run.duration),
+            _format_change(trend.change, threshold),
+            f"{_format_optional(run.rows_read)} / {_format_optional(run.rows_written)}",
+            _format_split(run),
+        )
+
+    console.print(table)
@@ -1,4 +1,4 @@
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, Optional
 import sqlalchemy
 
 
@@ -11,3 +11,17 @@ class CountableCursorResult:
 
     def __length_hint__(self) -> int:
         return self._result.rowcount
+
+
+class StreamedResult:
+    """Rows fetched lazily, with the total counted beforehand"""
+
+    def __init__(self, rows: Iterable[sqlalchemy.Row[Any]], total: Optional[int]):
+        self._rows = rows
+        self._total = total
+
+    def __iter__(self) -> Iterator[sqlalchemy.Row[Any]]:
+        return iter(self._rows)
+
+    def __length_hint__(self) -> int:
+        return self._total or 0
@@ -24,8 +24,16 @@ def create_engine(url: str | sqlalchemy.URL, **kwargs) -> sqlalchemy.Engine:
 
     Applies additional configurations for sqlite, such as enabling ``foreign_keys``
     and fixing transaction issues (`<https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl>`_)
+
+    For psycopg2, ``executemany_mode`` defaults to ``values_plus_batch``,
+    so that batched inserts and updates use psycopg2's ``execute_batch`` fast path
+    (`<https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#psycopg2-executemany-mode>`_)
     """
 
+    url = sqlalchemy.make_url(url)
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2":
+        kwargs.setdefault("executemany_mode", "values_plus_batch")
+
     engine = sqlalchemy.create_engine(url, **kwargs)
 
     # Fix transactions in SQLite
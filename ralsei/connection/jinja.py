@@ -1,13 +1,18 @@
 from __future__ import annotations
-from typing import Any, Iterable, Mapping, Optional
+import itertools
+from contextlib import suppress
+from typing import Any, Iterable, Iterator, Mapping, Optional
 import sqlalchemy
+import sqlalchemy.exc
 from sqlalchemy.engine.interfaces import _CoreSingleExecuteParams, _CoreAnyExecuteParams
 
 from ralsei.dialect import DialectInfo, get_dialect
 from ralsei.jinja import ISqlEnvironment, SqlEnvironment
 
 from .ext import ConnectionExt
-from ._length_hint import CountableCursorResult
+from ._length_hint import CountableCursorResult, StreamedResult
+
+_cursor_ids = itertools.count()
 
 
 class ConnectionEnvironment:
@@ -89,20 +94,99 @@ class ConnectionEnvironment:
         self,
         statement: sqlalchemy.Executable,
         parameters: Optional[_CoreSingleExecuteParams] = None,
+        fetch_size: Optional[int] = None,
     ) -> Iterable[sqlalchemy.Row[Any]]:
         """Execute a sql expression, returning an object with a :py:meth:`object.__length_hint__` method,
         letting you see the estimated number or rows.
 
         Concrete implementation depends on the sql dialect
+
+        Args:
+            statement: query to execute
+            parameters: sql bind parameters
+            fetch_size: if set, rows are streamed from the database in batches of this size
+                instead of being loaded all at once,
+                and the length hint comes from a separate ``COUNT(*)`` query. |br|
+                On dialects with :py:attr:`~ralsei.dialect.BaseDialectInfo.supports_cursor_with_hold`,
+                a ``WITH HOLD`` cursor is used, so that the stream survives commits. |br|
+                Note that on Postgres, the first commit while such a cursor is open
+                makes the server compute and store the rest of its result,
+                so a resumable task's first checkpoint may take as long as the whole query
+        """
+
+        if fetch_size is None:
+            result = self.sqlalchemy.execute(statement, parameters)
+            return (
+                CountableCursorResult(result)
+                if self.dialect_info.supports_rowcount
+                else result.all()
+            )
+
+        total = self.count_rows(statement, parameters)
+        if self.dialect_info.supports_cursor_with_hold and isinstance(
+            statement, sqlalchemy.TextClause
+        ):
+            rows = self._fetch_with_hold(statement, parameters, fetch_size)
+        else:
+            rows = self.sqlalchemy.execute(
+                statement, parameters, execution_options={"yield_per": fetch_size}
+            )
+
+        return StreamedResult(rows, total)
+
+    def count_rows(
+        self,
+        statement: sqlalchemy.Executable,
+        parameters: Optional[_CoreSingleExecuteParams] = None,
+    ) -> Optional[int]:
+        """Count the rows returned by a query with ``SELECT COUNT(*)``
+
+        Returns:
+            number of rows, or ``None`` if the statement is neither text nor a select
         """
 
-        result = self.sqlalchemy.execute(statement, parameters)
-        return (
-            CountableCursorResult(result)
-            if self.dialect_info.supports_rowcount
-            else result.all()
+        if isinstance(statement, sqlalchemy.TextClause):
+            count = sqlalchemy.text(
+                f"SELECT COUNT(*) FROM ({_strip_statement(statement)}) AS __count"
+            )
+        elif isinstance(statement, sqlalchemy.Select):
+            count = sqlalchemy.select(sqlalchemy.func.count()).select_from(
+                statement.subquery()
+            )
+        else:
+            return None
+
+        return self.sqlalchemy.execute(count, parameters).scalar_one()
+
+    def _fetch_with_hold(
+        self,
+        statement: sqlalchemy.TextClause,
+        parameters: Optional[_CoreSingleExecuteParams],
+        fetch_size: int,
+    ) -> Iterator[sqlalchemy.Row[Any]]:
+        cursor_name = f"__ralsei_cursor_{next(_cursor_ids)}"
+        self.sqlalchemy.execute(
+            sqlalchemy.text(
+                f'DECLARE "{cursor_name}" NO SCROLL CURSOR WITH HOLD FOR {_strip_statement(statement)}'
+            ),
+            parameters,
         )
 
+        def iter_rows():
+            fetch = sqlalchemy.text(f'FETCH FORWARD {fetch_size} FROM "{cursor_name}"')
+            try:
+                while rows := self.sqlalchemy.execute(fetch).all():
+                    yield from rows
+            finally:
+                # Fails if the transaction has been aborted or the connection closed,
+                # in which case the cursor is gone already
+                with suppress(sqlalchemy.exc.SQLAlchemyError):
+                    self.sqlalchemy.execute(
+                        sqlalchemy.text(f'CLOSE "{cursor_name}"')
+                    )
+
+        return iter_rows()
+
     def __enter__(self) -> ConnectionEnvironment:
         return self
 
@@ -110,4 +194,8 @@ class ConnectionEnvironment:
         self.sqlalchemy.close()
 
 
+def _strip_statement(statement: sqlalchemy.TextClause) -> str:
+    return statement.text.strip().rstrip(";")
+
+
 __all__ = ["ConnectionEnvironment"]
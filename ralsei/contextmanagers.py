@@ -1,7 +1,12 @@
 from functools import wraps
 from types import TracebackType
-from typing import Callable, Generator, Optional, Protocol
-from contextlib import contextmanager, _GeneratorContextManager
+from typing import AsyncGenerator, Callable, Generator, Optional, Protocol
+from contextlib import (
+    asynccontextmanager,
+    contextmanager,
+    _AsyncGeneratorContextManager,
+    _GeneratorContextManager,
+)
 
 
 class ContextManager[T](Protocol):
@@ -17,6 +22,19 @@ class ContextManager[T](Protocol):
     ) -> Optional[bool]: ...
 
 
+class AsyncContextManager[T](Protocol):
+    """Protocol describing any async context manager class"""
+
+    async def __aenter__(self) -> T: ...
+
+    async def __aexit__(
+        self,
+        __exc_type: Optional[type[BaseException]],
+        __exc_value: Optional[BaseException],
+        __traceback: Optional[TracebackType],
+    ) -> Optional[bool]: ...
+
+
 class MultiContextManager[T]:
     """Makes a dictionary of context managers act as a single context manager
 
@@ -66,6 +84,28 @@ class _ReusableGeneratorContextManager[T, **P]:
         return result
 
 
+class _ReusableAsyncGeneratorContextManager[T, **P]:
+    def __init__(
+        self,
+        make_contextmanager: Callable[P, _AsyncGeneratorContextManager[T]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> None:
+        self.make_contextmanager = make_contextmanager
+        self.args = args
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        self.oneshot = self.make_contextmanager(*self.args, **self.kwargs)
+        return await self.oneshot.__aenter__()
+
+    async def __aexit__(self, __exc_type, __exc_value, __traceback):
+        result = await self.oneshot.__aexit__(__exc_type, __exc_value, __traceback)
+        del self.oneshot
+
+        return result
+
+
 def reusable_contextmanager[
     T, **P
 ](func: Callable[P, Generator[T, None, None]]) -> Callable[
@@ -118,9 +158,54 @@ def reusable_contextmanager_const[
     return _ReusableGeneratorContextManager(contextmanager(func))
 
 
+def reusable_asynccontextmanager[
+    T, **P
+](func: Callable[P, AsyncGenerator[T, None]]) -> Callable[
+    P, _ReusableAsyncGeneratorContextManager[T, P]
+]:
+    """like :py:func:`contextlib.asynccontextmanager`, but can be entered multiple times
+
+    .. code-block:: python
+
+        @reusable_asynccontextmanager
+        async def client(timeout: float):
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                yield client
+
+        MapToNewColumns(
+            fn=fetch_page,
+            context={"client": client(timeout=30)}
+        )
+    """
+
+    wrapped = asynccontextmanager(func)
+
+    @wraps(func)
+    def inner(*args: P.args, **kwargs: P.kwargs):
+        return _ReusableAsyncGeneratorContextManager(wrapped, *args, **kwargs)
+
+    return inner
+
+
+def reusable_asynccontextmanager_const[
+    T
+](
+    func: Callable[[], AsyncGenerator[T, None]]
+) -> _ReusableAsyncGeneratorContextManager[T, []]:
+    """Like :py:func:`ralsei.contextmanagers.reusable_asynccontextmanager`, but used without invocation
+
+    Only for functions with no arguments.
+    """
+
+    return _ReusableAsyncGeneratorContextManager(asynccontextmanager(func))
+
+
 __all__ = [
     "ContextManager",
+    "AsyncContextManager",
     "MultiContextManager",
     "reusable_contextmanager",
     "reusable_contextmanager_const",
+    "reusable_asynccontextmanager",
+    "reusable_asynccontextmanager_const",
 ]
@@ -1,9 +1,10 @@
-from typing import Iterable
+from typing import Iterable, Optional, Sequence
 from sqlalchemy import inspect
+from sqlalchemy.engine.interfaces import ReflectedIndex
 from sqlalchemy import TextClause
 
 from ralsei.connection import ConnectionEnvironment
-from ralsei.types import Table, ColumnRendered
+from ralsei.types import Table, ColumnRendered, ToSql
 from ralsei.jinja import ISqlEnvironment
 from ralsei.sql_description import AsStatements
 
@@ -38,6 +39,137 @@ def columns_exist(
     return True
 
 
+def index_exists(
+    conn: ConnectionEnvironment, table: Table, columns: Sequence[str]
+) -> bool:
+    """Check if lookups by ``columns`` on a table can use an existing index
+
+    The primary key, unique constraints and indexes all count,
+    as long as their leading columns are exactly ``columns`` (in any order).
+    Partial indexes are ignored
+    """
+
+    if not table_exists(conn, table):
+        return False
+
+    inspector = inspect(conn.sqlalchemy)
+    candidates: list[Sequence[Optional[str]]] = [
+        inspector.get_pk_constraint(table.name, table.schema)["constrained_columns"],
+        *(
+            constraint["column_names"]
+            for constraint in inspector.get_unique_constraints(table.name, table.schema)
+        ),
+        *(
+            index["column_names"]
+            for index in inspector.get_indexes(table.name, table.schema)
+            if not _is_partial(index)
+        ),
+    ]
+
+    wanted = set(columns)
+    return any(
+        set(candidate[: len(wanted)]) == wanted for candidate in candidates if candidate
+    )
+
+
+def _is_partial(index: ReflectedIndex) -> bool:
+    return any(
+        key.endswith("_where") and value is not None
+        for key, value in index.get("dialect_options", {}).items()
+    )
+
+
+def default_index_name(table: Table, columns: Sequence[str]) -> str:
+    """Index name used by :py:class:`CreateIndex` if none was given"""
+    return "{}__{}_idx".format(table.name, "_".join(columns))
+
+
+class CreateIndex(AsStatements):
+    """Action for creating an index
+
+    Args:
+        env: jinja environment
+        table: indexed table
+        columns: indexed columns
+        name: index name, see :py:func:`default_index_name`
+        where: condition making this a partial index
+        if_missing: skip creating the index if lookups by ``columns``
+            are already covered by another index (see :py:func:`index_exists`)
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        table: Table,
+        columns: Sequence[str],
+        name: Optional[str] = None,
+        where: Optional[ToSql] = None,
+        if_missing: bool = False,
+    ) -> None:
+        self.name = name or default_index_name(table, columns)
+        self.statement = env.render_sql(
+            """\
+            CREATE INDEX IF NOT EXISTS {{name | identifier}}
+            ON {{table}}(
+            {%-set sep = joiner(', ')%}
+            {%-for column in columns%}{{sep()}}{{column | identifier}}{%endfor-%}
+            ){%if where is not none%}
+            WHERE {{where}}{%endif%};""",
+            table=table,
+            columns=columns,
+            name=self.name,
+            where=where,
+        )
+        self.table, self.columns = table, columns
+        self._if_missing = if_missing
+
+    def as_statements(self) -> list[str]:
+        return [str(self.statement)]
+
+    def __call__(self, conn: ConnectionEnvironment):
+        """Execute action"""
+        if self._if_missing and index_exists(conn, self.table, self.columns):
+            return
+
+        conn.sqlalchemy.execute(self.statement)
+
+    def __str__(self) -> str:
+        return str(self.statement)
+
+
+class DropIndex(AsStatements):
+    """Action for dropping an index (if it exists)
+
+    Args:
+        env: jinja environment
+        table: indexed table
+        columns: indexed columns
+        name: index name, see :py:func:`default_index_name`
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        table: Table,
+        columns: Sequence[str],
+        name: Optional[str] = None,
+    ) -> None:
+        self.statement = env.render_sql(
+            "DROP INDEX IF EXISTS {{index}};",
+            index=Table(name or default_index_name(table, columns), table.schema),
+        )
+
+    def as_statements(self) -> list[str]:
+        return [str(self.statement)]
+
+    def __call__(self, conn: ConnectionEnvironment):
+        """Execute action"""
+        conn.sqlalchemy.execute(self.statement)
+
+    def __str__(self) -> str:
+        return str(self.statement)
+
+
 class AddColumns(AsStatements):
     """Action for adding columns to a table
 
@@ -46,6 +178,8 @@ class AddColumns(AsStatements):
         table: target table
         columns: columns to add
         if_not_exists: use ``IF NOT EXISTS`` check
+        indexes: indexes created after the columns
+            (and dropped by :py:class:`DropColumns` before them)
     """
 
     def __init__(
@@ -54,6 +188,7 @@ class AddColumns(AsStatements):
         table: Table,
         columns: Iterable[ColumnRendered],
         if_not_exists: bool = False,
+        indexes: Sequence[CreateIndex] = (),
     ) -> None:
         self.statements: list[TextClause] = [
             env.render_sql(
@@ -70,9 +205,13 @@ class AddColumns(AsStatements):
         ]
         self._table, self._columns = table, columns
         self._if_not_exists = if_not_exists
+        self._indexes = indexes
 
     def as_statements(self) -> list[str]:
-        return [str(statement) for statement in self.statements]
+        return [
+            *(str(statement) for statement in self.statements),
+            *(str(index) for index in self._indexes),
+        ]
 
     def __call__(self, conn: ConnectionEnvironment):
         """Execute action"""
@@ -84,8 +223,11 @@ class AddColumns(AsStatements):
         else:
             conn.sqlalchemy.executescript(self.statements)
 
+        for index in self._indexes:
+            index(conn)
+
     def __str__(self) -> str:
-        return "\n".join(map(str, self.statements))
+        return "\n".join(self.as_statements())
 
 
 class DropColumns(AsStatements):
@@ -96,6 +238,8 @@ class DropColumns(AsStatements):
         table: target table
         columns: columns to drop
         if_exists: use ``IF EXISTS`` check
+        indexes: indexes created along with the columns,
+            dropped first (SQLite won't drop a column an index depends on)
     """
 
     def __init__(
@@ -104,7 +248,12 @@ class DropColumns(AsStatements):
         table: Table,
         columns: Iterable[ColumnRendered],
         if_exists: bool = False,
+        indexes: Sequence[CreateIndex] = (),
     ) -> None:
+        self._drop_indexes = [
+            DropIndex(env, index.table, index.columns, index.name)
+            for index in indexes
+        ]
         self.statements: list[TextClause] = [
             env.render_sql(
                 """\
@@ -121,13 +270,19 @@ class DropColumns(AsStatements):
         self._if_exists = if_exists
 
     def as_statements(self) -> list[str]:
-        return [str(statement) for statement in self.statements]
+        return [
+            *(str(index) for index in self._drop_indexes),
+            *(str(statement) for statement in self.statements),
+        ]
 
     def __call__(self, conn: ConnectionEnvironment):
         """Execute action"""
         if self._if_exists and not table_exists(conn, self._table):
             return
 
+        for index in self._drop_indexes:
+            index(conn)
+
         if self._if_exists and not conn.dialect_info.supports_column_if_not_exists:
             existing = _get_column_names(conn, self._table)
             for column, statement in zip(self._columns, self.statements):
@@ -137,7 +292,16 @@ class DropColumns(AsStatements):
             conn.sqlalchemy.executescript(self.statements)
 
     def __str__(self) -> str:
-        return "\n".join(map(str, self.statements))
+        return "\n".join(self.as_statements())
 
 
-__all__ = ["table_exists", "columns_exist", "AddColumns", "DropColumns"]
+__all__ = [
+    "table_exists",
+    "columns_exist",
+    "index_exists",
+    "default_index_name",
+    "AddColumns",
+    "DropColumns",
+    "CreateIndex",
+    "DropIndex",
+]
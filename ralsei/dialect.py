@@ -10,6 +10,14 @@ class BaseDialectInfo:
     autoincrement_key: ToSql = Sql("SERIAL PRIMARY KEY")
     supports_column_if_not_exists: bool = True
     supports_rowcount: bool = True
+    supports_update_from: bool = False
+    """Whether ``UPDATE ... FROM (VALUES ...)`` is available for batched updates"""
+    supports_cursor_with_hold: bool = False
+    """Whether ``DECLARE ... CURSOR WITH HOLD`` / ``FETCH FORWARD`` are available
+    for streaming rows across commits"""
+    supports_copy: bool = False
+    supports_skip_locked: bool = False
+    """Whether ``SELECT ... FOR UPDATE SKIP LOCKED`` is available"""
 
 
 type DialectInfo = BaseDialectInfo | type[BaseDialectInfo]
@@ -49,7 +57,10 @@ def get_dialect(driver: str) -> DialectInfo:
 
 @register_dialect("postgresql")
 class PostgresDialectInfo(BaseDialectInfo):
-    pass
+    supports_update_from = True
+    supports_cursor_with_hold = True
+    supports_copy = True
+    supports_skip_locked = True
 
 
 @register_dialect("sqlite")
@@ -4,7 +4,9 @@ from .path import TreePath
 from .outputof import OutputOf, Resolves
 from .resolver_context import resolve
 from .error import ResolverContextError, CyclicGraphError
+from .history import RunHistory, TaskRun, TaskTrend
 from .sequence import NamedTask, TaskSequence
+from .scheduler import Scheduler
 
 __all__ = [
     "Pipeline",
@@ -16,6 +18,10 @@ __all__ = [
     "resolve",
     "ResolverContextError",
     "CyclicGraphError",
+    "RunHistory",
+    "TaskRun",
+    "TaskTrend",
     "NamedTask",
     "TaskSequence",
+    "Scheduler",
 ]
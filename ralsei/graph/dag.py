@@ -42,7 +42,7 @@ class TopologicalSort:
                 self._visit_recursive(path)
 
         self.stack.reverse()
-        return TaskSequence(self.stack)
+        return self.dag._sequence(self.stack)
 
 
 @dataclass
@@ -100,12 +100,43 @@ class DAG:
             for single_path in single_filters:
                 mask.add(single_path)
 
-            sequence = TaskSequence(
+            sequence = self._sequence(
                 [task for task in sequence.steps if task.path in mask]
             )
 
         return sequence
 
+    def _sequence(self, steps: list[NamedTask]) -> TaskSequence:
+        """Create a sequence of a subset of tasks,
+        keeping the dependencies that go through the tasks left out"""
+
+        included = set(named_task.path for named_task in steps)
+        parents: dict[TreePath, set[TreePath]] = {}
+        for parent, children in self.relations.items():
+            for child in children:
+                parents.setdefault(child, set()).add(parent)
+
+        dependencies: dict[TreePath, set[TreePath]] = {}
+        for named_task in steps:
+            found: set[TreePath] = set()
+            visited: set[TreePath] = set()
+            stack = list(parents.get(named_task.path, ()))
+
+            while stack:
+                path = stack.pop()
+                if path in visited:
+                    continue
+                visited.add(path)
+
+                if path in included:
+                    found.add(path)
+                else:
+                    stack.extend(parents.get(path, ()))
+
+            dependencies[named_task.path] = found
+
+        return TaskSequence(steps, dependencies)
+
     def graphviz(self) -> Digraph:
         """Generate graphviz diagram"""
 
@@ -0,0 +1,211 @@
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+import sqlalchemy
+
+from ralsei.stats import TaskStats
+from .path import TreePath
+
+if TYPE_CHECKING:
+    from ralsei.connection import ConnectionExt
+
+
+@dataclass
+class TaskRun:
+    """A row of the :py:class:`RunHistory` table"""
+
+    task: TreePath
+    started_at: datetime
+    finished_at: datetime
+    duration: float
+    """Wall time in seconds"""
+    rows_read: Optional[int]
+    rows_written: Optional[int]
+    fn_time: Optional[float]
+    db_time: Optional[float]
+
+
+@dataclass
+class TaskTrend:
+    """The latest run of a task compared to the runs before it"""
+
+    last: TaskRun
+    median: Optional[float]
+    """Median duration of the previous runs, ``None`` if this is the first one"""
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change of the duration compared to :py:attr:`~median`,
+        ``0.2`` means 20% slower"""
+
+        if not self.median:
+            return None
+        return self.last.duration / self.median - 1
+
+    def is_regression(self, threshold: float) -> bool:
+        """Whether the last run was more than ``threshold`` (as a fraction) slower"""
+
+        change = self.change
+        return change is not None and change > threshold
+
+
+class RunHistory:
+    """Timings of past task runs, stored in a metadata table in the target database
+
+    The table is created on the first recorded run
+
+    Args:
+        table_name: name of the metadata table
+        schema: schema of the metadata table
+        recent: number of most recent runs that the expected duration is based on
+    """
+
+    def __init__(
+        self,
+        table_name: str = "ralsei_runs",
+        schema: Optional[str] = None,
+        recent: int = 5,
+    ) -> None:
+        if recent < 1:
+            raise ValueError("Number of recent runs must be at least 1")
+
+        self.recent = recent
+        self.table = sqlalchemy.Table(
+            table_name,
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column("task", sqlalchemy.Text, nullable=False, index=True),
+            sqlalchemy.Column("started_at", sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Column("finished_at", sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Column("duration", sqlalchemy.Float, nullable=False),
+            sqlalchemy.Column("rows_read", sqlalchemy.BigInteger),
+            sqlalchemy.Column("rows_written", sqlalchemy.BigInteger),
+            sqlalchemy.Column("fn_time", sqlalchemy.Float),
+            sqlalchemy.Column("db_time", sqlalchemy.Float),
+            schema=schema,
+        )
+
+    def create(self, conn: "ConnectionExt"):
+        """Create the metadata table if it doesn't exist"""
+        self.table.create(conn, checkfirst=True)
+
+    def exists(self, conn: "ConnectionExt") -> bool:
+        return sqlalchemy.inspect(conn).has_table(
+            self.table.name, schema=self.table.schema
+        )
+
+    def record(
+        self,
+        conn: "ConnectionExt",
+        path: TreePath,
+        started_at: datetime,
+        duration: float,
+        stats: Optional[TaskStats] = None,
+    ):
+        """Add a finished run (the caller commits)
+
+        Args:
+            path: the task that has been run
+            started_at: local time the task has started at
+            duration: wall time of the run in seconds
+            stats: counters collected during the run
+        """
+
+        stats = stats or TaskStats()
+        conn.execute(
+            self.table.insert().values(
+                task=str(path),
+                started_at=started_at,
+                finished_at=started_at + timedelta(seconds=duration),
+                duration=duration,
+                rows_read=stats.rows_read,
+                rows_written=stats.rows_written,
+                fn_time=stats.fn_time,
+                db_time=stats.db_time,
+            )
+        )
+
+    def runs(
+        self,
+        conn: "ConnectionExt",
+        task: Optional[TreePath] = None,
+        limit: Optional[int] = None,
+        per_task: Optional[int] = None,
+    ) -> list[TaskRun]:
+        """Recorded runs, newest first
+
+        Args:
+            task: only return the runs of this task
+            limit: maximum number of runs
+            per_task: maximum number of runs of each task
+        """
+
+        if not self.exists(conn):
+            return []
+
+        source = self.table
+        where: list[sqlalchemy.ColumnElement[bool]] = []
+        if per_task is not None:
+            source = sqlalchemy.select(
+                self.table,
+                sqlalchemy.func.row_number()
+                .over(
+                    partition_by=self.table.c.task,
+                    order_by=self.table.c.started_at.desc(),
+                )
+                .label("run_number"),
+            ).subquery()
+            where.append(source.c.run_number <= per_task)
+        if task is not None:
+            where.append(source.c.task == str(task))
+
+        select = (
+            sqlalchemy.select(*(source.c[column.name] for column in self.table.c))
+            .where(*where)
+            .order_by(source.c.started_at.desc())
+        )
+        if limit is not None:
+            select = select.limit(limit)
+
+        return [
+            TaskRun(**{**row._asdict(), "task": TreePath.parse(row.task)})
+            for row in conn.execute(select)
+        ]
+
+    def __recent_by_task(self, conn: "ConnectionExt") -> dict[TreePath, list[TaskRun]]:
+        by_task: dict[TreePath, list[TaskRun]] = {}
+        # The latest run, plus the ones it's compared against in trends()
+        for run in self.runs(conn, per_task=self.recent + 1):
+            by_task.setdefault(run.task, []).append(run)
+
+        return by_task
+
+    def expected_durations(self, conn: "ConnectionExt") -> dict[TreePath, float]:
+        """Median duration of the :py:attr:`~recent` runs of each task
+
+        Returns:
+            durations in seconds, tasks that have never been run are missing
+        """
+
+        return {
+            task: statistics.median(run.duration for run in runs[: self.recent])
+            for task, runs in self.__recent_by_task(conn).items()
+        }
+
+    def trends(self, conn: "ConnectionExt") -> list[TaskTrend]:
+        """Compare the latest run of each task to the median of the :py:attr:`~recent` runs before it"""
+
+        return [
+            TaskTrend(
+                runs[0],
+                (
+                    statistics.median(run.duration for run in runs[1:])
+                    if len(runs) > 1
+                    else None
+                ),
+            )
+            for runs in self.__recent_by_task(conn).values()
+        ]
+
+
+__all__ = ["RunHistory", "TaskRun", "TaskTrend"]
@@ -0,0 +1,198 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Iterator, Mapping, Optional
+
+from ralsei.console import console, track
+from .path import TreePath
+from .sequence import NamedTask, _run_task
+
+if TYPE_CHECKING:
+    from ralsei.connection import ConnectionExt
+    from ralsei.profiling import TaskProfiler
+    from .sequence import TaskSequence
+    from .history import RunHistory
+
+
+class Scheduler:
+    """Runs the tasks of a :py:class:`ralsei.graph.TaskSequence` concurrently,
+    dispatching each task as soon as all of its predecessors have finished
+
+    Every task gets its own connection from the engine's pool,
+    so make sure the pool is at least as big as ``jobs``.
+
+    If a task fails, its descendants are not run,
+    but independent branches carry on until they are done
+
+    Tasks can additionally be limited by their :py:attr:`ralsei.task.Task.resources`:
+    a task is only started if, for every tag it holds, the combined weight of the running tasks
+    (including this one) stays within that tag's limit.
+    A task that can't start yet doesn't hold back independent tasks queued after it
+
+    Among the tasks that are ready, the ones with the longest expected time
+    until their descendants are done (see :py:meth:`ralsei.graph.TaskSequence.remaining_durations`)
+    are started first, so that the critical path isn't left for last
+
+    Note:
+        SQLite allows only one writer at a time,
+        concurrent tasks are likely to fail with ``database is locked``
+
+    Args:
+        sequence: tasks and their dependencies
+        jobs: maximum number of tasks running at the same time
+        limits: maximum combined weight of running tasks for each resource tag,
+            tags without a limit are unrestricted
+        durations: expected duration of each task, usually from :py:meth:`ralsei.graph.RunHistory.expected_durations`
+
+    Example:
+        .. code-block:: python
+
+            Scheduler(sequence, jobs=8, limits={"network:site-a": 2, "db-heavy": 1})
+    """
+
+    def __init__(
+        self,
+        sequence: "TaskSequence",
+        jobs: int,
+        limits: Optional[Mapping[str, int]] = None,
+        durations: Optional[Mapping[TreePath, float]] = None,
+    ) -> None:
+        if jobs < 1:
+            raise ValueError("Number of jobs must be at least 1")
+
+        self.sequence = sequence
+        self.jobs = jobs
+        self.limits = dict(limits or {})
+        self.priorities = sequence.remaining_durations(durations or {})
+
+        for named_task in sequence.steps:
+            for tag, weight in named_task.task.resources.items():
+                if weight < 0:
+                    raise ValueError(
+                        f"{named_task.name}: weight of {tag!r} must not be negative"
+                    )
+                if (limit := self.limits.get(tag)) is not None and weight > limit:
+                    raise ValueError(
+                        f"{named_task.name} needs {weight} of {tag!r},"
+                        f" but the limit is {limit}"
+                    )
+
+    def __fits(self, named_task: NamedTask, used: Counter[str]) -> bool:
+        return all(
+            used[tag] + weight <= self.limits[tag]
+            for tag, weight in named_task.task.resources.items()
+            if tag in self.limits
+        )
+
+    def map(
+        self, fn: Callable[[NamedTask], None]
+    ) -> Iterator[tuple[NamedTask, Optional[BaseException]]]:
+        """Call ``fn`` on each task in a thread pool, respecting the dependencies
+
+        Yields:
+            finished (or skipped) tasks and the exception they have failed with, if any.
+            Descendants of a failed task are yielded with the same exception, without being run
+        """
+
+        waiting = {
+            named_task.path: set(self.sequence.predecessors(named_task.path))
+            for named_task in self.sequence.steps
+        }
+        by_path = {named_task.path: named_task for named_task in self.sequence.steps}
+        successors = self.sequence._successors()
+
+        ready = [
+            named_task
+            for named_task in self.sequence.steps
+            if not waiting[named_task.path]
+        ]
+        for named_task in ready:
+            del waiting[named_task.path]
+
+        running: dict[Future[None], NamedTask] = {}
+        used: Counter[str] = Counter()
+
+        def cancel_descendants(path: TreePath, error: BaseException):
+            for child in successors[path]:
+                if waiting.pop(child, None) is not None:
+                    yield by_path[child], error
+                    yield from cancel_descendants(child, error)
+
+        with ThreadPoolExecutor(self.jobs, thread_name_prefix="ralsei-task") as pool:
+            while ready or running:
+                for named_task in sorted(
+                    ready, key=lambda named_task: -self.priorities[named_task.path]
+                ):
+                    if len(running) >= self.jobs:
+                        break
+                    if not self.__fits(named_task, used):
+                        continue
+
+                    ready.remove(named_task)
+                    used.update(named_task.task.resources)
+                    running[pool.submit(fn, named_task)] = named_task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    named_task = running.pop(future)
+                    used.subtract(named_task.task.resources)
+
+                    if error := future.exception():
+                        yield named_task, error
+                        yield from cancel_descendants(named_task.path, error)
+                        continue
+
+                    yield named_task, None
+                    for child in successors[named_task.path]:
+                        if (predecessors := waiting.get(child)) is not None:
+                            predecessors.discard(named_task.path)
+                            if not predecessors:
+                                del waiting[child]
+                                ready.append(by_path[child])
+
+    def run(
+        self,
+        conn: "ConnectionExt",
+        history: Optional["RunHistory"] = None,
+        profiler: Optional["TaskProfiler"] = None,
+    ):
+        """Run the tasks, each on a new connection to the same engine as ``conn``
+
+        Args:
+            history: if set, record the timings of each task
+            profiler: if set, profile each task
+
+        Raises:
+            Exception: the error of the failed task,
+                or an :py:class:`ExceptionGroup` if multiple tasks have failed
+        """
+
+        def run_on_new_connection(named_task: NamedTask):
+            with conn.__class__(conn.engine) as task_conn:
+                _run_task(task_conn, named_task, history, profiler)
+
+        errors: list[BaseException] = []
+        for named_task, error in track(
+            self.map(run_on_new_connection),
+            description="Running tasks...",
+            total=len(self.sequence.steps),
+        ):
+            if error is None:
+                continue
+            elif any(error is seen for seen in errors):
+                console.print(
+                    f"Skipping [bold red]{named_task.name}[/bold red]:"
+                    " a dependency has failed"
+                )
+            else:
+                console.print(
+                    f"[bold red]{named_task.name}[/bold red] failed: {error!r}"
+                )
+                errors.append(error)
+
+        if len(errors) == 1:
+            raise errors[0]
+        elif errors:
+            raise BaseExceptionGroup("Multiple tasks have failed", errors)
+
+
+__all__ = ["Scheduler"]
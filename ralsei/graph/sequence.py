@@ -1,8 +1,14 @@
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional
 
 from ralsei.console import console, track
+from ralsei.stats import TaskStats
+from ralsei.profiling import TaskProfiler
 from .path import TreePath
+from .history import RunHistory
 
 if TYPE_CHECKING:
     from ralsei.connection import ConnectionExt
@@ -22,25 +28,162 @@ class NamedTask:
         return str(self.path)
 
 
-class TaskSequence:
-    """An executable sequence of tasks"""
+def _run_task(
+    conn: "ConnectionExt",
+    named_task: NamedTask,
+    history: Optional[RunHistory] = None,
+    profiler: Optional[TaskProfiler] = None,
+):
+    """Run the task unless it already exists, then record its timings and commit"""
+
+    if named_task.task.exists(conn):
+        console.print(
+            f"Skipping [bold green]{named_task.name}[/bold green]: already done"
+        )
+    else:
+        console.print(f"Running [bold green]{named_task.name}")
+
+        started_at, start = datetime.now(), time.perf_counter()
+        with (
+            TaskStats().collect(conn) as stats,
+            (
+                profiler.profile(named_task.name, named_task.task.is_concurrent)
+                if profiler
+                else nullcontext()
+            ),
+        ):
+            named_task.task.run(conn)
+        if history is not None:
+            history.record(
+                conn, named_task.path, started_at, time.perf_counter() - start, stats
+            )
+        conn.commit()
+
 
-    def __init__(self, steps: list[NamedTask]) -> None:
+class TaskSequence:
+    """An executable sequence of tasks
+
+    Args:
+        steps: tasks in the order of execution
+        dependencies: for each task, the tasks in this sequence that must be run before it
+            (directly or through tasks not included in the sequence).
+            If ``None``, every task depends on the previous one
+    """
+
+    def __init__(
+        self,
+        steps: list[NamedTask],
+        dependencies: Optional[dict[TreePath, set[TreePath]]] = None,
+    ) -> None:
         self.steps = steps
+        self.dependencies = dependencies
+
+    def predecessors(self, path: TreePath) -> Iterable[TreePath]:
+        """Tasks that must be finished before this one can run"""
+
+        if self.dependencies is not None:
+            return self.dependencies.get(path, set())
+
+        for previous, named_task in zip(self.steps, self.steps[1:]):
+            if named_task.path == path:
+                return {previous.path}
+        return set()
+
+    def _successors(self) -> dict[TreePath, list[TreePath]]:
+        successors: dict[TreePath, list[TreePath]] = {
+            named_task.path: [] for named_task in self.steps
+        }
+        for named_task in self.steps:
+            for predecessor in self.predecessors(named_task.path):
+                successors[predecessor].append(named_task.path)
+
+        return successors
+
+    def remaining_durations(
+        self, durations: Mapping[TreePath, float]
+    ) -> dict[TreePath, float]:
+        """For each task, the expected time from its start until all of its descendants are done,
+        assuming there are enough jobs to run every independent branch at once
+
+        Args:
+            durations: expected duration of each task, missing tasks count as 0
+        """
+
+        successors = self._successors()
+        remaining: dict[TreePath, float] = {}
+        for named_task in reversed(self.steps):
+            remaining[named_task.path] = durations.get(named_task.path, 0) + max(
+                (remaining[child] for child in successors[named_task.path]),
+                default=0,
+            )
+
+        return remaining
+
+    def critical_path(
+        self, durations: Mapping[TreePath, float]
+    ) -> tuple[float, list[NamedTask]]:
+        """Find the chain of dependent tasks that takes the longest to run
+
+        Args:
+            durations: expected duration of each task, missing tasks count as 0
+        Returns:
+            expected end-to-end time and the tasks along the critical path
+        """
+
+        if not self.steps:
+            return 0, []
+
+        remaining = self.remaining_durations(durations)
+        successors = self._successors()
+        by_path = {named_task.path: named_task for named_task in self.steps}
+
+        path = max(remaining, key=remaining.__getitem__)
+        chain = [by_path[path]]
+        while successors[path]:
+            path = max(successors[path], key=remaining.__getitem__)
+            chain.append(by_path[path])
+
+        return remaining[chain[0].path], chain
+
+    def run(
+        self,
+        conn: "ConnectionExt",
+        jobs: int = 1,
+        limits: Optional[Mapping[str, int]] = None,
+        history: Optional[RunHistory] = None,
+        profiler: Optional[TaskProfiler] = None,
+    ):
+        """Run, committing after each successful task
+
+        Args:
+            jobs: if more than 1, run up to this many independent tasks at the same time,
+                each on its own connection (see :py:class:`ralsei.graph.Scheduler`)
+            limits: maximum combined weight of running tasks for each resource tag,
+                only relevant when ``jobs`` is more than 1
+            history: if set, record the timings of each task.
+                When running in parallel, tasks on the critical path (by past durations) are started first
+            profiler: if set, profile each task.
+                With the cProfile backend, tasks are profiled (and so run) one at a time
+        """
+
+        if profiler:
+            profiler.check_jobs(jobs)
+
+        durations: dict[TreePath, float] = {}
+        if history is not None:
+            history.create(conn)
+            if jobs > 1:
+                durations = history.expected_durations(conn)
+            conn.commit()
 
-    def run(self, conn: "ConnectionExt"):
-        """Run, committing after each successful task"""
+        if jobs > 1:
+            from .scheduler import Scheduler
 
-        for named_task in track(self.steps, description="Running tasks..."):
-            if named_task.task.exists(conn):
-                console.print(
-                    f"Skipping [bold green]{named_task.name}[/bold green]: already done"
-                )
-            else:
-                console.print(f"Running [bold green]{named_task.name}")
+            Scheduler(self, jobs, limits, durations).run(conn, history, profiler)
+            return
 
-                named_task.task.run(conn)
-                conn.commit()
+        for named_task in track(self.steps, description="Running tasks..."):
+            _run_task(conn, named_task, history, profiler)
 
     def delete(self, conn: "ConnectionExt"):
         """Delete, committing after each successful task"""
@@ -50,10 +193,17 @@ class TaskSequence:
             named_task.task.delete(conn)
             conn.commit()
 
-    def redo(self, conn: "ConnectionExt"):
+    def redo(
+        self,
+        conn: "ConnectionExt",
+        jobs: int = 1,
+        limits: Optional[Mapping[str, int]] = None,
+        history: Optional[RunHistory] = None,
+        profiler: Optional[TaskProfiler] = None,
+    ):
         """:py:meth:`~TaskSequence.delete` + :py:meth:`~TaskSequence.run`"""
         self.delete(conn)
-        self.run(conn)
+        self.run(conn, jobs, limits, history, profiler)
 
 
 __all__ = ["NamedTask", "TaskSequence"]
@@ -8,6 +8,8 @@ __all__ = [
     "SqlTemplateModule",
     "SqlTemplate",
     "SqlEnvironment",
+    "SqlFile",
+    "TemplateCacheInfo",
     "SqlEnvironmentWrapper",
     "ISqlEnvironment",
 ]
@@ -7,20 +7,32 @@ class SqlAdapter:
 
     def __init__(self) -> None:
         self._mapping: dict[type, Callable[[Any], str]] = {}
+        self._dispatch_cache: dict[type, Callable[[Any], str]] = {}
 
     def register_type[T](self, type_: type[T], to_sql: Callable[[T], str]):
         """Register SQL renderer function for a type"""
 
         self._mapping[type_] = to_sql
+        self._dispatch_cache.clear()
+
+    def _dispatch(self, type_: type) -> Callable[[Any], str]:
+        for parent_class in inspect.getmro(type_):
+            if parent_class in self._mapping:
+                renderer = self._mapping[parent_class]
+                self._dispatch_cache[type_] = renderer
+                return renderer
+
+        raise KeyError("Unsupported type", type_)
 
     def to_sql(self, value: Any) -> str:
         """Get SQL representation of a value"""
 
-        for parent_class in inspect.getmro(type(value)):
-            if parent_class in self._mapping:
-                return self._mapping[parent_class](value)
+        try:
+            renderer = self._dispatch_cache[type(value)]
+        except KeyError:
+            renderer = self._dispatch(type(value))
 
-        raise KeyError("Unsupported type", type(value))
+        return renderer(value)
 
     def format(self, source: str, /, *args, **kwargs) -> str:
         """Similar to :py:meth:`str.format`, but applies :py:meth:`~SqlAdapter.to_sql` to each parameter"""
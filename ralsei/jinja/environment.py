@@ -5,15 +5,21 @@ from typing import (
     Iterable,
     Mapping,
     MutableMapping,
+    NamedTuple,
     Optional,
+    Sequence,
     Type,
     overload,
 )
+import os
 import textwrap
+from dataclasses import dataclass
+from pathlib import Path
 import jinja2
 from jinja2 import StrictUndefined
 from jinja2.environment import TemplateModule
 from jinja2.nodes import Template as TemplateNode
+from jinja2.utils import LRUCache
 import itertools
 from sqlalchemy import TextClause
 
@@ -107,6 +113,35 @@ class SqlTemplate(jinja2.Template):
         return SqlTemplateModule(self, ctx)
 
 
+@dataclass(frozen=True)
+class SqlFile:
+    """Name of a template file, accepted in place of a template string
+
+    The file is loaded from the directories given to :py:meth:`SqlEnvironment.set_template_dirs`,
+    so it's only parsed once and its compiled form can persist between runs
+
+    Example:
+        .. code-block:: python
+
+            "unnest": CreateTableSql(
+                sql=SqlFile("unnest.sql"),
+                table=Table("new_table"),
+            )
+    """
+
+    name: str
+    """Template name, a ``/``-separated path relative to one of the template directories"""
+
+
+class TemplateCacheInfo(NamedTuple):
+    """Statistics of :py:meth:`SqlEnvironment.from_string` template cache"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 def create_adapter(env: SqlEnvironment):
     adapter = SqlAdapter()
     adapter.register_type(str, lambda value: "'{}'".format(value.replace("'", "''")))
@@ -123,14 +158,28 @@ class SqlEnvironment(jinja2.Environment):
 
     Args:
         dialect_info: dialect-specific settings
+        template_cache_size: number of compiled templates kept by :py:meth:`~from_string`,
+            so that rendering the same source again skips parsing and compilation
+            (``0`` disables the cache)
     """
 
-    def __init__(self, dialect_info: DialectInfo = BaseDialectInfo):
+    def __init__(
+        self,
+        dialect_info: DialectInfo = BaseDialectInfo,
+        template_cache_size: int = 1000,
+    ):
         super().__init__(undefined=StrictUndefined)
 
         self._adapter = create_adapter(self)
         self._dialect_info = dialect_info
 
+        self._template_cache_size = template_cache_size
+        self._template_cache = LRUCache(template_cache_size)
+        # Compiled code is shared between templates created with different globals
+        self._code_cache = LRUCache(template_cache_size)
+        self._template_cache_hits = 0
+        self._template_cache_misses = 0
+
         def finalize(value: Any) -> str | jinja2.Undefined:
             if isinstance(value, jinja2.Undefined):
                 return value
@@ -191,7 +240,7 @@ class SqlEnvironment(jinja2.Environment):
     @overload
     def from_string(
         self,
-        source: str | TemplateNode,
+        source: str | SqlFile | TemplateNode,
         globals: Optional[MutableMapping[str, Any]] = None,
         template_class: None = None,
     ) -> SqlTemplate: ...
@@ -201,45 +250,159 @@ class SqlEnvironment(jinja2.Environment):
         TEMPLATE: jinja2.Template
     ](
         self,
-        source: str | TemplateNode,
+        source: str | SqlFile | TemplateNode,
         globals: Optional[MutableMapping[str, Any]] = None,
         template_class: Optional[type[TEMPLATE]] = None,
     ) -> TEMPLATE: ...
 
     def from_string(
         self,
-        source: str | TemplateNode,
+        source: str | SqlFile | TemplateNode,
         globals: Optional[MutableMapping[str, Any]] = None,
         template_class: Optional[Type[jinja2.Template]] = None,
     ) -> jinja2.Template:
         """See :py:meth:`jinja2.Environment.from_string`
 
         By default, the template class will be :py:class:`SqlTemplate`
+
+        The source may also be a :py:class:`SqlFile`,
+        loaded from the directories set by :py:meth:`~set_template_dirs`
+
+        Templates are cached,
+        keyed by the source text, the template class and the identity of ``globals``
+        (pass the same mapping to reuse the template).
+        Their compiled code is cached by the source text alone.
+        Templates loaded from files are also reloaded if the file has been modified
         """
 
-        return super().from_string(
-            textwrap.dedent(source).strip() if isinstance(source, str) else source,
-            globals,
-            template_class,
+        if isinstance(source, TemplateNode) or self._template_cache_size <= 0:
+            return self.__compile_template(source, globals, template_class)
+
+        key = (source, template_class, id(globals))
+        if (
+            (cached := self._template_cache.get(key))
+            and cached[0] is globals
+            and cached[1].is_up_to_date
+        ):
+            self._template_cache_hits += 1
+            return cached[1]
+
+        self._template_cache_misses += 1
+        template = self.__compile_template(source, globals, template_class)
+        # Keeping a reference to globals, so that its id can't be reused while cached
+        self._template_cache[key] = (globals, template)
+        return template
+
+    def __compile_template(
+        self,
+        source: str | SqlFile | TemplateNode,
+        globals: Optional[MutableMapping[str, Any]],
+        template_class: Optional[Type[jinja2.Template]],
+    ) -> jinja2.Template:
+        if isinstance(source, SqlFile):
+            if self.loader is None:
+                raise TypeError("Template directories not set, can't load SqlFile")
+            if template_class is not None:
+                raise ValueError("Custom template_class is not supported for SqlFile")
+
+            # Loading a fresh template rather than using get_template(),
+            # which would update the globals of a template shared with other callers
+            return self.loader.load(self, source.name, self.make_globals(globals))
+
+        if isinstance(source, TemplateNode) or self._template_cache_size <= 0:
+            return super().from_string(
+                textwrap.dedent(source).strip() if isinstance(source, str) else source,
+                globals,
+                template_class,
+            )
+
+        if (code := self._code_cache.get(source)) is None:
+            code = self.compile(textwrap.dedent(source).strip())
+            self._code_cache[source] = code
+
+        return (template_class or self.template_class).from_code(
+            self, code, self.make_globals(globals), None
+        )
+
+    def set_template_dirs(
+        self,
+        searchpath: str | os.PathLike[str] | Sequence[str | os.PathLike[str]],
+        bytecode_cache: bool | str | os.PathLike[str] = True,
+    ):
+        """Load template files from these directories,
+        both as :py:class:`SqlFile` and with ``{% include %}`` / ``{% import %}`` tags
+
+        Args:
+            searchpath: one or more directories, for example :py:func:`ralsei.utils.folder`
+            bytecode_cache: directory where compiled templates are stored between runs
+                (see :py:class:`jinja2.FileSystemBytecodeCache`),
+                ``True`` for a temporary directory, ``False`` to disable
+
+        Example:
+            .. code-block:: python
+
+                class App(Ralsei):
+                    def _prepare_env(self, env: SqlEnvironment):
+                        env.set_template_dirs(folder().joinpath("sql"))
+        """
+
+        self.loader = jinja2.FileSystemLoader(searchpath)
+
+        if bytecode_cache is True:
+            self.bytecode_cache = jinja2.FileSystemBytecodeCache()
+        elif bytecode_cache is False:
+            self.bytecode_cache = None
+        else:
+            Path(bytecode_cache).mkdir(parents=True, exist_ok=True)
+            self.bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache))
+
+        self.cache_clear()
+
+    def cache_info(self) -> TemplateCacheInfo:
+        """Hit/miss statistics of the compiled template cache"""
+
+        return TemplateCacheInfo(
+            self._template_cache_hits,
+            self._template_cache_misses,
+            self._template_cache_size,
+            len(self._template_cache),
         )
 
-    def render(self, source: str, /, *args: Any, **kwargs: Any) -> str:
+    def cache_clear(self):
+        """Empty the compiled template cache and reset its statistics
+
+        Call this after replacing filters or globals
+        that have already been used by cached templates
+        """
+
+        self._template_cache.clear()
+        self._code_cache.clear()
+        self._template_cache_hits = 0
+        self._template_cache_misses = 0
+
+    def render(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> str:
         """Render template once, shorthand for ``self.from_string().render()``"""
 
         return self.from_string(source).render(*args, **kwargs)
 
-    def render_sql(self, source: str, /, *args: Any, **kwargs: Any) -> TextClause:
+    def render_sql(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> TextClause:
         """Render and wrap with :py:func:`sqlalchemy.sql.expression.text`"""
 
         return self.from_string(source).render_sql(*args, **kwargs)
 
-    def render_split(self, source: str, /, *args: Any, **kwargs: Any) -> list[str]:
+    def render_split(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> list[str]:
         """Render as multiple statements, splitting on ``{%split%}`` tag"""
 
         return self.from_string(source).render_split(*args, **kwargs)
 
     def render_sql_split(
-        self, source: str, /, *args: Any, **kwargs: Any
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
     ) -> list[TextClause]:
         """Render as multiple statements, splitting on ``{%split%}`` tag, wrap with :py:func:`sqlalchemy.sql.expression.text`"""
 
@@ -253,4 +416,10 @@ class SqlEnvironment(jinja2.Environment):
         return self
 
 
-__all__ = ["SqlTemplateModule", "SqlTemplate", "SqlEnvironment"]
+__all__ = [
+    "SqlTemplateModule",
+    "SqlTemplate",
+    "SqlEnvironment",
+    "SqlFile",
+    "TemplateCacheInfo",
+]
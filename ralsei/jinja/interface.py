@@ -4,7 +4,7 @@ from sqlalchemy.sql.elements import TextClause
 
 from ralsei.dialect import DialectInfo
 
-from .environment import SqlTemplate, SqlEnvironment
+from .environment import SqlTemplate, SqlEnvironment, SqlFile
 from .adapter import SqlAdapter
 
 
@@ -25,7 +25,7 @@ class ISqlEnvironment(Protocol):
 
     def from_string(
         self,
-        source: str | TemplateNode,
+        source: str | SqlFile | TemplateNode,
         globals: Optional[MutableMapping[str, Any]] = None,
         template_class: None = None,
     ) -> SqlTemplate:
@@ -35,20 +35,26 @@ class ISqlEnvironment(Protocol):
         """
         ...
 
-    def render(self, source: str, /, *args: Any, **kwargs: Any) -> str:
+    def render(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> str:
         """Render template once, shorthand for ``self.from_string().render()``"""
         ...
 
-    def render_sql(self, source: str, /, *args: Any, **kwargs: Any) -> TextClause:
+    def render_sql(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> TextClause:
         """Render and wrap with :py:func:`sqlalchemy.sql.expression.text`"""
         ...
 
-    def render_split(self, source: str, /, *args: Any, **kwargs: Any) -> list[str]:
+    def render_split(
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
+    ) -> list[str]:
         """Render as multiple statements, splitting on ``{%split%}`` tag"""
         ...
 
     def render_sql_split(
-        self, source: str, /, *args: Any, **kwargs: Any
+        self, source: str | SqlFile, /, *args: Any, **kwargs: Any
     ) -> list[TextClause]:
         """Render as multiple statements, splitting on ``{%split%}`` tag, wrap with :py:func:`sqlalchemy.sql.expression.text`"""
         ...
@@ -1,3 +1,4 @@
+from collections import ChainMap
 from typing import TYPE_CHECKING, Any, MutableMapping, Optional
 from jinja2.nodes import Template as TemplateNode
 from sqlalchemy.sql.elements import TextClause
@@ -5,13 +6,17 @@ from sqlalchemy.sql.elements import TextClause
 from ralsei.dialect import DialectInfo
 
 if TYPE_CHECKING:
-    from .environment import SqlEnvironment, SqlTemplate
+    from .environment import SqlEnvironment, SqlTemplate, SqlFile
     from .adapter import SqlAdapter
 
 
 class SqlEnvironmentWrapper:
     """Layer on top of :py:class:`ralsei.jinja.SqlEnvironment` with extra local variables
 
+    The locals map is layered over the environment globals as-is, without copying,
+    and is the same mapping on every call,
+    so templates created for these locals are cached and reused across renders
+
     Args:
         env: the base environment
         locals: local variables map
@@ -35,7 +40,7 @@ class SqlEnvironmentWrapper:
 
     def from_string(
         self,
-        source: str | TemplateNode,
+        source: "str | SqlFile | TemplateNode",
         globals: Optional[MutableMapping[str, Any]] = None,
         template_class: None = None,
     ) -> "SqlTemplate":
@@ -45,30 +50,38 @@ class SqlEnvironmentWrapper:
         """
 
         return self.__inner.from_string(
-            source, {**self.__locals, **(globals or {})}, template_class
+            source,
+            ChainMap(globals, self.__locals) if globals else self.__locals,
+            template_class,
         )
 
-    def render(self, source: str, /, *args: Any, **kwargs: Any) -> str:
+    def render(
+        self, source: "str | SqlFile", /, *args: Any, **kwargs: Any
+    ) -> str:
         """Render template once, shorthand for ``self.from_string().render()``"""
 
-        return self.__inner.render(source, *args, **self.__locals, **kwargs)
+        return self.from_string(source).render(*args, **kwargs)
 
-    def render_sql(self, source: str, /, *args: Any, **kwargs: Any) -> TextClause:
+    def render_sql(
+        self, source: "str | SqlFile", /, *args: Any, **kwargs: Any
+    ) -> TextClause:
         """Render and wrap with :py:func:`sqlalchemy.sql.expression.text`"""
 
-        return self.__inner.render_sql(source, *args, **self.__locals, **kwargs)
+        return self.from_string(source).render_sql(*args, **kwargs)
 
-    def render_split(self, source: str, /, *args: Any, **kwargs: Any) -> list[str]:
+    def render_split(
+        self, source: "str | SqlFile", /, *args: Any, **kwargs: Any
+    ) -> list[str]:
         """Render as multiple statements, splitting on ``{%split%}`` tag"""
 
-        return self.__inner.render_split(source, *args, **self.__locals, **kwargs)
+        return self.from_string(source).render_split(*args, **kwargs)
 
     def render_sql_split(
-        self, source: str, /, *args: Any, **kwargs: Any
+        self, source: "str | SqlFile", /, *args: Any, **kwargs: Any
     ) -> list[TextClause]:
         """Render as multiple statements, splitting on ``{%split%}`` tag, wrap with :py:func:`sqlalchemy.sql.expression.text`"""
 
-        return self.__inner.render_sql_split(source, *args, **self.__locals, **kwargs)
+        return self.from_string(source).render_sql_split(*args, **kwargs)
 
     @property
     def base(self) -> "SqlEnvironment":
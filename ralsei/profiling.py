@@ -0,0 +1,278 @@
+import cProfile
+import importlib.util
+import os
+import pstats
+import sys
+import sysconfig
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Iterator, Literal
+
+from rich.table import Table
+
+from ralsei.console import console
+
+type Category = Literal["ralsei", "database", "user", "other"]
+
+_RALSEI_PACKAGES = ("ralsei", "jinja2", "markupsafe", "rich")
+"""Packages counted as framework overhead (rendering, adapting values, progress bars)"""
+_DATABASE_PACKAGES = (
+    "sqlalchemy",
+    "sqlite3",
+    "psycopg",
+    "psycopg2",
+    "asyncpg",
+    "pg8000",
+    "pymysql",
+    "MySQLdb",
+)
+
+
+@cache
+def _package_dirs(names: tuple[str, ...]) -> tuple[str, ...]:
+    dirs: list[str] = []
+    for name in names:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            continue
+        if spec and spec.submodule_search_locations:
+            dirs.extend(
+                os.path.join(os.path.abspath(dir), "")
+                for dir in spec.submodule_search_locations
+            )
+        elif spec and spec.origin:
+            dirs.append(os.path.abspath(spec.origin))
+
+    return tuple(dirs)
+
+
+def categorize(file: str, function: str) -> Category:
+    """Sort a profiled function into one of the summary categories
+
+    Args:
+        file: source file, or ``~`` for builtins
+        function: function name (for builtins, includes the type it's a method of)
+    """
+
+    if file == "~":
+        if any(name in function for name in _DATABASE_PACKAGES):
+            return "database"
+        return "other"
+
+    path = os.path.abspath(file)
+    if path.startswith(_package_dirs(_RALSEI_PACKAGES)):
+        return "ralsei"
+    if path.startswith(_package_dirs(_DATABASE_PACKAGES)):
+        return "database"
+
+    for install_path in {
+        sysconfig.get_path("stdlib"),
+        sysconfig.get_path("platstdlib"),
+        sysconfig.get_path("purelib"),
+        sysconfig.get_path("platlib"),
+    }:
+        if install_path and path.startswith(install_path):
+            return "other"
+
+    return "user"
+
+
+@dataclass
+class FunctionTime:
+    """Self time of a single function"""
+
+    file: str
+    line: int
+    function: str
+    self_time: float
+
+    @property
+    def category(self) -> Category:
+        return categorize(self.file, self.function)
+
+    @property
+    def location(self) -> str:
+        """File (relative to the import path it's found in) and line number"""
+
+        if self.file == "~":
+            return "~"
+
+        path = os.path.abspath(self.file)
+        for root in sorted(map(os.path.abspath, sys.path), key=len, reverse=True):
+            if root and path.startswith(os.path.join(root, "")):
+                path = os.path.relpath(path, root)
+                break
+
+        return f"{path}:{self.line}"
+
+
+def _cprofile_times(profile: cProfile.Profile) -> list[FunctionTime]:
+    stats = pstats.Stats(profile)
+    return [
+        FunctionTime(file, line, function, self_time)
+        for (file, line, function), (_, _, self_time, _, _) in stats.stats.items()  # type: ignore
+        if "_lsprof.Profiler" not in function
+    ]
+
+
+def _pyinstrument_times(frame) -> list[FunctionTime]:
+    times: dict[tuple[str, int, str], float] = {}
+    stack = [frame]
+    while stack:
+        frame = stack.pop()
+        stack.extend(frame.children)
+
+        key = (frame.file_path or "~", frame.line_no or 0, frame.function or "")
+        times[key] = times.get(key, 0) + frame.total_self_time
+
+    return [FunctionTime(*key, self_time) for key, self_time in times.items()]
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+class TaskProfiler:
+    """Profiles each task's :py:meth:`ralsei.task.Task.run`,
+    saving one file per task and printing a summary of where the time went
+
+    Functions are grouped into:
+
+    * ``ralsei`` - ralsei itself, jinja and rich (rendering, adapting values, progress bars)
+    * ``database`` - SQLAlchemy and the database driver
+    * ``user`` - code outside of the installed packages, such as the task's ``fn``
+    * ``other`` - the standard library and other installed packages
+
+    Args:
+        output_dir: directory for the profiles, named after the task path
+        top: number of functions with the most self time to print
+        backend: ``"pyinstrument"`` (sampling, saves speedscope files),
+            ``"cprofile"`` (deterministic, saves ``.pstats`` files),
+            or ``"auto"`` to use pyinstrument if it's installed
+    """
+
+    def __init__(
+        self,
+        output_dir: str | os.PathLike[str],
+        top: int = 10,
+        backend: Literal["auto", "cprofile", "pyinstrument"] = "auto",
+    ) -> None:
+        if backend == "auto":
+            try:
+                import pyinstrument  # type: ignore # noqa: F401
+
+                backend = "pyinstrument"
+            except ImportError:
+                backend = "cprofile"
+
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.backend = backend
+        self.__cprofile_lock = threading.Lock()
+
+    def check_jobs(self, jobs: int):
+        """Warn that with the cProfile backend, ``jobs`` tasks won't run at the same time"""
+
+        if jobs > 1 and self.backend == "cprofile":
+            console.print(
+                "cProfile can only profile one task at a time,"
+                " tasks will run one after another despite --jobs",
+                style="yellow",
+            )
+
+    @contextmanager
+    def profile(self, name: str, concurrent: bool = False) -> Iterator[None]:
+        """Profile the code inside this context manager
+
+        cProfile can only profile one thread at a time,
+        so with that backend, concurrent tasks wait for each other here.
+        Either backend only sees the calling thread
+
+        Args:
+            name: task name, used for the file name
+            concurrent: whether the task calls its function outside of the calling thread,
+                in which case the time spent there is missing from the profile
+        """
+
+        if concurrent:
+            console.print(
+                f"{name} calls its function in workers, time spent there"
+                " is missing from the profile (use workers=1 for an accurate one)",
+                style="yellow",
+                markup=False,
+            )
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.backend == "pyinstrument":
+            from pyinstrument import Profiler  # type: ignore
+            from pyinstrument.renderers import SpeedscopeRenderer  # type: ignore
+
+            profiler = Profiler(async_mode="disabled")
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+
+                output = self.output_dir / f"{name}.speedscope.json"
+                output.write_text(profiler.output(SpeedscopeRenderer()))
+                root = profiler.last_session and profiler.last_session.root_frame()
+                self.__summarize(
+                    name, output, _pyinstrument_times(root) if root else []
+                )
+        else:
+            with self.__cprofile_lock:
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    yield
+                finally:
+                    profile.disable()
+
+                    output = self.output_dir / f"{name}.pstats"
+                    profile.dump_stats(output)
+                    self.__summarize(name, output, _cprofile_times(profile))
+
+    def __summarize(self, name: str, output: Path, times: list[FunctionTime]):
+        totals: dict[Category, float] = {
+            "ralsei": 0,
+            "database": 0,
+            "user": 0,
+            "other": 0,
+        }
+        for function_time in times:
+            totals[function_time.category] += function_time.self_time
+
+        table = Table(
+            "Function",
+            "Location",
+            "Category",
+            "Self time",
+            title=f"Top self time: {name}",
+            title_justify="left",
+        )
+        for function_time in sorted(times, key=lambda f: f.self_time, reverse=True)[
+            : self.top
+        ]:
+            table.add_row(
+                function_time.function,
+                function_time.location,
+                function_time.category,
+                _format_seconds(function_time.self_time),
+            )
+
+        console.print(table)
+        console.print(
+            " | ".join(
+                f"{category}: [bold]{_format_seconds(total)}[/bold]"
+                for category, total in totals.items()
+            )
+        )
+        console.print(f"Profile saved to {output}")
+
+
+__all__ = ["TaskProfiler", "FunctionTime", "categorize"]
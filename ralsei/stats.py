@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional, Self
+import sqlalchemy
+from sqlalchemy import event
+
+
+@dataclass
+class TaskStats:
+    """Counters collected while a task is running, stored in :py:class:`ralsei.graph.RunHistory`"""
+
+    rows_read: Optional[int] = None
+    """Number of input rows, ``None`` if the task doesn't process rows in python"""
+    rows_written: Optional[int] = None
+    """Number of inserted or updated rows, ``None`` if the task doesn't process rows in python"""
+    fn_time: float = 0
+    """Seconds the task has spent in the user function (or waiting for its results)"""
+    db_time: float = 0
+    """Seconds spent executing SQL statements"""
+
+    def count_read(self, rows: int = 1):
+        self.rows_read = (self.rows_read or 0) + rows
+
+    def count_written(self, rows: int = 1):
+        self.rows_written = (self.rows_written or 0) + rows
+
+    def time_fn[R](self, fn: Callable[[], R]) -> R:
+        """Call ``fn``, adding the time it took to :py:attr:`~fn_time`"""
+
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.fn_time += time.perf_counter() - start
+
+    def time_fn_iter[T](self, fn: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """Iterate over the result of ``fn``,
+        adding the time spent in ``fn`` and the iterator to :py:attr:`~fn_time`"""
+
+        iterator = iter(self.time_fn(fn))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.fn_time += time.perf_counter() - start
+
+            yield item
+
+    @contextmanager
+    def collect(self, conn: sqlalchemy.Connection) -> Iterator[Self]:
+        """Make these stats :py:func:`current <current_task_stats>`
+        and time the statements executed on ``conn``"""
+
+        started: list[float] = []
+
+        def before_execute(*_: Any):
+            started.append(time.perf_counter())
+
+        def after_execute(*_: Any):
+            if started:
+                self.db_time += time.perf_counter() - started.pop()
+
+        event.listen(conn, "before_cursor_execute", before_execute)
+        event.listen(conn, "after_cursor_execute", after_execute)
+        token = TASK_STATS_VAR.set(self)
+        try:
+            yield self
+        finally:
+            TASK_STATS_VAR.reset(token)
+            event.remove(conn, "before_cursor_execute", before_execute)
+            event.remove(conn, "after_cursor_execute", after_execute)
+
+
+TASK_STATS_VAR: ContextVar[TaskStats] = ContextVar("TASK_STATS")
+"""ContextVar storing the stats of the currently running task"""
+
+
+def current_task_stats() -> TaskStats:
+    """Stats of the currently running task,
+    or a throwaway object if the task isn't being recorded"""
+
+    return TASK_STATS_VAR.get(None) or TaskStats()
+
+
+__all__ = ["TaskStats", "TASK_STATS_VAR", "current_task_stats"]
@@ -0,0 +1,81 @@
+import time
+from typing import Any, Callable, Optional
+
+
+class Throttle:
+    """Fires after a given number of ticks or after a time interval has passed,
+    whichever comes first
+
+    Args:
+        every: number of ticks, ``None`` means no limit
+        interval: time in seconds since the last reset, ``None`` means no limit
+    """
+
+    def __init__(self, every: Optional[int] = 1, interval: Optional[float] = None):
+        if every is not None and every < 1:
+            raise ValueError("Throttle count must be at least 1")
+
+        self._every = every
+        self._interval = interval
+        self.reset()
+
+    def reset(self):
+        self._ticks = 0
+        self._started = time.monotonic()
+
+    def tick(self) -> bool:
+        """Register one tick
+
+        Returns:
+            ``True`` if the throttle fired (the counter is reset in that case)
+        """
+
+        self._ticks += 1
+        if (self._every is not None and self._ticks >= self._every) or (
+            self._interval is not None
+            and time.monotonic() - self._started >= self._interval
+        ):
+            self.reset()
+            return True
+
+        return False
+
+
+class RowBuffer:
+    """Accumulates rows and passes them to ``on_flush`` in batches
+
+    Args:
+        on_flush: callback receiving the list of buffered rows
+        batch_size: flush once this many rows have been collected
+        flush_interval: flush once this many seconds have passed since the previous flush
+            (checked whenever a new row is added)
+    """
+
+    def __init__(
+        self,
+        on_flush: Callable[[list[dict[str, Any]]], Any],
+        batch_size: int = 1,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        self._on_flush = on_flush
+        self._throttle = Throttle(batch_size, flush_interval)
+        self._rows: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append(self, row: dict[str, Any]):
+        self._rows.append(row)
+        if self._throttle.tick():
+            self.flush()
+
+    def flush(self):
+        """Pass all the buffered rows to ``on_flush``, does nothing if the buffer is empty"""
+
+        self._throttle.reset()
+        if self._rows:
+            rows, self._rows = self._rows, []
+            self._on_flush(rows)
+
+
+__all__ = ["Throttle", "RowBuffer"]
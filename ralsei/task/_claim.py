@@ -0,0 +1,146 @@
+import itertools
+import time
+import uuid
+from typing import Any, Callable, Iterator, Sequence
+import sqlalchemy
+from sqlalchemy import TextClause
+
+from ralsei.types import Table, IdColumn, ColumnRendered, Sql
+from ralsei.jinja import ISqlEnvironment
+from ralsei.connection import ConnectionEnvironment
+from ralsei.connection._length_hint import StreamedResult
+from ralsei import db_actions
+
+
+class RowClaimer:
+    """Lets multiple processes split the input rows of a task between them
+
+    Batches of rows are claimed by writing a unique token and a lease expiry time
+    into additional columns of the source table, committing right away.
+    On dialects with :py:attr:`~ralsei.dialect.BaseDialectInfo.supports_skip_locked`,
+    rows being claimed by someone else are skipped rather than waited for. |br|
+    Rows whose lease has expired (because the worker processing them has died)
+    are claimed again.
+
+    Args:
+        env: environment to render the scripts with
+        source: table the input rows come from
+        select: the task's select statement, must exclude the rows that are already done
+            and return the id fields under the same names
+        id_fields: columns that uniquely identify a row in ``source``
+        claim_size: number of rows claimed at once
+        lease_seconds: how long a claim lasts
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        source: Table,
+        select: TextClause,
+        id_fields: Sequence[IdColumn],
+        claim_size: int,
+        lease_seconds: float,
+    ) -> None:
+        if not id_fields:
+            raise ValueError("Claiming rows requires id_fields")
+        if claim_size < 1:
+            raise ValueError("Claim size must be at least 1")
+
+        self._select = select
+        self._lease_seconds = lease_seconds
+
+        token = ColumnRendered("__claim_token", "TEXT")
+        until = ColumnRendered("__claimed_until", "DOUBLE PRECISION")
+        self.add_lease = db_actions.AddColumns(
+            env, source, [token, until], if_not_exists=True
+        )
+        self.drop_lease = db_actions.DropColumns(
+            env, source, [token, until], if_exists=True
+        )
+
+        locals: dict[str, Any] = {
+            "source": source,
+            "select": Sql(select.text.strip().rstrip(";")),
+            "ids": [id_field.identifier for id_field in id_fields],
+            "token": token.identifier,
+            "until": until.identifier,
+            "claim_size": claim_size,
+            "skip_locked": env.dialect_info.supports_skip_locked,
+        }
+        self.claim = env.render_sql(
+            """\
+            UPDATE {{source}}
+            SET {{token}} = :__token, {{until}} = :__until
+            WHERE ({{ids | join(', ')}}) IN (
+                SELECT {{ids | join(', ')}} FROM {{source}}
+                WHERE ({{ids | join(', ')}}) IN (
+                    SELECT {{ids | join(', ')}} FROM (
+                    {{select}}
+                    ) AS __pending
+                )
+                AND ({{until}} IS NULL OR {{until}} < :__now)
+                LIMIT {{claim_size}}
+                {%- if skip_locked %}
+                FOR UPDATE SKIP LOCKED
+                {%- endif %}
+            );""",
+            **locals,
+        )
+        self.select_claimed = env.render_sql(
+            """\
+            SELECT * FROM (
+            {{select}}
+            ) AS __claimed
+            WHERE ({{ids | join(', ')}}) IN (
+                SELECT {{ids | join(', ')}} FROM {{source}}
+                WHERE {{token}} = :__token
+            );""",
+            **locals,
+        )
+
+    def execute(
+        self, conn: ConnectionEnvironment, checkpoint: Callable[[], None]
+    ) -> StreamedResult:
+        """Claim and iterate over batches of rows until there are none left
+
+        Args:
+            conn: database connection
+            checkpoint: called before claiming a new batch, must commit the work done so far
+                (the claim itself is committed right away)
+
+        Returns:
+            rows with the number of remaining rows (for all processes) as the length hint
+        """
+
+        return StreamedResult(
+            self._iter_rows(conn, checkpoint), conn.count_rows(self._select)
+        )
+
+    def _iter_rows(
+        self, conn: ConnectionEnvironment, checkpoint: Callable[[], None]
+    ) -> Iterator[sqlalchemy.Row[Any]]:
+        prefix = uuid.uuid4().hex
+
+        for batch in itertools.count():
+            checkpoint()
+
+            token = f"{prefix}_{batch}"
+            now = time.time()
+            conn.sqlalchemy.execute(
+                self.claim,
+                {"__token": token, "__now": now, "__until": now + self._lease_seconds},
+            )
+            conn.sqlalchemy.commit()
+
+            rows = conn.sqlalchemy.execute(
+                self.select_claimed, {"__token": token}
+            ).all()
+            # End the read transaction, so that the next one begins with a write
+            # (on SQLite, upgrading a read transaction to a write one may deadlock)
+            conn.sqlalchemy.commit()
+            if not rows:
+                return
+            yield from rows
+
+
+__all__ = ["RowClaimer"]
@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+from uuid import UUID
+import sqlalchemy
+from sqlalchemy import TextClause
+
+from ralsei.types import Table, Placeholder, ValueColumnRendered
+from ralsei.jinja import ISqlEnvironment
+from ralsei.connection import ConnectionEnvironment
+
+
+def _to_array_literal(values: list[Any] | tuple[Any, ...]) -> str:
+    def element(value: Any) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, (list, tuple)):
+            return _to_array_literal(value)
+        text = str(_to_csv_value(value))
+        return '"{}"'.format(text.replace("\\", "\\\\").replace('"', '\\"'))
+
+    return "{" + ",".join(map(element, values)) + "}"
+
+
+def _to_csv_value(value: Any) -> Any:
+    """Format a value the way Postgres parses it from CSV,
+    mirroring how the driver adapts it for ``INSERT``"""
+
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if value is None or isinstance(value, (str, int, float, Decimal, UUID)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return f"{value.total_seconds()} seconds"
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return _to_array_literal(value)
+
+    raise TypeError(
+        f"Can't load a value of type {type(value).__name__} with COPY,"
+        " convert it in fn or disable use_copy"
+    )
+
+
+def _write_csv(rows: Sequence[dict[str, Any]], keys: Sequence[str]) -> str:
+    buffer = io.StringIO()
+    # Unquoted empty fields are NULL, quoted ones are empty strings
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator="\n")
+    for row in rows:
+        writer.writerow(_to_csv_value(row[key]) for key in keys)
+
+    return buffer.getvalue()
+
+
+def _copy_from_stdin(conn: ConnectionEnvironment, statement: str, data: str):
+    # Make sure sqlalchemy knows about the transaction the driver is about to open
+    if not conn.sqlalchemy.in_transaction():
+        conn.sqlalchemy.begin()
+
+    driver_connection: Any = conn.sqlalchemy.connection.driver_connection
+    cursor = driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, io.StringIO(data))
+        else:  # psycopg
+            with cursor.copy(statement) as copy:
+                copy.write(data)
+    finally:
+        cursor.close()
+
+
+class CopyLoader:
+    """Loads rows with PostgreSQL's ``COPY ... FROM STDIN`` in CSV format
+
+    Columns whose value is a :py:class:`ralsei.types.Placeholder` are copied directly.
+    If there are columns with other values (like ``Sql("NOW()")``),
+    rows are copied into a temporary staging table first
+    and moved with ``INSERT ... SELECT``, computing those values along the way.
+
+    Args:
+        env: environment to render the scripts with
+        table: target table
+        columns: columns being inserted
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        table: Table,
+        columns: Sequence[ValueColumnRendered],
+    ) -> None:
+        copied = [col for col in columns if isinstance(col.value, Placeholder)]
+        computed = [col for col in columns if not isinstance(col.value, Placeholder)]
+
+        for column in computed:
+            if TextClause(env.adapter.to_sql(column.value)).compile().params:
+                raise ValueError(
+                    f"Column {column.name} can't be loaded with COPY, "
+                    "its value depends on bind parameters other than a single Placeholder"
+                )
+
+        self._keys = [col.value.name for col in copied]
+        self.create_staging: Optional[TextClause] = None
+        self.move_staging: Optional[TextClause] = None
+        self.truncate_staging: Optional[TextClause] = None
+        self.drop_staging: Optional[TextClause] = None
+
+        if computed:
+            locals: dict[str, Any] = {
+                "table": table,
+                "staging": Table(f"__copy_{table.name}"),
+                "copied": copied,
+                "columns": columns,
+            }
+            self.create_staging = env.render_sql(
+                """\
+                CREATE TEMPORARY TABLE {{staging}} AS
+                SELECT {{copied | join(', ', attribute='identifier')}}
+                FROM {{table}}
+                WHERE FALSE;""",
+                **locals,
+            )
+            self.copy = env.render(
+                """\
+                COPY {{staging}}({{copied | join(', ', attribute='identifier')}})
+                FROM STDIN WITH (FORMAT csv)""",
+                **locals,
+            )
+            self.move_staging = env.render_sql(
+                """\
+                INSERT INTO {{table}}(
+                    {{ columns | join(',\\n    ', attribute='identifier') }}
+                )
+                SELECT
+                    {%set sep = joiner(',\\n    ')-%}
+                    {%for column in columns-%}
+                    {{sep()}}
+                    {%-if column in copied-%}
+                    {{column.identifier}}
+                    {%-else-%}
+                    {{column.value}}
+                    {%-endif%}
+                    {%-endfor%}
+                FROM {{staging}};""",
+                **locals,
+            )
+            self.truncate_staging = env.render_sql("TRUNCATE {{staging}};", **locals)
+            self.drop_staging = env.render_sql(
+                "DROP TABLE IF EXISTS {{staging}};", **locals
+            )
+        else:
+            self.copy = env.render(
+                """\
+                COPY {{table}}({{copied | join(', ', attribute='identifier')}})
+                FROM STDIN WITH (FORMAT csv)""",
+                table=table,
+                copied=copied,
+            )
+
+    @staticmethod
+    def is_supported(conn: ConnectionEnvironment) -> bool:
+        """Whether the dialect and the driver of this connection support ``COPY``"""
+
+        if not conn.dialect_info.supports_copy:
+            return False
+
+        cursor = conn.sqlalchemy.connection.driver_connection.cursor()  # type: ignore
+        try:
+            return hasattr(cursor, "copy_expert") or hasattr(cursor, "copy")
+        finally:
+            cursor.close()
+
+    def prepare(self, conn: ConnectionEnvironment):
+        """Create the staging table, if needed"""
+
+        if self.create_staging is not None and self.drop_staging is not None:
+            conn.sqlalchemy.execute(self.drop_staging)
+            conn.sqlalchemy.execute(self.create_staging)
+
+    def load(self, conn: ConnectionEnvironment, rows: Sequence[dict[str, Any]]):
+        """Load a batch of rows"""
+
+        _copy_from_stdin(conn, self.copy, _write_csv(rows, self._keys))
+        if self.move_staging is not None and self.truncate_staging is not None:
+            conn.sqlalchemy.execute(self.move_staging)
+            conn.sqlalchemy.execute(self.truncate_staging)
+
+    def cleanup(self, conn: ConnectionEnvironment):
+        """Drop the staging table, if it was created"""
+
+        if self.drop_staging is not None:
+            conn.sqlalchemy.execute(self.drop_staging)
+
+
+__all__ = ["CopyLoader"]
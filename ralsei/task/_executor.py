@@ -0,0 +1,477 @@
+import asyncio
+import inspect
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import AsyncExitStack, ExitStack, contextmanager
+from functools import partial
+from multiprocessing.util import Finalize
+from multiprocessing.context import BaseContext
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+    cast,
+    overload,
+)
+
+from ralsei.contextmanagers import (
+    AsyncContextManager,
+    ContextManager,
+    MultiContextManager,
+)
+
+from ralsei.utils import expect
+from ralsei.wrappers import is_async
+
+from .rowcontext import RowContext
+
+type Deferred[R] = Callable[[], R]
+"""Function that returns the result of :py:attr:`fn`
+(or raises the exception it has thrown)"""
+
+type MappedRows[R] = Iterator[tuple[dict[str, Any], Deferred[R]]]
+
+type AnyContextManager = ContextManager[Any] | AsyncContextManager[Any]
+
+
+class _CollectRows:
+    """Wraps a generator function so that it returns a list of rows
+
+    Unlike a closure, can be pickled (as long as the wrapped function can),
+    so it can be sent to a worker process
+    """
+
+    def __init__(self, fn: Callable[..., Iterable[dict[str, Any]]]) -> None:
+        self.fn = fn
+
+    def __call__(self, **kwargs: Any) -> list[dict[str, Any]]:
+        return list(self.fn(**kwargs))
+
+
+class _CollectRowsAsync:
+    """Same as :py:class:`_CollectRows`, for async generator functions"""
+
+    def __init__(self, fn: Callable[..., AsyncIterable[dict[str, Any]]]) -> None:
+        self.fn = fn
+
+    async def __call__(self, **kwargs: Any) -> list[dict[str, Any]]:
+        return [row async for row in self.fn(**kwargs)]
+
+
+@overload
+def collect_rows(
+    fn: Callable[..., AsyncIterable[dict[str, Any]]]
+) -> Callable[..., Awaitable[list[dict[str, Any]]]]: ...
+@overload
+def collect_rows(
+    fn: Callable[..., Iterable[dict[str, Any]]]
+) -> Callable[..., list[dict[str, Any]]]: ...
+def collect_rows(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a (sync or async) generator function so that it returns a list of rows"""
+
+    if inspect.isasyncgenfunction(fn):
+        return _CollectRowsAsync(fn)
+    return _CollectRows(fn)
+
+
+def _sync_context_managers(
+    context_managers: Mapping[str, AnyContextManager]
+) -> dict[str, ContextManager[Any]]:
+    for name, value in context_managers.items():
+        if not hasattr(value, "__enter__"):
+            raise TypeError(
+                f"Async context manager {name} can only be used with an async fn"
+            )
+
+    return cast(dict[str, ContextManager[Any]], dict(context_managers))
+
+
+def _call_in_row_context[
+    R
+](
+    fn: Callable[..., R],
+    popped_fields: set[str],
+    context: dict[str, Any],
+    input_row: dict[str, Any],
+) -> R:
+    with RowContext.from_input_row(input_row, popped_fields):
+        return fn(**input_row, **context)
+
+
+def _map_pending[
+    T, R
+](
+    submit: Callable[[T], Future[R]],
+    items: Iterable[T],
+    max_pending: int,
+    ordered: bool,
+) -> Generator[tuple[T, Deferred[R]], None, None]:
+    """Submit items, keeping at most ``max_pending`` of them in flight"""
+
+    if ordered:
+        queue: deque[tuple[T, Future[R]]] = deque()
+
+        def pop_ready(limit: int):
+            while len(queue) > limit:
+                item, future = queue.popleft()
+                yield item, future.result
+
+        try:
+            for item in items:
+                queue.append((item, submit(item)))
+                yield from pop_ready(max_pending - 1)
+            yield from pop_ready(0)
+        finally:
+            for _, future in queue:
+                future.cancel()
+    else:
+        pending: dict[Future[R], T] = {}
+
+        def pop_ready(limit: int):
+            while len(pending) > limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result
+
+        try:
+            for item in items:
+                pending[submit(item)] = item
+                yield from pop_ready(max_pending - 1)
+            yield from pop_ready(0)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class RowExecutor:
+    """Strategy for calling the task's :py:attr:`fn` on each input row
+
+    The caller's thread stays the only one touching the database,
+    results are handed back to it as :py:type:`Deferred` values.
+
+    Args:
+        workers: number of input rows processed concurrently,
+            ``1`` means everything is done sequentially in the calling thread
+        ordered: if ``False``, results are returned as soon as they are ready
+            rather than in the order of input rows
+        max_pending: maximum number of submitted rows whose results haven't been consumed yet,
+            defaults to ``2 * workers``
+    """
+
+    def __init__(
+        self, workers: int = 1, ordered: bool = True, max_pending: Optional[int] = None
+    ) -> None:
+        if workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+
+        self.workers = workers
+        self.ordered = ordered
+        self.max_pending = max(max_pending or 2 * workers, 1)
+
+    @property
+    def is_concurrent(self) -> bool:
+        """Whether :py:attr:`fn` runs outside of the calling thread"""
+        return self.workers > 1
+
+    def _create_pool(self) -> Executor:
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="ralsei")
+
+    @contextmanager
+    def map[
+        R
+    ](
+        self,
+        fn: Callable[..., Awaitable[R]] | Callable[..., R],
+        input_rows: Iterable[dict[str, Any]],
+        context_managers: Mapping[str, AnyContextManager],
+        popped_fields: set[str],
+    ) -> Iterator[MappedRows[R]]:
+        """Enter the context managers and apply ``fn`` to each input row
+
+        When running sequentially, ``fn`` is only called once the deferred value is requested,
+        so a generator's output is still consumed lazily.
+        Otherwise, ``fn`` must return a fully evaluated result.
+        Coroutine functions are awaited, so the deferred value is the coroutine's result
+
+        Yields:
+            iterator of input rows and the deferred results of ``fn``
+        """
+
+        sync_fn = cast(Callable[..., R], fn)
+
+        with MultiContextManager(_sync_context_managers(context_managers)) as context:
+            if not self.is_concurrent:
+                yield (
+                    (input_row, partial(sync_fn, **input_row, **context))
+                    for input_row in input_rows
+                )
+                return
+
+            with self._create_pool() as pool:
+                results = _map_pending(
+                    lambda input_row: pool.submit(
+                        _call_in_row_context, sync_fn, popped_fields, context, input_row
+                    ),
+                    input_rows,
+                    self.max_pending,
+                    self.ordered,
+                )
+                try:
+                    yield results
+                finally:
+                    results.close()
+                    pool.shutdown(wait=True, cancel_futures=True)
+
+
+class AsyncRowExecutor(RowExecutor):
+    """Runs coroutines on an event loop in a background thread
+
+    Here, ``workers`` is the number of coroutines awaited concurrently.
+    Async context managers are entered on the event loop
+    """
+
+    @property
+    def is_concurrent(self) -> bool:
+        return True
+
+    @staticmethod
+    async def _enter_context(
+        stack: AsyncExitStack, context_managers: Mapping[str, AnyContextManager]
+    ) -> dict[str, Any]:
+        context: dict[str, Any] = {}
+        for name, value in context_managers.items():
+            if hasattr(value, "__aenter__"):
+                context[name] = await stack.enter_async_context(
+                    cast(AsyncContextManager[Any], value)
+                )
+            else:
+                context[name] = stack.enter_context(cast(ContextManager[Any], value))
+
+        return context
+
+    @staticmethod
+    async def _cancel_remaining():
+        current = asyncio.current_task()
+        remaining = [task for task in asyncio.all_tasks() if task is not current]
+        for task in remaining:
+            task.cancel()
+        await asyncio.gather(*remaining, return_exceptions=True)
+
+    @contextmanager
+    def map[
+        R
+    ](
+        self,
+        fn: Callable[..., Awaitable[R]] | Callable[..., R],
+        input_rows: Iterable[dict[str, Any]],
+        context_managers: Mapping[str, AnyContextManager],
+        popped_fields: set[str],
+    ) -> Iterator[MappedRows[R]]:
+        async_fn = cast(Callable[..., Awaitable[R]], fn)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever, name="ralsei-asyncio", daemon=True
+        )
+        thread.start()
+
+        def run[T](coroutine: Coroutine[Any, Any, T]) -> Future[T]:
+            return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+        try:
+            stack = AsyncExitStack()
+            context = run(self._enter_context(stack, context_managers)).result()
+            semaphore = asyncio.Semaphore(self.workers)
+
+            async def call(input_row: dict[str, Any]):
+                async with semaphore:
+                    with RowContext.from_input_row(input_row, popped_fields):
+                        return await async_fn(**input_row, **context)
+
+            results = _map_pending(
+                lambda input_row: run(call(input_row)),
+                input_rows,
+                self.max_pending,
+                self.ordered,
+            )
+            try:
+                yield results
+            finally:
+                results.close()
+                run(self._cancel_remaining()).result()
+                run(stack.aclose()).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+type _ChunkResult = tuple[list[Any], Optional[BaseException]]
+
+_worker_state: Optional[tuple[Callable[..., Any], dict[str, Any], set[str]]] = None
+
+
+def _init_process_worker(
+    fn: Callable[..., Any],
+    context_managers: Mapping[str, ContextManager[Any]],
+    popped_fields: set[str],
+):
+    global _worker_state
+
+    stack = ExitStack()
+    context = {
+        name: stack.enter_context(value) for name, value in context_managers.items()
+    }
+    # Exit the context managers when the worker process shuts down
+    Finalize(None, stack.close, exitpriority=10)
+
+    _worker_state = (fn, context, popped_fields)
+
+
+def _process_chunk(input_rows: list[dict[str, Any]]) -> _ChunkResult:
+    fn, context, popped_fields = expect(
+        _worker_state, RuntimeError("Worker process not initialized")
+    )
+
+    results: list[Any] = []
+    for input_row in input_rows:
+        try:
+            results.append(
+                _call_in_row_context(fn, popped_fields, context, input_row)
+            )
+        except Exception as err:
+            return results, err
+
+    return results, None
+
+
+def _return[R](value: R) -> R:
+    return value
+
+
+def _raise(error: BaseException):
+    raise error
+
+
+class ProcessRowExecutor(RowExecutor):
+    """Sends chunks of input rows to a :py:class:`concurrent.futures.ProcessPoolExecutor`
+
+    Each worker process enters its own copy of the context managers.
+
+    Worker processes are started with the platform's default start method.
+    Unless it's ``fork`` (the default on Linux before Python 3.14),
+    ``fn`` and the context managers are pickled,
+    so they must be defined at module level.
+    Input rows and results always have to be picklable.
+
+    Args:
+        chunk_size: number of input rows sent to a worker process at once
+        max_pending: maximum number of chunks in flight
+        mp_context: multiprocessing context to start the workers with,
+            such as ``multiprocessing.get_context("spawn")``
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        ordered: bool = True,
+        max_pending: Optional[int] = None,
+        chunk_size: int = 1,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        super().__init__(workers, ordered, max_pending)
+
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self.chunk_size = chunk_size
+        self.mp_context = mp_context
+
+    @property
+    def is_concurrent(self) -> bool:
+        return True
+
+    @contextmanager
+    def map[
+        R
+    ](
+        self,
+        fn: Callable[..., Awaitable[R]] | Callable[..., R],
+        input_rows: Iterable[dict[str, Any]],
+        context_managers: Mapping[str, AnyContextManager],
+        popped_fields: set[str],
+    ) -> Iterator[MappedRows[R]]:
+        with ProcessPoolExecutor(
+            self.workers,
+            mp_context=self.mp_context,
+            initializer=_init_process_worker,
+            initargs=(fn, _sync_context_managers(context_managers), popped_fields),
+        ) as pool:
+            chunks = _map_pending(
+                partial(pool.submit, _process_chunk),
+                map(list, itertools.batched(input_rows, self.chunk_size)),
+                self.max_pending,
+                self.ordered,
+            )
+
+            def iter_results() -> MappedRows[R]:
+                for chunk, deferred in chunks:
+                    results, error = deferred()
+
+                    for input_row, result in zip(chunk, results):
+                        yield input_row, partial(_return, result)
+                    if error:
+                        yield chunk[len(results)], partial(_raise, error)
+
+            try:
+                yield iter_results()
+            finally:
+                chunks.close()
+                pool.shutdown(wait=True, cancel_futures=True)
+
+
+def create_executor(
+    fn: Callable[..., Any],
+    executor: Literal["thread", "process"] = "thread",
+    workers: int = 1,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+    chunk_size: int = 1,
+) -> RowExecutor:
+    """Choose the :py:class:`RowExecutor` implementation based on task settings"""
+
+    if is_async(fn):
+        if executor == "process":
+            raise ValueError("Async functions can't be run in a process pool")
+        return AsyncRowExecutor(workers, ordered, max_pending)
+    elif executor == "process":
+        return ProcessRowExecutor(workers, ordered, max_pending, chunk_size)
+    elif executor == "thread":
+        return RowExecutor(workers, ordered, max_pending)
+    else:
+        raise ValueError(f"Unknown executor: {executor}")
+
+
+__all__ = [
+    "Deferred",
+    "RowExecutor",
+    "AsyncRowExecutor",
+    "ProcessRowExecutor",
+    "collect_rows",
+    "create_executor",
+]
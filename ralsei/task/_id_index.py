@@ -0,0 +1,102 @@
+from typing import Optional, Sequence
+
+from ralsei.types import Table, IdColumn, Identifier, Sql
+from ralsei.jinja import ISqlEnvironment
+from ralsei.connection import ConnectionEnvironment
+from ralsei import db_actions
+
+
+class IdIndex:
+    """Index on the ``id_fields`` of a table updated row by row,
+    without which every ``UPDATE ... WHERE id_fields`` is a full table scan
+
+    Args:
+        env: environment to render the scripts with
+        table: table being updated
+        id_fields: columns that uniquely identify a row in ``table``
+        enabled: whether to create the index if no existing one covers ``id_fields``
+
+    The index has a deterministic name (see :py:func:`ralsei.db_actions.default_index_name`),
+    so deleting the task drops it even from a new session
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        table: Table,
+        id_fields: Sequence[IdColumn],
+        enabled: bool = True,
+    ) -> None:
+        self._table = table
+        self._columns = [id_field.name for id_field in id_fields]
+        self.enabled = enabled
+        self.created = False
+        """Whether the index has been created by :py:meth:`ensure` in this session"""
+
+        self.create = db_actions.CreateIndex(env, table, self._columns)
+        self.drop = db_actions.DropIndex(env, table, self._columns)
+
+    def ensure(self, conn: ConnectionEnvironment):
+        """Create the index, unless :py:attr:`~enabled` is ``False``
+        or another index already covers ``id_fields``"""
+
+        if not self.enabled or db_actions.index_exists(
+            conn, self._table, self._columns
+        ):
+            return
+
+        self.create(conn)
+        self.created = True
+
+    def drop_if_created(self, conn: ConnectionEnvironment):
+        """Drop the index if it has been created by :py:meth:`ensure`,
+        rather than having existed before the run"""
+
+        if self.created:
+            self.drop(conn)
+            self.created = False
+
+    def diagnose(self, conn: ConnectionEnvironment) -> list[str]:
+        """Warn if no index covers ``id_fields``"""
+
+        if not db_actions.table_exists(conn, self._table) or db_actions.index_exists(
+            conn, self._table, self._columns
+        ):
+            return []
+
+        return [
+            "No index on {}({}), updating a row scans the whole table{}".format(
+                self._table,
+                ", ".join(self._columns),
+                (
+                    " (one will be created before running)"
+                    if self.enabled
+                    else ", consider index_id_fields=True"
+                ),
+            )
+        ]
+
+
+def create_pending_index(
+    env: ISqlEnvironment,
+    table: Table,
+    is_done_column: str,
+    id_fields: Optional[Sequence[IdColumn]],
+) -> db_actions.CreateIndex:
+    """Partial index on the rows not yet marked as done,
+    covering ``id_fields`` if known, otherwise the marker itself"""
+
+    return db_actions.CreateIndex(
+        env,
+        table,
+        (
+            [id_field.name for id_field in id_fields]
+            if id_fields
+            else [is_done_column]
+        ),
+        name=db_actions.default_index_name(table, [is_done_column]),
+        where=Sql(env.render("NOT {{is_done}}", is_done=Identifier(is_done_column))),
+    )
+
+
+__all__ = ["IdIndex", "create_pending_index"]
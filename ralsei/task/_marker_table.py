@@ -0,0 +1,96 @@
+from typing import Sequence
+from sqlalchemy import TextClause
+
+from ralsei.types import Table, IdColumn, Identifier, Sql
+from ralsei.jinja import ISqlEnvironment
+from ralsei.connection import ConnectionEnvironment
+from ralsei.sql_description import AsStatements
+
+
+class Statements(AsStatements):
+    """Action executing a list of statements in order"""
+
+    def __init__(self, statements: list[TextClause]) -> None:
+        self.statements = statements
+
+    def as_statements(self) -> list[str]:
+        return [str(statement) for statement in self.statements]
+
+    def __call__(self, conn: ConnectionEnvironment):
+        conn.sqlalchemy.executescript(self.statements)
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self.statements))
+
+
+class MarkerTable:
+    """Tracks processed rows in a narrow side table keyed by ``id_fields``,
+    so that marking a row as done doesn't rewrite the (possibly wide) source row
+
+    Args:
+        env: environment to render the scripts with
+        source: table whose rows are being tracked
+        table: the side table
+        id_fields: columns that uniquely identify a row in ``source``
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        source: Table,
+        table: Table,
+        id_fields: Sequence[IdColumn],
+    ) -> None:
+        if not id_fields:
+            raise ValueError("Must provide id_fields to track rows in a side table")
+
+        locals = {
+            "source": source,
+            "table": table,
+            "index": Identifier(f"{table.name}__ids"),
+            "id_fields": id_fields,
+        }
+
+        self.is_done = Sql(
+            env.render(
+                """\
+                {%-set sep = joiner('AND ')-%}
+                EXISTS (SELECT 1 FROM {{table}} WHERE
+                {%-for id in id_fields%} {{sep()}}{{table}}.{{id.identifier}} = {{source}}.{{id.identifier}}
+                {%-endfor%})""",
+                **locals,
+            )
+        )
+        """Renders to ``EXISTS (SELECT 1 FROM table WHERE table.id = source.id)``"""
+        self.create = Statements(
+            [
+                env.render_sql(
+                    """\
+                    CREATE TABLE IF NOT EXISTS {{table}} AS
+                    SELECT {{id_fields | join(', ', attribute='identifier')}}
+                    FROM {{source}}
+                    WHERE FALSE;""",
+                    **locals,
+                ),
+                env.render_sql(
+                    """\
+                    CREATE UNIQUE INDEX IF NOT EXISTS {{index}}
+                    ON {{table}}({{id_fields | join(', ', attribute='identifier')}});""",
+                    **locals,
+                ),
+            ]
+        )
+        self.insert = env.render_sql(
+            """\
+            INSERT INTO {{table}}({{id_fields | join(', ', attribute='identifier')}})
+            VALUES ({{id_fields | join(', ', attribute='value')}})
+            ON CONFLICT DO NOTHING;""",
+            **locals,
+        )
+        """Marks a row as done, rows that are already marked are skipped"""
+        self.drop = Statements(
+            [env.render_sql("DROP TABLE IF EXISTS {{table}};", **locals)]
+        )
+
+
+__all__ = ["Statements", "MarkerTable"]
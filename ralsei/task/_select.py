@@ -0,0 +1,103 @@
+from typing import Any, Iterator, Optional, Sequence
+import sqlalchemy
+from sqlalchemy import TextClause
+
+from ralsei.types import Sql, Identifier, Placeholder
+from ralsei.jinja import ISqlEnvironment
+from ralsei.connection import ConnectionEnvironment
+from ralsei.connection._length_hint import StreamedResult
+
+
+def _as_subquery(select: TextClause) -> Sql:
+    return Sql(select.text.strip().rstrip(";"))
+
+
+def render_select_any(env: ISqlEnvironment, select: TextClause) -> TextClause:
+    """Wrap the select so that the database can stop at the first row"""
+
+    return env.render_sql(
+        "SELECT 1 FROM (\n{{select}}\n) AS __any LIMIT 1;",
+        select=_as_subquery(select),
+    )
+
+
+class KeysetPagination:
+    """Pages through a select statement ordered by ``keys``,
+    using ``WHERE (keys) > (last keys) ORDER BY keys LIMIT page_size``
+
+    Every page is a short, separate query,
+    so no cursor or snapshot is held open between pages
+
+    Args:
+        env: environment to render the queries with
+        select: the wrapped statement, must return all of ``keys`` as columns
+        keys: columns that uniquely identify the output rows of ``select``
+        page_size: number of rows per page
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        select: TextClause,
+        keys: Sequence[str],
+        page_size: int,
+    ) -> None:
+        if not keys:
+            raise ValueError("Keyset pagination requires id_fields")
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1")
+
+        self._select = select
+        self._keys = list(keys)
+        self._page_size = page_size
+
+        template = """\
+            SELECT * FROM (
+            {{select}}
+            ) AS __page
+            {%- if after %}
+            WHERE ({{keys | join(', ')}}) > ({{after | join(', ')}})
+            {%- endif %}
+            ORDER BY {{keys | join(', ')}}
+            LIMIT {{page_size}};"""
+        locals: dict[str, Any] = {
+            "select": _as_subquery(select),
+            "keys": [Identifier(key) for key in self._keys],
+            "page_size": page_size,
+        }
+
+        self.first_page = env.render_sql(template, **locals, after=None)
+        self.next_page = env.render_sql(
+            template,
+            **locals,
+            after=[Placeholder(f"__after_{i}") for i in range(len(self._keys))],
+        )
+
+    def execute(self, conn: ConnectionEnvironment) -> StreamedResult:
+        """Iterate over all rows of the select statement, page by page
+
+        Returns:
+            rows with the total row count as the length hint
+        """
+
+        return StreamedResult(self._iter_rows(conn), conn.count_rows(self._select))
+
+    def _iter_rows(self, conn: ConnectionEnvironment) -> Iterator[sqlalchemy.Row[Any]]:
+        after: Optional[dict[str, Any]] = None
+
+        while True:
+            rows = conn.sqlalchemy.execute(
+                self.next_page if after else self.first_page, after
+            ).all()
+            yield from rows
+
+            if len(rows) < self._page_size:
+                return
+
+            last_row = rows[-1]._mapping
+            after = {
+                f"__after_{i}": last_row[key] for i, key in enumerate(self._keys)
+            }
+
+
+__all__ = ["render_select_any", "KeysetPagination"]
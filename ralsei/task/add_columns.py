@@ -2,7 +2,7 @@ from typing import Any, Sequence
 
 from ralsei.connection import ConnectionEnvironment
 from ralsei.graph import Resolves
-from ralsei.types import Table, ColumnBase, ColumnRendered
+from ralsei.types import Table, View, ColumnBase, ColumnRendered
 from ralsei import db_actions
 
 from .base import TaskImpl
@@ -28,15 +28,26 @@ class AddColumnsTask(TaskImpl):
         columns: Sequence[ColumnBase],
         *,
         if_not_exists: bool = False,
+        indexes: Sequence[db_actions.CreateIndex] = (),
     ):
         self._table = self.resolve(table)
+        if isinstance(self._table, View):
+            raise ValueError(
+                f"Can't add columns to the view {self._table}."
+                " If it's the output of MapToNewColumns with output_table,"
+                " set output_table on this task as well"
+            )
 
         self._columns = [col.render(self.env, table=self._table) for col in columns]
         self._add_columns = db_actions.AddColumns(
-            self.env, self._table, self._columns, if_not_exists=if_not_exists
+            self.env,
+            self._table,
+            self._columns,
+            if_not_exists=if_not_exists,
+            indexes=indexes,
         )
         self._drop_columns = db_actions.DropColumns(
-            self.env, self._table, self._columns, if_exists=True
+            self.env, self._table, self._columns, if_exists=True, indexes=indexes
         )
 
     @property
@@ -2,6 +2,7 @@ from typing import Optional, Sequence
 from sqlalchemy import TextClause
 
 from ralsei.graph import Resolves
+from ralsei.jinja import SqlFile
 from ralsei.types import Table, ColumnBase
 from ralsei.utils import expect
 from ralsei.connection import ConnectionEnvironment
@@ -38,11 +39,13 @@ class AddColumnsSql(TaskDef):
             )
 
     Note:
-        You can use :py:func:`ralsei.utils.folder` to find SQL files relative to current file
+        You can use :py:func:`ralsei.utils.folder` to find SQL files relative to current file,
+        or load them with :py:class:`ralsei.jinja.SqlFile`,
+        so that they aren't recompiled on every run
     """
 
-    sql: str | list[str]
-    """Sql template strings
+    sql: str | SqlFile | list[str | SqlFile]
+    """Sql template strings (or template files, see :py:class:`ralsei.jinja.SqlFile`)
 
     Individual statements must be either separated by ``{%split%}`` tag or pre-split into a list
     """
@@ -61,7 +64,7 @@ class AddColumnsSql(TaskDef):
             def render_script() -> (
                 tuple[list[TextClause], Optional[Sequence[ColumnBase]]]
             ):
-                if isinstance(this.sql, str):
+                if isinstance(this.sql, (str, SqlFile)):
                     template_module = self.env.from_string(this.sql).make_module(
                         {"table": table}
                     )
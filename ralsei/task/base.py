@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar, Iterable, Self, dataclass_transform
+from typing import Any, ClassVar, Iterable, Mapping, Self, dataclass_transform
 from dataclasses import dataclass, field
 
 from ralsei.jinja import SqlEnvironment, ISqlEnvironment, SqlEnvironmentWrapper
@@ -51,6 +51,29 @@ class Task(ABC):
     def creation_script(self) -> list[str]:
         return []
 
+    @property
+    def resources(self) -> Mapping[str, int]:
+        """Resources held by this task while it's running, as ``{tag: weight}``
+
+        Used by :py:class:`ralsei.graph.Scheduler` to limit how many tasks
+        sharing a tag can run at the same time
+        """
+        return {}
+
+    @property
+    def is_concurrent(self) -> bool:
+        """Whether the task calls its function outside of the calling thread
+        (in a thread pool, worker processes or on an event loop)"""
+        return False
+
+    def diagnose(self, conn: ConnectionExt) -> list[str]:
+        """Inspect the database for problems that would make the task run slowly
+
+        Returns:
+            human-readable warnings, printed by the ``describe`` command
+        """
+        return []
+
 
 @dataclass_transform(kw_only_default=True)
 class TaskDefMeta(type):
@@ -73,6 +96,7 @@ class TaskImpl[D](Task):
     env: ISqlEnvironment
     __scripts: dict[str, list[str]]
     __creation_script: list[str]
+    __resources: dict[str, int]
     """You can save your sql scripts here when you render them,
     the key-value pairs will be returned by :py:meth:`~TaskImpl.scripts`
 
@@ -89,6 +113,7 @@ class TaskImpl[D](Task):
 
         self.__scripts = {}
         self.__creation_script = []
+        self.__resources = dict(getattr(this, "resources", {}))
         self.prepare(this)
 
     def prepare(self, this: D):
@@ -118,6 +143,9 @@ class TaskImpl[D](Task):
     def exists(self, conn: ConnectionExt) -> bool:
         return self._exists(ConnectionEnvironment(conn, self.env))
 
+    def diagnose(self, conn: ConnectionExt) -> list[str]:
+        return self._diagnose(ConnectionEnvironment(conn, self.env))
+
     @abstractmethod
     def _run(self, conn: ConnectionEnvironment):
         """Run the task"""
@@ -130,6 +158,10 @@ class TaskImpl[D](Task):
     def _exists(self, conn: ConnectionEnvironment) -> bool:
         """Check if task has already been done"""
 
+    def _diagnose(self, conn: ConnectionEnvironment) -> list[str]:
+        """Inspect the database for problems that would make the task run slowly"""
+        return []
+
     def _set_script(self, name: str, value: object, creation: bool = False):
         statements = as_statements(value)
 
@@ -147,6 +179,10 @@ class TaskImpl[D](Task):
     def creation_script(self) -> list[str]:
         return self.__creation_script
 
+    @property
+    def resources(self) -> Mapping[str, int]:
+        return self.__resources
+
 
 class TaskDef(metaclass=TaskDefMeta):
     """Stores task aguments before said task is created
@@ -171,6 +207,11 @@ class TaskDef(metaclass=TaskDefMeta):
 
     locals: dict[str, Any] = field(default_factory=dict)
     """Local variables added to the jinja environment"""
+    resources: dict[str, int] = field(default_factory=dict)
+    """Resources held by the task while it's running, as ``{tag: weight}``,
+    for example ``{"network:site-a": 1, "db-heavy": 1}`` |br|
+    When running in parallel, tasks whose combined weight would exceed a tag's limit
+    are not run at the same time (see :py:class:`ralsei.graph.Scheduler`)"""
 
     def create(self, env: SqlEnvironment) -> TaskImpl[Self]:
         """Instantiate the associated :py:attr:`~Impl`"""
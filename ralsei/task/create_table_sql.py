@@ -1,4 +1,5 @@
 from ralsei.connection import ConnectionEnvironment
+from ralsei.jinja import SqlFile
 from ralsei.types import Table
 
 from .base import TaskDef
@@ -36,11 +37,13 @@ class CreateTableSql(TaskDef):
             )
 
     Note:
-        You can use :py:func:`ralsei.utils.folder` to find SQL files relative to current file
+        You can use :py:func:`ralsei.utils.folder` to find SQL files relative to current file,
+        or load them with :py:class:`ralsei.jinja.SqlFile`,
+        so that they aren't recompiled on every run
     """
 
-    sql: str | list[str]
-    """Sql template strings
+    sql: str | SqlFile | list[str | SqlFile]
+    """Sql template strings (or template files, see :py:class:`ralsei.jinja.SqlFile`)
 
     Individual statements must be either separated by ``{%split%}`` tag or pre-split into a list
     """
@@ -55,7 +58,7 @@ class CreateTableSql(TaskDef):
 
             self.__sql = (
                 self.env.render_sql_split(this.sql, **locals)
-                if isinstance(this.sql, str)
+                if isinstance(this.sql, (str, SqlFile))
                 else [self.env.render_sql(sql, **locals) for sql in this.sql]
             )
             self._prepare_table(this.table, this.view)
@@ -1,23 +1,42 @@
-from dataclasses import field
-from typing import Any, Optional, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Literal, Optional, Sequence, cast
+import sqlalchemy
+from sqlalchemy import TextClause
 
 from ralsei.console import track
 from ralsei.graph import Resolves
+from ralsei.stats import current_task_stats
 from ralsei.types import (
     Table,
+    View,
     ValueColumnBase,
     IdColumn,
     ValueColumnRendered,
     Identifier,
 )
-from ralsei.wrappers import OneToOne, get_popped_fields
+from ralsei.wrappers import AnyOneToOne, OneToOne, get_popped_fields
 from ralsei.connection import ConnectionEnvironment
-from ralsei.contextmanagers import ContextManager, MultiContextManager
+from ralsei.contextmanagers import ContextManager, AsyncContextManager
 from ralsei import db_actions
 
 from .base import TaskDef
 from .add_columns import AddColumnsTask
 from .rowcontext import RowContext
+from ._buffer import RowBuffer, Throttle
+from ._claim import RowClaimer
+from ._id_index import IdIndex, create_pending_index
+from ._marker_table import MarkerTable, Statements
+from ._select import KeysetPagination, render_select_any
+from ._executor import create_executor
+
+
+@dataclass
+class StagingScripts:
+    create: TextClause
+    insert: TextClause
+    update: TextClause
+    truncate: TextClause
+    drop: TextClause
 
 
 class MapToNewColumns(TaskDef):
@@ -28,6 +47,7 @@ class MapToNewColumns(TaskDef):
 
     - `table=`:py:attr:`~table`
     - `is_done=`:py:attr:`~is_done_column` (as :py:class:`ralsei.types.Identifier`)
+      or an ``EXISTS`` check against :py:attr:`~is_done_table`
 
     Example:
         .. code-block:: python
@@ -96,17 +116,24 @@ class MapToNewColumns(TaskDef):
 
     Used for ``ADD COLUMN`` and ``UPDATE`` statement generation.
     """
-    fn: OneToOne
+    fn: AnyOneToOne
     """Function that maps one row to values of the new columns
     in the same row
 
+    May also be an ``async def`` coroutine function, in which case it runs on an event loop,
+    with up to :py:attr:`~workers` rows being processed at once
+
     If :py:attr:`~id_fields` argument is omitted, will try to infer the ``id_fields``
     from metadata left by :py:func:`ralsei.wrappers.pop_id_fields`
     """
-    context: dict[str, ContextManager[Any]] = field(default_factory=dict)
+    context: dict[str, ContextManager[Any] | AsyncContextManager[Any]] = field(
+        default_factory=dict
+    )
     """
     Task-scoped context-manager arguments passed to :py:attr:`~fn`
 
+    Async context managers are only supported when ``fn`` is async
+
     Example:
         .. code-block:: python
 
@@ -131,19 +158,166 @@ class MapToNewColumns(TaskDef):
     """Create a boolean column with the given name
     in :py:attr:`~table` that tracks which rows have been processed
 
-    If set, the task will commit after each successful run of :py:attr:`~fn`,
+    If set, the task will commit after each successful run of :py:attr:`~fn`
+    (or less often, see :py:attr:`~commit_every_rows`),
     allowing you to stop and resume from the same place.
 
     Note:
         Make sure to include ``WHERE NOT {{is_done}}`` in your :py:attr:`~select` statement
     """
+    pending_index: bool = False
+    """Create a partial index on the rows of :py:attr:`~table`
+    not yet marked by :py:attr:`~is_done_column` (``WHERE NOT is_done``)
+
+    Selecting the pending rows near the end of a long run then takes index time
+    instead of scanning all the rows that are already done. |br|
+    Indexes :py:attr:`~id_fields` if known, otherwise the marker itself.
+    The index is dropped along with the marker column
+    """
+    is_done_table: Optional[Table] = None
+    """Track processed rows in a separate narrow table keyed by :py:attr:`~id_fields`
+    instead of :py:attr:`~is_done_column`
+
+    Marking a row as done then inserts into this table
+    rather than rewriting the whole (possibly wide) row of :py:attr:`~table` once more.
+    ``{{is_done}}`` renders as an ``EXISTS`` subquery correlated with ``{{table}}``,
+    so :py:attr:`~table` must be referenced as ``{{table}}``, without an alias
+    """
+    output_table: Optional[Table] = None
+    """Instead of adding :py:attr:`~columns` to :py:attr:`~table` and updating its rows,
+    insert them into this 1:1 side table keyed by :py:attr:`~id_fields`
+
+    Avoids rewriting the whole (possibly wide) row of :py:attr:`~table` on every update. |br|
+    The task's output becomes :py:attr:`~output_view`, joining the two tables back together.
+    Since a view can't be altered, a downstream task adding columns to it
+    must use ``output_table`` as well.
+    The task is resumable in this mode, with ``{{is_done}}`` checking for the row in the side table
+    (so :py:attr:`~is_done_column` and :py:attr:`~is_done_table` can't be used)
+    """
+    output_view: Optional[Table] = None
+    """When using :py:attr:`~output_table`, name of the view that joins it with :py:attr:`~table`
+
+    Defaults to ``{output_table}_view``
+    """
     id_fields: Optional[list[IdColumn]] = None
     """Columns that uniquely identify a row in :py:attr:`~table`,
-    so that you can update :py:attr:`~is_done_column`
+    so that you can update :py:attr:`~is_done_column` or :py:attr:`~is_done_table`
 
     This argument takes precedence over ``id_fields`` inferred from
     :py:attr:`~fn`'s metadata
     """
+    index_id_fields: bool = True
+    """Before running, create an index on :py:attr:`~id_fields` in :py:attr:`~table`,
+    unless the primary key or another index already covers them
+
+    Without it, every row-level ``UPDATE`` is a sequential scan. |br|
+    The index is dropped when the task is deleted
+    """
+    keep_id_index: bool = True
+    """If ``False``, drop the index created by :py:attr:`~index_id_fields`
+    as soon as the task finishes (unless it already existed before the run)"""
+    fetch_size: Optional[int] = None
+    """If set, stream input rows from :py:attr:`~select` this many at a time
+    rather than loading the whole result before processing the first row
+
+    The progress bar total then comes from a separate ``COUNT(*)`` query. |br|
+    On PostgreSQL, a ``WITH HOLD`` cursor is used, which the server materializes
+    on the first commit (see :py:attr:`~commit_every_rows`)
+    """
+    keyset_size: Optional[int] = None
+    """Page through :py:attr:`~select` ordered by :py:attr:`~id_fields`,
+    fetching this many rows per page with a separate short query:
+    ``WHERE (id_fields) > (:last_ids) ORDER BY id_fields LIMIT keyset_size``
+
+    Unlike :py:attr:`~fetch_size`, no cursor or snapshot is held open while the task runs,
+    which makes restarting a resumable task on a big table cheap. |br|
+    :py:attr:`~select` must return the id fields as columns,
+    its own ``ORDER BY`` clause is overridden
+    """
+    claim_size: Optional[int] = None
+    """Let multiple processes (possibly on different machines) run this task at the same time,
+    each one claiming batches of this many input rows
+
+    Claims are stored as a lease in additional columns of :py:attr:`~table`,
+    rows being claimed concurrently are skipped with ``FOR UPDATE SKIP LOCKED`` where supported. |br|
+    Requires :py:attr:`~is_done_column` or :py:attr:`~is_done_table`, whose marker is committed along with the results
+    before claiming the next batch. :py:attr:`~select` must return the id fields as columns
+    """
+    lease_seconds: float = 600
+    """When using :py:attr:`~claim_size`, time after which the claimed rows
+    that haven't been marked as done can be claimed by another process
+
+    Compared against each machine's own clock
+    """
+    batch_size: Optional[int] = None
+    """Number of rows to accumulate before applying the updates together
+
+    Defaults to 1, or 1000 with :py:attr:`~bulk_update`
+
+    The buffer is always flushed before :py:attr:`~is_done_column` is committed,
+    so resuming the task never loses or duplicates work.
+    That's why, by default, :py:attr:`~commit_every_rows` is the batch size:
+    committing more often cuts the batches short
+    """
+    flush_interval: Optional[float] = None
+    """Apply the buffered updates once this many seconds have passed since the last flush,
+    even if :py:attr:`~batch_size` hasn't been reached yet"""
+    commit_every_rows: Optional[int] = None
+    """When using :py:attr:`~is_done_column`, commit after this many input rows
+    have been processed, defaults to :py:attr:`~batch_size`
+
+    Markers and outputs are committed in the same transaction,
+    so after a crash the task resumes exactly where the last commit left off,
+    redoing at most this many rows.
+    """
+    commit_every_seconds: Optional[float] = None
+    """When using :py:attr:`~is_done_column`, commit once this many seconds
+    have passed since the previous commit"""
+    workers: int = 1
+    """Number of threads (or processes, see :py:attr:`~executor`) running :py:attr:`~fn` concurrently
+    (or the number of concurrently awaited coroutines, if ``fn`` is async)
+
+    Useful when ``fn`` is mostly waiting on the network. |br|
+    The database is still only accessed from the main thread,
+    which applies the updates and commits the markers as the results come in.
+
+    Note:
+        With ``workers > 1``, objects from :py:attr:`~context` are shared between threads
+    """
+    ordered: bool = True
+    """When using multiple :py:attr:`~workers`, write the results in the order of input rows
+
+    If ``False``, results are written as soon as they are ready
+    """
+    max_pending: Optional[int] = None
+    """Maximum number of input rows (or chunks, with ``executor="process"``)
+    being processed or waiting to be written
+    when using multiple :py:attr:`~workers` (``2 * workers`` by default)"""
+    executor: Literal["thread", "process"] = "thread"
+    """Where :py:attr:`~fn` is run
+
+    * ``"thread"`` - in the main thread, or in a thread pool if there are multiple :py:attr:`~workers`
+    * ``"process"`` - in a pool of worker processes, for CPU-bound functions. |br|
+      Each worker enters its own copy of :py:attr:`~context`,
+      input rows and results are sent between processes in chunks of :py:attr:`~chunk_size`.
+      The main process is still the only one accessing the database.
+
+    Note:
+        With ``"process"``, input rows and results must be picklable.
+        So must :py:attr:`~fn` and :py:attr:`~context`
+        unless the default start method is ``fork`` (Linux before Python 3.14)
+    """
+    chunk_size: int = 16
+    """Number of input rows sent to a worker process at once when using ``executor="process"``"""
+    bulk_update: bool = False
+    """Instead of running the ``UPDATE`` statement once per row,
+    insert each batch into a temporary staging table
+    and apply it with a single ``UPDATE ... FROM`` join
+
+    Falls back to ``executemany`` on dialects without ``UPDATE ... FROM``
+    (see :py:attr:`ralsei.dialect.BaseDialectInfo.supports_update_from`). |br|
+    Only makes a difference with :py:attr:`~batch_size` greater than 1
+    """
 
     class Impl(AddColumnsTask):
         def prepare(self, this: "MapToNewColumns"):
@@ -152,75 +326,395 @@ class MapToNewColumns(TaskDef):
             popped_fields = get_popped_fields(this.fn)
             self.__fn = this.fn
             self.__context = this.context
+            self.__fetch_size = this.fetch_size
+            self.__batch_size = this.batch_size or (1000 if this.bulk_update else 1)
+            self.__flush_interval = this.flush_interval
+            self.__commit_every = (
+                this.commit_every_rows or self.__batch_size,
+                this.commit_every_seconds,
+            )
+            self.__executor = create_executor(
+                this.fn,
+                this.executor,
+                this.workers,
+                this.ordered,
+                this.max_pending,
+                this.chunk_size,
+            )
             self.__popped_fields: set[str] = (
                 set(popped_fields) if popped_fields else set()
             )
 
+            id_fields = this.id_fields or (
+                [IdColumn(name) for name in popped_fields] if popped_fields else None
+            )
+            if this.output_table and (this.is_done_column or this.is_done_table):
+                raise ValueError(
+                    "output_table already tracks progress,"
+                    " can't use is_done_column or is_done_table"
+                )
+
+            self.__source = table
+            self.__side_mode = this.output_table is not None
+            marker_table = this.output_table or this.is_done_table
+            self.__marker_table = (
+                MarkerTable(self.env, table, marker_table, id_fields or [])
+                if marker_table
+                else None
+            )
+            self.__resumable = bool(self.__marker_table or this.is_done_column)
+
             columns_raw = [*this.columns]
             if this.is_done_column:
                 columns_raw.append(
                     ValueColumnRendered(this.is_done_column, "BOOL DEFAULT FALSE", True)
                 )
+            indexes: list[db_actions.CreateIndex] = []
+            if this.pending_index:
+                if not this.is_done_column:
+                    raise ValueError("pending_index requires is_done_column")
+                indexes.append(
+                    create_pending_index(
+                        self.env, table, this.is_done_column, id_fields
+                    )
+                )
             self._prepare_columns(
-                table, columns_raw, if_not_exists=bool(this.is_done_column)
+                this.output_table or table,
+                columns_raw,
+                if_not_exists=self.__resumable,
+                indexes=indexes,
             )
-            self.__commit_each = bool(this.is_done_column)
 
             locals: dict[str, Any] = {"table": table}
-            if this.is_done_column:
+            if self.__marker_table:
+                locals["is_done"] = self.__marker_table.is_done
+            elif this.is_done_column:
                 locals["is_done"] = Identifier(this.is_done_column)
 
             self.__select = self.env.render_sql(this.select, **locals)
-
-            id_fields = this.id_fields or (
-                [IdColumn(name) for name in popped_fields] if popped_fields else None
-            )
-            self.__update = self.env.render_sql(
-                """\
-                UPDATE {{table}} SET
-                {{columns | join(',\\n', attribute='set_statement')}}
-                WHERE
-                {{id_fields | join(' AND ')}};""",
-                table=self._table,
-                columns=self._columns,
-                id_fields=id_fields,
+            self.__select_any = render_select_any(self.env, self.__select)
+            self.__keyset = (
+                KeysetPagination(
+                    self.env,
+                    self.__select,
+                    [id_field.name for id_field in id_fields or []],
+                    this.keyset_size,
+                )
+                if this.keyset_size is not None
+                else None
             )
+            self.__claimer: Optional[RowClaimer] = None
+            if this.claim_size is not None:
+                if not self.__resumable:
+                    raise ValueError(
+                        "Claiming rows requires is_done_column or is_done_table"
+                    )
+                self.__claimer = RowClaimer(
+                    self.env,
+                    table,
+                    self.__select,
+                    id_fields or [],
+                    this.claim_size,
+                    this.lease_seconds,
+                )
+            if self.__side_mode:
+                self.__update = self.env.render_sql(
+                    """\
+                    INSERT INTO {{table}}(
+                        {{id_fields | join(',\\n    ', attribute='identifier')}},
+                        {{columns | join(',\\n    ', attribute='identifier')}}
+                    )
+                    VALUES (
+                        {{id_fields | join(',\\n    ', attribute='value')}},
+                        {{columns | join(',\\n    ', attribute='value')}}
+                    );""",
+                    table=self._table,
+                    columns=self._columns,
+                    id_fields=id_fields,
+                )
+            else:
+                self.__update = self.env.render_sql(
+                    """\
+                    UPDATE {{table}} SET
+                    {{columns | join(',\\n', attribute='set_statement')}}
+                    WHERE
+                    {{id_fields | join(' AND ')}};""",
+                    table=self._table,
+                    columns=self._columns,
+                    id_fields=id_fields,
+                )
 
+            self.__staging_scripts: Optional[StagingScripts] = None
+            if (
+                this.bulk_update
+                and not self.__side_mode
+                and self.env.dialect_info.supports_update_from
+            ):
+                self.__staging_scripts = self.__prepare_staging(id_fields or [])
+
+            self.__id_index: Optional[IdIndex] = None
+            self.__keep_id_index = this.keep_id_index
+            if id_fields and not self.__side_mode:
+                self.__id_index = IdIndex(
+                    self.env, table, id_fields, this.index_id_fields
+                )
+
+            self.__view: Optional[View] = None
+            if this.output_table:
+                view = this.output_view or Table(
+                    f"{this.output_table.name}_view", this.output_table.schema
+                )
+                self.__view = View(view.name, view.schema)
+                self.__create_view, self.__drop_view = self.__prepare_view(
+                    id_fields or []
+                )
+
+            if self.__marker_table:
+                self._set_script(
+                    (
+                        "Create output table"
+                        if self.__side_mode
+                        else "Create marker table"
+                    ),
+                    self.__marker_table.create,
+                    creation=self.__side_mode,
+                )
             self._set_script("Add columns", self._add_columns, creation=True)
+            if self.__id_index and self.__id_index.enabled:
+                self._set_script("Create index", self.__id_index.create)
+            if self.__view:
+                self._set_script("Create view", self.__create_view)
             self._set_script("Select", self.__select)
-            self._set_script("Update", self.__update)
-            self._set_script("Drop columns", self._drop_columns)
+            if self.__keyset:
+                self._set_script("Select page", self.__keyset.next_page)
+            if self.__claimer:
+                self._set_script("Add lease", self.__claimer.add_lease)
+                self._set_script("Claim", self.__claimer.claim)
+                self._set_script("Select claimed", self.__claimer.select_claimed)
+            if self.__staging_scripts:
+                self._set_script("Create staging", self.__staging_scripts.create)
+                self._set_script("Insert staging", self.__staging_scripts.insert)
+                self._set_script("Update", self.__staging_scripts.update)
+            else:
+                self._set_script(
+                    "Insert" if self.__side_mode else "Update", self.__update
+                )
+            if self.__view:
+                self._set_script("Drop view", self.__drop_view)
+            else:
+                self._set_script("Drop columns", self._drop_columns)
+            if self.__marker_table:
+                self._set_script(
+                    "Drop output table" if self.__side_mode else "Drop marker table",
+                    self.__marker_table.drop,
+                )
+            if self.__claimer:
+                self._set_script("Drop lease", self.__claimer.drop_lease)
+            if self.__id_index and self.__id_index.enabled:
+                self._set_script("Drop index", self.__id_index.drop)
+
+        def __prepare_view(
+            self, id_fields: list[IdColumn]
+        ) -> tuple[Statements, Statements]:
+            locals = {
+                "view": self.__view,
+                "source": self.__source,
+                "table": self._table,
+                "columns": self._columns,
+                "id_fields": id_fields,
+            }
+            drop = self.env.render_sql("DROP VIEW IF EXISTS {{view}};", **locals)
+
+            return (
+                Statements(
+                    [
+                        drop,
+                        self.env.render_sql(
+                            """\
+                            CREATE VIEW {{view}} AS
+                            SELECT
+                                {{source}}.*
+                                {%-for column in columns%},
+                                {{table}}.{{column.identifier}}
+                                {%-endfor%}
+                            FROM {{source}}
+                            LEFT JOIN {{table}} ON
+                            {%-set sep = joiner(' AND')%}
+                            {%-for id in id_fields%}{{sep()}}
+                                {{source}}.{{id.identifier}} = {{table}}.{{id.identifier}}
+                            {%-endfor%};""",
+                            **locals,
+                        ),
+                    ]
+                ),
+                Statements([drop]),
+            )
+
+        def __prepare_staging(self, id_fields: list[IdColumn]) -> StagingScripts:
+            locals = {
+                "table": self._table,
+                "staging": Table(f"__staging_{self._table.name}"),
+                "columns": self._columns,
+                "id_fields": id_fields,
+            }
+
+            return StagingScripts(
+                create=self.env.render_sql(
+                    """\
+                    CREATE TEMPORARY TABLE {{staging}} AS
+                    SELECT
+                        {{id_fields | join(',\\n    ', attribute='identifier')}},
+                        {{columns | join(',\\n    ', attribute='identifier')}}
+                    FROM {{table}}
+                    WHERE FALSE;""",
+                    **locals,
+                ),
+                insert=self.env.render_sql(
+                    """\
+                    INSERT INTO {{staging}}(
+                        {{id_fields | join(',\\n    ', attribute='identifier')}},
+                        {{columns | join(',\\n    ', attribute='identifier')}}
+                    )
+                    VALUES (
+                        {{id_fields | join(',\\n    ', attribute='value')}},
+                        {{columns | join(',\\n    ', attribute='value')}}
+                    );""",
+                    **locals,
+                ),
+                update=self.env.render_sql(
+                    """\
+                    UPDATE {{table}} SET
+                    {%set sep = joiner(',\\n')-%}
+                    {%for column in columns-%}
+                    {{sep()}}{{column.identifier}} = {{staging}}.{{column.identifier}}
+                    {%-endfor%}
+                    FROM {{staging}}
+                    WHERE
+                    {%set sep = joiner(' AND ')-%}
+                    {%for id in id_fields-%}
+                    {{sep()}}{{table}}.{{id.identifier}} = {{staging}}.{{id.identifier}}
+                    {%-endfor%};""",
+                    **locals,
+                ),
+                truncate=self.env.render_sql("TRUNCATE {{staging}};", **locals),
+                drop=self.env.render_sql(
+                    "DROP TABLE IF EXISTS {{staging}};", **locals
+                ),
+            )
+
+        def __apply_updates(self, conn: ConnectionEnvironment, rows: list[dict]):
+            if staging := self.__staging_scripts:
+                conn.sqlalchemy.execute(staging.insert, rows)
+                conn.sqlalchemy.execute(staging.update)
+                conn.sqlalchemy.execute(staging.truncate)
+            else:
+                conn.sqlalchemy.execute(self.__update, rows)
+
+            if self.__marker_table and not self.__side_mode:
+                conn.sqlalchemy.execute(self.__marker_table.insert, rows)
+
+        def __input_rows(
+            self, conn: ConnectionEnvironment, checkpoint: Callable[[], None]
+        ) -> Iterable[sqlalchemy.Row[Any]]:
+            if self.__claimer:
+                return self.__claimer.execute(conn, checkpoint)
+            elif self.__keyset:
+                return self.__keyset.execute(conn)
+            else:
+                return conn.execute_with_length_hint(
+                    self.__select, fetch_size=self.__fetch_size
+                )
 
         def _run(self, conn: ConnectionEnvironment):
+            if self.__marker_table:
+                self.__marker_table.create(conn)
             self._add_columns(conn)
+            if self.__view:
+                self.__create_view(conn)
+            if self.__claimer:
+                self.__claimer.add_lease(conn)
+            if self.__id_index:
+                self.__id_index.ensure(conn)
+            if staging := self.__staging_scripts:
+                conn.sqlalchemy.execute(staging.drop)
+                conn.sqlalchemy.execute(staging.create)
+
+            stats = current_task_stats()
+            updates = RowBuffer(
+                lambda rows: self.__apply_updates(conn, rows),
+                self.__batch_size,
+                self.__flush_interval,
+            )
+            commits = Throttle(*self.__commit_every)
+
+            def checkpoint():
+                updates.flush()
+                conn.sqlalchemy.commit()
 
-            with MultiContextManager(self.__context) as context:
-                for input_row in map(
+            with self.__executor.map(
+                # Coroutine functions are awaited by the executor
+                cast(OneToOne, self.__fn),
+                map(
                     lambda row: row._asdict(),
                     track(
-                        conn.execute_with_length_hint(self.__select),
+                        self.__input_rows(conn, checkpoint),
                         description="Task progress...",
                     ),
-                ):
+                ),
+                self.__context,
+                self.__popped_fields,
+            ) as results:
+                for input_row, result in results:
                     with RowContext.from_input_row(input_row, self.__popped_fields):
-                        conn.sqlalchemy.execute(
-                            self.__update, self.__fn(**input_row, **context)
-                        )
+                        updates.append(stats.time_fn(result))
+                        stats.count_read()
+                        stats.count_written()
+
+                        if self.__resumable and commits.tick():
+                            checkpoint()
+
+            updates.flush()
+            if staging := self.__staging_scripts:
+                conn.sqlalchemy.execute(staging.drop)
+            if self.__id_index and not self.__keep_id_index:
+                self.__id_index.drop_if_created(conn)
+            if self.__resumable:
+                conn.sqlalchemy.commit()
 
-                        if self.__commit_each:
-                            conn.sqlalchemy.commit()
+        @property
+        def output(self) -> Any:
+            return self.__view or self._table
+
+        @property
+        def is_concurrent(self) -> bool:
+            return self.__executor.is_concurrent
 
         def _exists(self, conn: ConnectionEnvironment) -> bool:
             if not db_actions.columns_exist(
                 conn, self._table, (col.name for col in self._columns)
-            ):
+            ) or (self.__view and not db_actions.table_exists(conn, self.__view)):
                 return False
             else:
                 # non-resumable or resumable with no more inputs
                 return (
-                    not self.__commit_each
-                    or conn.sqlalchemy.execute(self.__select).first() is None
+                    not self.__resumable
+                    or conn.sqlalchemy.execute(self.__select_any).first() is None
                 )
 
+        def _delete(self, conn: ConnectionEnvironment):
+            if self.__view:
+                self.__drop_view(conn)
+            else:
+                super()._delete(conn)
+            if self.__marker_table:
+                self.__marker_table.drop(conn)
+            if self.__claimer:
+                self.__claimer.drop_lease(conn)
+            if self.__id_index and self.__id_index.enabled:
+                self.__id_index.drop(conn)
+
+        def _diagnose(self, conn: ConnectionEnvironment) -> list[str]:
+            return self.__id_index.diagnose(conn) if self.__id_index else []
+
 
 __all__ = ["MapToNewColumns"]
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Any, Optional, Sequence
+from functools import partial
+from typing import Any, Literal, Optional, Sequence, cast
 from sqlalchemy import TextClause
 
 from ralsei.types import (
@@ -11,24 +12,109 @@ from ralsei.types import (
     ValueColumnRendered,
     Sql,
     ColumnRendered,
+    Placeholder,
 )
-from ralsei.wrappers import OneToMany, get_popped_fields
+from ralsei.wrappers import AnyOneToMany, OneToMany, get_popped_fields
 from ralsei.graph import Resolves
+from ralsei.jinja import ISqlEnvironment
 from ralsei.connection import ConnectionEnvironment
 from ralsei.console import track
-from ralsei.contextmanagers import ContextManager, MultiContextManager
+from ralsei.stats import current_task_stats
+from ralsei.contextmanagers import ContextManager, AsyncContextManager
 from ralsei import db_actions
 
 from .base import TaskDef
 from .create_table import CreateTableTask
 from .rowcontext import RowContext
+from ._buffer import RowBuffer, Throttle
+from ._copy import CopyLoader
+from ._claim import RowClaimer
+from ._id_index import IdIndex, create_pending_index
+from ._marker_table import MarkerTable, Statements
+from ._select import KeysetPagination, render_select_any
+from ._executor import create_executor, collect_rows
+
+
+class BatchMarker:
+    """Sets the marker on a batch of rows with a single
+    ``UPDATE ... WHERE (id_fields) IN (...)`` statement
+
+    Args:
+        env: environment to render the statements with
+        source: table with the marker column
+        is_done: marker column
+        id_fields: must all have a :py:class:`ralsei.types.Placeholder` as their value
+    """
+
+    def __init__(
+        self,
+        env: ISqlEnvironment,
+        source: Table,
+        is_done: Identifier,
+        id_fields: Sequence[IdColumn],
+    ) -> None:
+        self._env = env
+        self._locals = {
+            "source": source,
+            "is_done": is_done,
+            "ids": [id_field.identifier for id_field in id_fields],
+            "composite": len(id_fields) > 1,
+        }
+        self._keys = [id_field.value.name for id_field in id_fields]
+        self._statements: dict[int, TextClause] = {}
+
+    @staticmethod
+    def supports(id_fields: Sequence[IdColumn]) -> bool:
+        return all(isinstance(id_field.value, Placeholder) for id_field in id_fields)
+
+    def statement(self, count: int) -> TextClause:
+        """Statement for a batch of ``count`` rows (cached by size)"""
+
+        if (statement := self._statements.get(count)) is None:
+            statement = self._statements[count] = self._env.render_sql(
+                """\
+                UPDATE {{source}}
+                SET {{is_done}} = TRUE
+                WHERE ({{ids | join(', ')}}) IN (
+                    {%-if composite%}VALUES {%endif-%}
+                    {%set sep = joiner(', ')-%}
+                    {%for row in rows-%}
+                    {{sep()}}({{row | join(', ')}})
+                    {%-endfor%});""",
+                **self._locals,
+                rows=[
+                    [Placeholder(f"__id_{i}_{j}") for j in range(len(self._keys))]
+                    for i in range(count)
+                ],
+            )
+
+        return statement
+
+    def __call__(self, conn: ConnectionEnvironment, rows: Sequence[dict[str, Any]]):
+        conn.sqlalchemy.execute(
+            self.statement(len(rows)),
+            {
+                f"__id_{i}_{j}": row[key]
+                for i, row in enumerate(rows)
+                for j, key in enumerate(self._keys)
+            },
+        )
 
 
 @dataclass
 class MarkerScripts:
-    add_marker: db_actions.AddColumns
+    add_marker: db_actions.AddColumns | Statements
     set_marker: TextClause
-    drop_marker: db_actions.DropColumns
+    drop_marker: db_actions.DropColumns | Statements
+    set_markers: Optional[BatchMarker] = None
+
+    def set_batch(self, conn: ConnectionEnvironment, rows: list[dict[str, Any]]):
+        """Set the marker on multiple rows, with a single statement if possible"""
+
+        if self.set_markers:
+            self.set_markers(conn, rows)
+        else:
+            conn.sqlalchemy.execute(self.set_marker, rows)
 
 
 class MapToNewTable(TaskDef):
@@ -40,6 +126,7 @@ class MapToNewTable(TaskDef):
     - `table=`:py:attr:`~table`
     - `source=`:py:attr:`~source_table`
     - `is_done=`:py:attr:`~is_done_column` (as :py:class:`ralsei.types.Identifier`)
+      or an ``EXISTS`` check against :py:attr:`~is_done_table`
 
     Example:
         .. code-block:: python
@@ -133,15 +220,22 @@ class MapToNewTable(TaskDef):
     :py:class:`str` columns and :py:class:`ralsei.types.ValueColumn`'s `type`
     are passed through the jinja renderer
     """
-    fn: OneToMany
+    fn: AnyOneToMany
     """A generator function, mapping one row to many rows
 
+    May also be an ``async def`` generator, in which case it runs on an event loop,
+    with up to :py:attr:`~workers` rows being processed at once
+
     If :py:attr:`~id_fields` argument is omitted, will try to infer the ``id_fields``
     from metadata left by :py:func:`ralsei.wrappers.pop_id_fields`"""
-    context: dict[str, ContextManager[Any]] = field(default_factory=dict)
+    context: dict[str, ContextManager[Any] | AsyncContextManager[Any]] = field(
+        default_factory=dict
+    )
     """
     Task-scoped context-manager arguments passed to :py:attr:`~fn`
 
+    Async context managers are only supported when ``fn`` is async
+
     Example:
         .. code-block:: python
 
@@ -178,19 +272,157 @@ class MapToNewTable(TaskDef):
     """Create a boolean column with the given name
     in :py:attr:`~source_table` that tracks which rows have been processed
 
-    If set, the task will commit after each successful run of :py:attr:`~fn`,
+    If set, the task will commit after each successful run of :py:attr:`~fn`
+    (or less often, see :py:attr:`~commit_every_rows`),
     allowing you to stop and resume from the same place.
 
     Note:
         Make sure to include ``WHERE NOT {{is_done}}`` in your :py:attr:`~select` statement
     """
+    pending_index: bool = False
+    """Create a partial index on the rows of :py:attr:`~source_table`
+    not yet marked by :py:attr:`~is_done_column` (``WHERE NOT is_done``)
+
+    Selecting the pending rows near the end of a long run then takes index time
+    instead of scanning all the rows that are already done. |br|
+    Indexes :py:attr:`~id_fields` if known, otherwise the marker itself.
+    The index is dropped along with the marker column
+    """
+    is_done_table: Optional[Table] = None
+    """Track processed rows in a separate narrow table keyed by :py:attr:`~id_fields`
+    instead of :py:attr:`~is_done_column`
+
+    Marking a row as done then inserts into this table
+    rather than rewriting the whole (possibly wide) row of :py:attr:`~source_table`.
+    ``{{is_done}}`` renders as an ``EXISTS`` subquery correlated with ``{{source}}``,
+    so :py:attr:`~source_table` must be referenced as ``{{source}}``, without an alias
+    """
     id_fields: Optional[list[IdColumn]] = None
     """Columns that uniquely identify a row in :py:attr:`~source_table`,
-    so that you can update :py:attr:`~is_done_column`
+    so that you can update :py:attr:`~is_done_column` or :py:attr:`~is_done_table`
 
     This argument takes precedence over ``id_fields`` inferred from
     :py:attr:`~fn`'s metadata
     """
+    index_id_fields: bool = True
+    """Before running, create an index on :py:attr:`~id_fields` in :py:attr:`~source_table`,
+    unless the primary key or another index already covers them
+
+    Used when marking rows with :py:attr:`~is_done_column` or claiming them with :py:attr:`~claim_size`,
+    without it every such ``UPDATE`` is a sequential scan. |br|
+    The index is dropped when the task is deleted
+    """
+    keep_id_index: bool = True
+    """If ``False``, drop the index created by :py:attr:`~index_id_fields`
+    as soon as the task finishes (unless it already existed before the run)"""
+    fetch_size: Optional[int] = None
+    """If set, stream input rows from :py:attr:`~select` this many at a time
+    rather than loading the whole result before processing the first row
+
+    The progress bar total then comes from a separate ``COUNT(*)`` query. |br|
+    On PostgreSQL, a ``WITH HOLD`` cursor is used, which the server materializes
+    on the first commit (see :py:attr:`~commit_every_rows`)
+    """
+    keyset_size: Optional[int] = None
+    """Page through :py:attr:`~select` ordered by :py:attr:`~id_fields`,
+    fetching this many rows per page with a separate short query:
+    ``WHERE (id_fields) > (:last_ids) ORDER BY id_fields LIMIT keyset_size``
+
+    Unlike :py:attr:`~fetch_size`, no cursor or snapshot is held open while the task runs,
+    which makes restarting a resumable task on a big table cheap. |br|
+    :py:attr:`~select` must return the id fields as columns,
+    its own ``ORDER BY`` clause is overridden
+    """
+    claim_size: Optional[int] = None
+    """Let multiple processes (possibly on different machines) run this task at the same time,
+    each one claiming batches of this many input rows
+
+    Claims are stored as a lease in additional columns of :py:attr:`~source_table`,
+    rows being claimed concurrently are skipped with ``FOR UPDATE SKIP LOCKED`` where supported. |br|
+    Requires :py:attr:`~is_done_column` or :py:attr:`~is_done_table`, whose marker is committed along with the results
+    before claiming the next batch. :py:attr:`~select` must return the id fields as columns
+    """
+    lease_seconds: float = 600
+    """When using :py:attr:`~claim_size`, time after which the claimed rows
+    that haven't been marked as done can be claimed by another process
+
+    Compared against each machine's own clock
+    """
+    batch_size: Optional[int] = None
+    """Number of output rows to accumulate before inserting them
+    with a single ``executemany`` call
+
+    Defaults to 1, or 1000 with :py:attr:`~use_copy`
+
+    :py:attr:`~is_done_column` markers are buffered the same way,
+    and set on the whole batch with a single ``UPDATE ... WHERE (id_fields) IN (...)``. |br|
+    The buffer is always flushed before :py:attr:`~is_done_column` is committed,
+    so resuming the task never loses or duplicates rows.
+    That's why, by default, :py:attr:`~commit_every_rows` is the batch size:
+    committing more often cuts the batches short
+    """
+    flush_interval: Optional[float] = None
+    """Insert the buffered rows once this many seconds have passed since the last insert,
+    even if :py:attr:`~batch_size` hasn't been reached yet"""
+    use_copy: bool = False
+    """On PostgreSQL, load each batch of output rows with ``COPY ... FROM STDIN`` (CSV format)
+    instead of ``INSERT``, falling back to ``INSERT`` on other dialects
+
+    Columns whose value is a :py:class:`~ralsei.types.Placeholder` are copied directly,
+    other values (like ``Sql("NOW()")``) are computed when moving the rows
+    from a temporary staging table. |br|
+    Lists are copied as arrays and dicts as JSON,
+    values of types COPY can't represent raise :py:exc:`TypeError`. |br|
+    Only makes a difference with :py:attr:`~batch_size` greater than 1
+    """
+    commit_every_rows: Optional[int] = None
+    """When using :py:attr:`~is_done_column`, commit after this many input rows
+    have been processed, defaults to :py:attr:`~batch_size`
+
+    Markers and outputs are committed in the same transaction,
+    so after a crash the task resumes exactly where the last commit left off,
+    redoing at most this many rows.
+    """
+    commit_every_seconds: Optional[float] = None
+    """When using :py:attr:`~is_done_column`, commit once this many seconds
+    have passed since the previous commit"""
+    workers: int = 1
+    """Number of threads (or processes, see :py:attr:`~executor`) running :py:attr:`~fn` concurrently
+    (or the number of concurrently awaited coroutines, if ``fn`` is async)
+
+    Useful when ``fn`` is mostly waiting on the network. |br|
+    The database is still only accessed from the main thread,
+    which inserts the results and commits the markers as they come in.
+
+    Note:
+        With ``workers > 1``, objects from :py:attr:`~context` are shared between threads,
+        and each input row's output is collected into a list before being inserted
+    """
+    ordered: bool = True
+    """When using multiple :py:attr:`~workers`, write the results in the order of input rows
+
+    If ``False``, results are written as soon as they are ready
+    """
+    max_pending: Optional[int] = None
+    """Maximum number of input rows (or chunks, with ``executor="process"``)
+    being processed or waiting to be written
+    when using multiple :py:attr:`~workers` (``2 * workers`` by default)"""
+    executor: Literal["thread", "process"] = "thread"
+    """Where :py:attr:`~fn` is run
+
+    * ``"thread"`` - in the main thread, or in a thread pool if there are multiple :py:attr:`~workers`
+    * ``"process"`` - in a pool of worker processes, for CPU-bound functions. |br|
+      Each worker enters its own copy of :py:attr:`~context`,
+      input rows and results are sent between processes in chunks of :py:attr:`~chunk_size`.
+      The main process is still the only one accessing the database.
+
+    Note:
+        With ``"process"``, input rows and results must be picklable.
+        So must :py:attr:`~fn` and :py:attr:`~context`
+        unless the default start method is ``fork`` (Linux before Python 3.14)
+    """
+    chunk_size: int = 16
+    """Number of input rows sent to a worker process at once when using ``executor="process"``"""
 
     class Impl(CreateTableTask):
         def prepare(self, this: "MapToNewTable"):
@@ -199,12 +431,44 @@ class MapToNewTable(TaskDef):
 
             self.__fn = this.fn
             self.__context = this.context
+            self.__fetch_size = this.fetch_size
+            self.__batch_size = this.batch_size or (1000 if this.use_copy else 1)
+            self.__flush_interval = this.flush_interval
+            self.__commit_every = (
+                this.commit_every_rows or self.__batch_size,
+                this.commit_every_seconds,
+            )
+            self.__executor = create_executor(
+                this.fn,
+                this.executor,
+                this.workers,
+                this.ordered,
+                this.max_pending,
+                this.chunk_size,
+            )
             self.__popped_fields: set[str] = (
                 set(popped_fields) if popped_fields else set()
             )
 
-            locals = {"table": this.table, "source": source_table}
-            if this.is_done_column:
+            id_fields = this.id_fields or (
+                [IdColumn(name) for name in popped_fields] if popped_fields else None
+            )
+            resumable = bool(this.is_done_column or this.is_done_table)
+            if resumable and not source_table:
+                raise ValueError("Cannot track progress when source_table is None")
+            if this.pending_index and not this.is_done_column:
+                raise ValueError("pending_index requires is_done_column")
+
+            marker_table = (
+                MarkerTable(self.env, source_table, this.is_done_table, id_fields or [])
+                if this.is_done_table and source_table
+                else None
+            )
+
+            locals: dict[str, Any] = {"table": this.table, "source": source_table}
+            if marker_table:
+                locals["is_done"] = marker_table.is_done
+            elif this.is_done_column:
                 locals["is_done"] = Identifier(this.is_done_column)
 
             definitions: list[ToSql] = []
@@ -221,6 +485,37 @@ class MapToNewTable(TaskDef):
             self.__select = (
                 self.env.render_sql(this.select, **locals) if this.select else None
             )
+            self.__select_any = (
+                render_select_any(self.env, self.__select)
+                if self.__select is not None
+                else None
+            )
+            self.__claimer: Optional[RowClaimer] = None
+            if this.claim_size is not None:
+                if not (resumable and source_table and self.__select is not None):
+                    raise ValueError(
+                        "Claiming rows requires select, source_table"
+                        " and is_done_column or is_done_table"
+                    )
+                self.__claimer = RowClaimer(
+                    self.env,
+                    source_table,
+                    self.__select,
+                    id_fields or [],
+                    this.claim_size,
+                    this.lease_seconds,
+                )
+
+            self.__keyset: Optional[KeysetPagination] = None
+            if this.keyset_size is not None:
+                if self.__select is None:
+                    raise ValueError("Cannot use keyset_size without a select")
+                self.__keyset = KeysetPagination(
+                    self.env,
+                    self.__select,
+                    [id_field.name for id_field in id_fields or []],
+                    this.keyset_size,
+                )
             self.__create_table = self.env.render_sql(
                 """\
                 CREATE TABLE {% if if_not_exists %}IF NOT EXISTS {% endif %}{{ table }}(
@@ -228,7 +523,7 @@ class MapToNewTable(TaskDef):
                 );""",
                 table=this.table,
                 definitions=definitions,
-                if_not_exists=this.is_done_column is not None,
+                if_not_exists=resumable,
             )
             self.__insert = self.env.render_sql(
                 """\
@@ -241,29 +536,41 @@ class MapToNewTable(TaskDef):
                 table=this.table,
                 columns=insert_columns,
             )
+            self.__copy_loader = (
+                CopyLoader(self.env, this.table, insert_columns)
+                if this.use_copy
+                else None
+            )
             self._prepare_table(this.table)
 
             self.__marker_scripts: Optional[MarkerScripts] = None
-            if this.is_done_column:
-                if not source_table:
-                    raise ValueError(
-                        "Cannot create is_done_column when source_table is None"
-                    )
-
-                id_fields = this.id_fields or (
-                    [IdColumn(name) for name in popped_fields]
-                    if popped_fields
-                    else None
+            if marker_table:
+                self.__marker_scripts = MarkerScripts(
+                    marker_table.create, marker_table.insert, marker_table.drop
                 )
+            elif this.is_done_column and source_table:
                 if not id_fields:
-                    ValueError("Must provide id_fields if using is_done_column")
+                    raise ValueError("Must provide id_fields if using is_done_column")
 
                 is_done_column = ColumnRendered(
                     this.is_done_column, "BOOL DEFAULT FALSE"
                 )
+                pending_index = (
+                    [
+                        create_pending_index(
+                            self.env, source_table, this.is_done_column, id_fields
+                        )
+                    ]
+                    if this.pending_index
+                    else []
+                )
                 self.__marker_scripts = MarkerScripts(
                     db_actions.AddColumns(
-                        self.env, source_table, [is_done_column], if_not_exists=True
+                        self.env,
+                        source_table,
+                        [is_done_column],
+                        if_not_exists=True,
+                        indexes=pending_index,
                     ),
                     self.env.render_sql(
                         """\
@@ -275,67 +582,188 @@ class MapToNewTable(TaskDef):
                         id_fields=id_fields,
                     ),
                     db_actions.DropColumns(
-                        self.env, source_table, [is_done_column], if_exists=True
+                        self.env,
+                        source_table,
+                        [is_done_column],
+                        if_exists=True,
+                        indexes=pending_index,
+                    ),
+                    (
+                        BatchMarker(
+                            self.env,
+                            source_table,
+                            is_done_column.identifier,
+                            id_fields,
+                        )
+                        if id_fields and BatchMarker.supports(id_fields)
+                        else None
                     ),
                 )
 
+            self.__id_index: Optional[IdIndex] = None
+            self.__keep_id_index = this.keep_id_index
+            if (
+                source_table
+                and id_fields
+                and (
+                    (self.__marker_scripts and not marker_table)
+                    or self.__claimer is not None
+                )
+            ):
+                self.__id_index = IdIndex(
+                    self.env, source_table, id_fields, this.index_id_fields
+                )
+
             if self.__marker_scripts:
                 self._set_script("Add marker", self.__marker_scripts.add_marker)
+            if self.__id_index and self.__id_index.enabled:
+                self._set_script("Create index", self.__id_index.create)
             if self.__select is not None:
                 self._set_script("Select", self.__select)
+            if self.__keyset:
+                self._set_script("Select page", self.__keyset.next_page)
+            if self.__claimer:
+                self._set_script("Add lease", self.__claimer.add_lease)
+                self._set_script("Claim", self.__claimer.claim)
+                self._set_script("Select claimed", self.__claimer.select_claimed)
             self._set_script("Create table", self.__create_table, creation=True)
             self._set_script("Insert", self.__insert)
+            if self.__copy_loader:
+                self._set_script("Copy", self.__copy_loader.copy)
+                if self.__copy_loader.move_staging is not None:
+                    self._set_script("Move staging", self.__copy_loader.move_staging)
             self._set_script("Drop table", self._drop_sql)
             if self.__marker_scripts:
                 self._set_script("Drop marker", self.__marker_scripts.drop_marker)
+            if self.__claimer:
+                self._set_script("Drop lease", self.__claimer.drop_lease)
+            if self.__id_index and self.__id_index.enabled:
+                self._set_script("Drop index", self.__id_index.drop)
 
         def _run(self, conn: ConnectionEnvironment):
             conn.sqlalchemy.execute(self.__create_table)
             if self.__marker_scripts:
                 self.__marker_scripts.add_marker(conn)
+            if self.__claimer:
+                self.__claimer.add_lease(conn)
+            if self.__id_index:
+                self.__id_index.ensure(conn)
+
+            copy_loader = (
+                self.__copy_loader
+                if self.__copy_loader and self.__copy_loader.is_supported(conn)
+                else None
+            )
+            if copy_loader:
+                copy_loader.prepare(conn)
+
+            stats = current_task_stats()
+            inserts = RowBuffer(
+                lambda rows: (
+                    copy_loader.load(conn, rows)
+                    if copy_loader
+                    else conn.sqlalchemy.execute(self.__insert, rows)
+                ),
+                self.__batch_size,
+                self.__flush_interval,
+            )
+            markers = (
+                RowBuffer(
+                    partial(self.__marker_scripts.set_batch, conn),
+                    self.__batch_size,
+                    self.__flush_interval,
+                )
+                if self.__marker_scripts and self.__select is not None
+                else None
+            )
+            commits = Throttle(*self.__commit_every)
+
+            def checkpoint():
+                inserts.flush()
+                if markers is not None:
+                    markers.flush()
+                conn.sqlalchemy.commit()
 
             def iter_input_rows(select: TextClause):
+                if self.__claimer:
+                    rows = self.__claimer.execute(conn, checkpoint)
+                elif self.__keyset:
+                    rows = self.__keyset.execute(conn)
+                else:
+                    rows = conn.execute_with_length_hint(
+                        select, fetch_size=self.__fetch_size
+                    )
+
                 for input_row in map(
                     lambda row: row._asdict(),
-                    track(
-                        conn.execute_with_length_hint(select),
-                        description="Task progress...",
-                    ),
+                    track(rows, description="Task progress..."),
                 ):
                     yield input_row
 
-                    if self.__marker_scripts:
-                        conn.sqlalchemy.execute(
-                            self.__marker_scripts.set_marker, input_row
-                        )
-                        conn.sqlalchemy.commit()
-
-            with MultiContextManager(self.__context) as context:
-                for input_row in (
+            # Coroutine functions are awaited by the executor,
+            # so rows come back the same way as from a sync function
+            fn = cast(OneToMany, self.__fn)
+            with self.__executor.map(
+                collect_rows(fn) if self.__executor.is_concurrent else fn,
+                (
                     iter_input_rows(self.__select)
                     if self.__select is not None
                     else [{}]
-                ):
+                ),
+                self.__context,
+                self.__popped_fields,
+            ) as results:
+                for input_row, result in results:
+                    if self.__select is not None:
+                        stats.count_read()
+
                     with RowContext.from_input_row(input_row, self.__popped_fields):
-                        for output_row in self.__fn(**input_row, **context):
-                            conn.sqlalchemy.execute(self.__insert, output_row)
+                        for output_row in stats.time_fn_iter(result):
+                            inserts.append(output_row)
+                            stats.count_written()
+
+                        if markers is not None:
+                            markers.append(input_row)
+                            if commits.tick():
+                                checkpoint()
+
+            inserts.flush()
+            if markers is not None:
+                markers.flush()
+            if copy_loader:
+                copy_loader.cleanup(conn)
+            if self.__id_index and not self.__keep_id_index:
+                self.__id_index.drop_if_created(conn)
+            if self.__marker_scripts:
+                conn.sqlalchemy.commit()
 
         def _delete(self, conn: ConnectionEnvironment):
+            if self.__id_index and self.__id_index.enabled:
+                self.__id_index.drop(conn)
             if self.__marker_scripts:
                 self.__marker_scripts.drop_marker(conn)
+            if self.__claimer:
+                self.__claimer.drop_lease(conn)
 
             super()._delete(conn)
 
+        @property
+        def is_concurrent(self) -> bool:
+            return self.__executor.is_concurrent
+
         def _exists(self, conn: ConnectionEnvironment) -> bool:
             if not db_actions.table_exists(conn, self._table):
                 return False
             else:
                 return (
                     # non-resumable or resumable with no more inputs
-                    self.__select is None
+                    self.__select_any is None
                     or not self.__marker_scripts
-                    or conn.sqlalchemy.execute(self.__select).first() is None
+                    or conn.sqlalchemy.execute(self.__select_any).first() is None
                 )
 
+        def _diagnose(self, conn: ConnectionEnvironment) -> list[str]:
+            return self.__id_index.diagnose(conn) if self.__id_index else []
+
 
 __all__ = ["MapToNewTable"]
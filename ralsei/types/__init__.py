@@ -8,6 +8,7 @@ __all__ = [
     "Sql",
     "Identifier",
     "Table",
+    "View",
     "Placeholder",
     "ColumnBase",
     "Column",
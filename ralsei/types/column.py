@@ -1,5 +1,6 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Any
+from functools import cached_property
 from abc import ABC, abstractmethod
 
 from .to_sql import ToSql
@@ -17,7 +18,7 @@ class ColumnBase(ABC):
     def __init__(self, name: str) -> None:
         self.name = name
 
-    @property
+    @cached_property
     def identifier(self) -> Identifier:
         """:py:attr:`~ColumnBase.name` wrapped in a SQL identifier"""
 
@@ -81,7 +82,7 @@ class ColumnDefinition(ToSql):
         self.column = column
 
     def to_sql(self, env: "ISqlEnvironment") -> str:
-        return env.adapter.format("{} {}", self.column.identifier, self.column.type)
+        return f"{self.column.identifier.to_sql(env)} {self.column.type.value}"
 
 
 __all__ = ["ColumnBase", "Column", "ColumnRendered", "ColumnDefinition"]
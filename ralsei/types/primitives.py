@@ -1,5 +1,6 @@
 import re
 from dataclasses import dataclass
+from functools import cached_property
 from typing import TYPE_CHECKING, Optional
 
 from .to_sql import ToSql
@@ -18,17 +19,25 @@ class Sql(ToSql):
         return self.value
 
 
-@dataclass
+def _quote_identifier(value: str) -> str:
+    return '"{}"'.format(value.replace('"', '""'))
+
+
+@dataclass(frozen=True)
 class Identifier(ToSql):
     """A SQL identifier, like ``\"table_name\"``"""
 
     value: str
 
+    @cached_property
+    def _quoted(self) -> str:
+        return _quote_identifier(self.value)
+
     def to_sql(self, env: "ISqlEnvironment") -> str:
-        return '"{}"'.format(self.value.replace('"', '""'))
+        return self._quoted
 
 
-@dataclass
+@dataclass(frozen=True)
 class Table(ToSql):
     """Table identifier, like ``\"schema_name\".\"table_name\"``"""
 
@@ -41,12 +50,23 @@ class Table(ToSql):
         else:
             return self.name
 
+    @cached_property
+    def _quoted(self) -> str:
+        if self.schema:
+            return f"{_quote_identifier(self.schema)}.{_quote_identifier(self.name)}"
+        else:
+            return _quote_identifier(self.name)
+
     def to_sql(self, env: "ISqlEnvironment") -> str:
-        return env.render(
-            "{%if schema%}{{schema | identifier}}.{%endif%}{{name | identifier}}",
-            name=self.name,
-            schema=self.schema,
-        )
+        return self._quoted
+
+
+@dataclass(frozen=True)
+class View(Table):
+    """Identifier of a view, renders the same way as :py:class:`Table`
+
+    Tasks that add columns refuse to alter a view
+    """
 
 
 @dataclass
@@ -65,4 +85,4 @@ class Placeholder(ToSql):
         return f":{self.name}"
 
 
-__all__ = ["Sql", "Identifier", "Table", "Placeholder"]
+__all__ = ["Sql", "Identifier", "Table", "View", "Placeholder"]
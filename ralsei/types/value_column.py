@@ -1,5 +1,6 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Any
+from functools import cached_property
 from abc import abstractmethod
 
 from .to_sql import ToSql
@@ -97,8 +98,9 @@ class ValueColumnSetStatement(ToSql):
         self.value_column = value_column
 
     def to_sql(self, env: "ISqlEnvironment") -> str:
-        return env.adapter.format(
-            "{} = {}", self.value_column.identifier, self.value_column.value
+        return "{} = {}".format(
+            self.value_column.identifier.to_sql(env),
+            env.adapter.to_sql(self.value_column.value),
         )
 
 
@@ -121,14 +123,16 @@ class IdColumn(ToSql):
         self.name = name
         self.value = infer_value(name, value)
 
-    @property
+    @cached_property
     def identifier(self) -> Identifier:
         """:py:attr:`~IdColumn.name` wrapped in a SQL identifier"""
 
         return Identifier(self.name)
 
     def to_sql(self, env: "ISqlEnvironment") -> str:
-        return env.adapter.format("{} = {}", self.identifier, self.value)
+        return "{} = {}".format(
+            self.identifier.to_sql(env), env.adapter.to_sql(self.value)
+        )
 
 
 __all__ = [
@@ -1,10 +1,16 @@
 from typing import (
     Any,
+    AsyncIterator,
+    Awaitable,
     Callable,
     Iterator,
     Optional,
+    Protocol,
+    cast,
+    overload,
 )
 from functools import wraps
+import inspect
 
 POPPED_FIELDS_ATTR = "__ralsei_popped_fields"
 
@@ -25,27 +31,107 @@ type OneToMany = Callable[..., Iterator[dict[str, Any]]]
         for name in get_names(html):
             yield {"name": name}
 """
+type AsyncOneToOne = Callable[..., Awaitable[dict[str, Any]]]
+"""Row to row mapping coroutine
 
+.. code-block:: python
+
+    async def example(url: str):
+        async with session.get(url) as response:
+            return {"html": await response.text()}
+"""
+type AsyncOneToMany = Callable[..., AsyncIterator[dict[str, Any]]]
+"""One row to many rows mapping async generator
+
+.. code-block:: python
+
+    async def example(url: str):
+        async for page in fetch_pages(url):
+            yield {"html": page}
+"""
+
+type AnyOneToOne = OneToOne | AsyncOneToOne
+type AnyOneToMany = OneToMany | AsyncOneToMany
+
+
+class RowsDecorator(Protocol):
+    """Wrapper of a :py:type:`~OneToMany` or :py:type:`~AsyncOneToMany` function
+    that keeps it sync or async"""
+
+    @overload
+    def __call__(self, fn: OneToMany, /) -> OneToMany: ...
+    @overload
+    def __call__(self, fn: AsyncOneToMany, /) -> AsyncOneToMany: ...
+
+
+def is_async(fn: Callable) -> bool:
+    """Check if ``fn`` is either a coroutine function or an async generator function"""
+    return inspect.iscoroutinefunction(fn) or inspect.isasyncgenfunction(fn)
+
+
+@overload
+def into_many(fn: OneToOne) -> OneToMany: ...
+@overload
+def into_many(fn: AsyncOneToOne) -> AsyncOneToMany: ...
+def into_many(fn: AnyOneToOne) -> AnyOneToMany:
+    """Turn :py:type:`~OneToOne` mapping function into :py:type:`~OneToMany`
+
+    (or :py:type:`~AsyncOneToOne` into :py:type:`~AsyncOneToMany`)
+    """
 
-def into_many(fn: OneToOne) -> OneToMany:
-    """Turn :py:type:`~OneToOne` mapping function into :py:type:`~OneToMany`"""
+    if inspect.iscoroutinefunction(fn):
+        async_fn = cast(AsyncOneToOne, fn)
+
+        @wraps(fn)
+        async def async_wrapper(**kwargs: Any):
+            yield await async_fn(**kwargs)
+
+        return async_wrapper
+
+    sync_fn = cast(OneToOne, fn)
 
     @wraps(fn)
     def wrapper(**kwargs: Any):
-        yield fn(**kwargs)
+        yield sync_fn(**kwargs)
 
     return wrapper
 
 
-def into_one(fn: OneToMany) -> OneToOne:
+@overload
+def into_one(fn: OneToMany) -> OneToOne: ...
+@overload
+def into_one(fn: AsyncOneToMany) -> AsyncOneToOne: ...
+def into_one(fn: AnyOneToMany) -> AnyOneToOne:
     """Turn :py:type:`~OneToMany` mapping function into :py:type:`~OneToOne`
 
+    (or :py:type:`~AsyncOneToMany` into :py:type:`~AsyncOneToOne`)
+
     Would throw an error if the input function yields more than one row
     """
 
+    if inspect.isasyncgenfunction(fn):
+        async_fn = cast(AsyncOneToMany, fn)
+
+        @wraps(fn)
+        async def async_wrapper(**kwargs: Any):
+            generator = async_fn(**kwargs)
+            first_value = await anext(generator)
+
+            # If there's more than one value in the generator, throw an error
+            try:
+                await anext(generator)
+            except StopAsyncIteration:
+                return first_value
+
+            raise ValueError("Generator returned more than one value")
+
+        return async_wrapper
+
+    sync_fn = cast(OneToMany, fn)
+
     @wraps(fn)
     def wrapper(**kwargs: Any):
-        generator = fn(**kwargs)
+        generator = sync_fn(**kwargs)
         first_value = next(generator)
 
         # If there's more than one value in the generator, throw an error
@@ -59,9 +145,52 @@ def into_one(fn: OneToMany) -> OneToOne:
     return wrapper
 
 
-def pop_id_fields(
-    *id_fields: str, keep: bool = False
-) -> Callable[[OneToMany], OneToMany]:
+def _map_output(
+    fn: AnyOneToMany, transform: Callable[[dict[str, Any]], dict[str, Any]]
+) -> Any:
+    if inspect.isasyncgenfunction(fn):
+        async_fn = cast(AsyncOneToMany, fn)
+
+        @wraps(fn)
+        async def async_wrapper(**kwargs):
+            async for row in async_fn(**kwargs):
+                yield transform(row)
+
+        return async_wrapper
+
+    sync_fn = cast(OneToMany, fn)
+
+    @wraps(fn)
+    def wrapper(**kwargs):
+        for row in sync_fn(**kwargs):
+            yield transform(row)
+
+    return wrapper
+
+
+def _map_input(
+    fn: AnyOneToMany, transform: Callable[[dict[str, Any]], dict[str, Any]]
+) -> Any:
+    if inspect.isasyncgenfunction(fn):
+        async_fn = cast(AsyncOneToMany, fn)
+
+        @wraps(fn)
+        async def async_wrapper(**kwargs):
+            async for row in async_fn(**transform(kwargs)):
+                yield row
+
+        return async_wrapper
+
+    sync_fn = cast(OneToMany, fn)
+
+    @wraps(fn)
+    def wrapper(**kwargs):
+        yield from sync_fn(**transform(kwargs))
+
+    return wrapper
+
+
+def pop_id_fields(*id_fields: str, keep: bool = False) -> RowsDecorator:
     """Create function wrapper that 'pops' ``id_fields`` off the keyword arguments,
     calls the inner function without them, then re-inserts them into the output rows
 
@@ -91,14 +220,32 @@ def pop_id_fields(
                 {"year": 2015, "json": {...}}
     """
 
-    def decorator(fn: OneToMany) -> OneToMany:
-        @wraps(fn)
-        def wrapper(**kwargs):
-            id_values = {
-                name: (kwargs[name] if keep else kwargs.pop(name)) for name in id_fields
-            }
-            for row in fn(**kwargs):
-                yield {**row, **id_values}
+    def pop_values(kwargs: dict[str, Any]) -> dict[str, Any]:
+        return {
+            name: (kwargs[name] if keep else kwargs.pop(name)) for name in id_fields
+        }
+
+    def decorator(fn: AnyOneToMany) -> Any:
+        if inspect.isasyncgenfunction(fn):
+            async_fn = cast(AsyncOneToMany, fn)
+
+            @wraps(fn)
+            async def async_wrapper(**kwargs):
+                id_values = pop_values(kwargs)
+                async for row in async_fn(**kwargs):
+                    yield {**row, **id_values}
+
+            wrapper = async_wrapper
+        else:
+            sync_fn = cast(OneToMany, fn)
+
+            @wraps(fn)
+            def sync_wrapper(**kwargs):
+                id_values = pop_values(kwargs)
+                for row in sync_fn(**kwargs):
+                    yield {**row, **id_values}
+
+            wrapper = sync_wrapper
 
         # Save metadata on which fields are considered identifiers (useful for SQL generation)
         metadata = getattr(wrapper, POPPED_FIELDS_ATTR, [])
@@ -107,10 +254,10 @@ def pop_id_fields(
 
         return wrapper
 
-    return decorator
+    return cast(RowsDecorator, decorator)
 
 
-def rename_input(**mapping: str) -> Callable[[OneToMany], OneToMany]:
+def rename_input(**mapping: str) -> RowsDecorator:
     """Create function wrapper that remaps keyword argument names
 
     .. code-block:: python
@@ -123,19 +270,18 @@ def rename_input(**mapping: str) -> Callable[[OneToMany], OneToMany]:
 
     """
 
-    def decorator(fn: OneToMany) -> OneToMany:
-        @wraps(fn)
-        def wrapper(**kwargs):
-            yield from fn(
-                **{mapping.get(key, key): value for key, value in kwargs.items()}
-            )
+    def decorator(fn: AnyOneToMany) -> Any:
+        return _map_input(
+            fn,
+            lambda kwargs: {
+                mapping.get(key, key): value for key, value in kwargs.items()
+            },
+        )
 
-        return wrapper
-
-    return decorator
+    return cast(RowsDecorator, decorator)
 
 
-def rename_output(**mapping: str) -> Callable[[OneToMany], OneToMany]:
+def rename_output(**mapping: str) -> RowsDecorator:
     """Create function wrapper that remaps fields in the output dictionary
 
     .. code-block:: pycon
@@ -148,18 +294,16 @@ def rename_output(**mapping: str) -> Callable[[OneToMany], OneToMany]:
         {"b": 5}
     """
 
-    def decorator(fn: OneToMany) -> OneToMany:
-        @wraps(fn)
-        def wrapper(**kwargs):
-            for row in fn(**kwargs):
-                yield {mapping.get(key, key): value for key, value in row.items()}
+    def decorator(fn: AnyOneToMany) -> Any:
+        return _map_output(
+            fn,
+            lambda row: {mapping.get(key, key): value for key, value in row.items()},
+        )
 
-        return wrapper
+    return cast(RowsDecorator, decorator)
 
-    return decorator
 
-
-def add_to_input(**add_values: Any) -> Callable[[OneToMany], OneToMany]:
+def add_to_input(**add_values: Any) -> RowsDecorator:
     """Create function wrapper that adds to the keyword arguments
 
     .. code-block:: python
@@ -171,17 +315,13 @@ def add_to_input(**add_values: Any) -> Callable[[OneToMany], OneToMany]:
         foo(a=5)
     """
 
-    def decorator(fn: OneToMany) -> OneToMany:
-        @wraps(fn)
-        def wrapper(**kwargs):
-            yield from fn(**kwargs, **add_values)
-
-        return wrapper
+    def decorator(fn: AnyOneToMany) -> Any:
+        return _map_input(fn, lambda kwargs: {**kwargs, **add_values})
 
-    return decorator
+    return cast(RowsDecorator, decorator)
 
 
-def add_to_output(**add_values: Any) -> Callable[[OneToMany], OneToMany]:
+def add_to_output(**add_values: Any) -> RowsDecorator:
     """Create function wrapper that adds entries to the output dictionary
 
     .. code-block:: pycon
@@ -194,19 +334,23 @@ def add_to_output(**add_values: Any) -> Callable[[OneToMany], OneToMany]:
         {"a": 10, "b": "meow"}
     """
 
-    def decorator(fn: OneToMany) -> OneToMany:
-        @wraps(fn)
-        def wrapper(**kwargs):
-            for row in fn(**kwargs):
-                yield {**row, **add_values}
-
-        return wrapper
+    def decorator(fn: AnyOneToMany) -> Any:
+        return _map_output(fn, lambda row: {**row, **add_values})
 
-    return decorator
+    return cast(RowsDecorator, decorator)
 
 
-def compose(fn: OneToMany, *decorators: Callable[[OneToMany], OneToMany]) -> OneToMany:
+@overload
+def compose(
+    fn: OneToMany, *decorators: Callable[[OneToMany], OneToMany]
+) -> OneToMany: ...
+@overload
+def compose(
+    fn: AsyncOneToMany, *decorators: Callable[[AsyncOneToMany], AsyncOneToMany]
+) -> AsyncOneToMany: ...
+def compose(fn: Any, *decorators: Callable[[Any], Any]) -> Any:
     """Compose multiple decorators together on a :py:type:`~OneToMany`
+    or :py:type:`~AsyncOneToMany`
 
     Args:
         fn: base function
@@ -219,11 +363,17 @@ def compose(fn: OneToMany, *decorators: Callable[[OneToMany], OneToMany]) -> One
     return fn
 
 
+@overload
+def compose_one(
+    fn: OneToOne, *decorators: Callable[[OneToMany], OneToMany]
+) -> OneToOne: ...
+@overload
 def compose_one(
-    fn: OneToOne,
-    *decorators: Callable[[OneToMany], OneToMany],
-) -> OneToOne:
+    fn: AsyncOneToOne, *decorators: Callable[[AsyncOneToMany], AsyncOneToMany]
+) -> AsyncOneToOne: ...
+def compose_one(fn: Any, *decorators: Callable[[Any], Any]) -> Any:
     """Compose multiple decorators together on a :py:type:`~OneToOne`
+    or :py:type:`~AsyncOneToOne`
 
     Args:
         fn: base function
@@ -241,6 +391,9 @@ def get_popped_fields(fn: Callable) -> Optional[list[str]]:
 __all__ = [
     "OneToOne",
     "OneToMany",
+    "AsyncOneToOne",
+    "AsyncOneToMany",
+    "RowsDecorator",
     "into_many",
     "into_one",
     "pop_id_fields",
@@ -11,7 +11,7 @@ def get_rows(
         SELECT * FROM {{table}}{%if order_by%}
         {%set sep = joiner(', ')-%}
         ORDER BY {%for name in order_by-%}
-        {{name | identifier}}
+        {{sep()}}{{name | identifier}}
         {%-endfor%}
         {%endif%};""",
         {"table": table, "order_by": order_by},
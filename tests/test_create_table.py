@@ -1,6 +1,7 @@
 import pytest
+from pathlib import Path
 from typing import Tuple
-from ralsei import Table, CreateTableSql, ConnectionEnvironment
+from ralsei import Table, CreateTableSql, ConnectionEnvironment, SqlFile
 from ralsei.db_actions import table_exists
 
 from tests.db_helper import get_rows
@@ -76,3 +77,29 @@ def test_create_table_literal(conn: ConnectionEnvironment):
     assert get_rows(conn, table) == [("Ralsei\ncute", 10)]
     task.delete(conn.sqlalchemy)
     assert not table_exists(conn, table)
+
+
+def test_create_table_sql_file(conn: ConnectionEnvironment, tmp_path: Path):
+    tmp_path.joinpath("macros.sql").write_text(
+        "{% macro row(foo, bar) %}({{foo}}, {{bar}}){% endmacro %}"
+    )
+    tmp_path.joinpath("create.sql").write_text(
+        """\
+{% import "macros.sql" as macros -%}
+CREATE TABLE {{table}}(
+    foo INT,
+    bar TEXT
+);
+{%-split-%}
+INSERT INTO {{table}} VALUES {{macros.row(1, 'a')}}, {{macros.row(2, 'b')}};"""
+    )
+    conn.jinja.base.set_template_dirs(tmp_path, bytecode_cache=tmp_path / "cache")
+
+    table = Table("test_create_table_sql_file")
+    task = CreateTableSql(sql=SqlFile("create.sql"), table=table).create(
+        conn.jinja.base
+    )
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table) == [(1, "a"), (2, "b")]
+    assert any(tmp_path.joinpath("cache").iterdir())
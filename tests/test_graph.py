@@ -1,4 +1,9 @@
+import pstats
+import threading
+import time
+from pathlib import Path
 import pytest
+import sqlalchemy
 from ralsei import (
     ConnectionEnvironment,
     Pipeline,
@@ -15,6 +20,10 @@ from ralsei import (
     CreateTableSql,
     CyclicGraphError,
 )
+from ralsei.graph import TreePath, NamedTask, Scheduler, RunHistory
+from ralsei.db_actions import table_exists
+from ralsei.profiling import TaskProfiler, categorize
+import ralsei
 
 
 def example_data():
@@ -209,3 +218,241 @@ def test_topological_sort(conn: ConnectionEnvironment):
         "child.join",
         "child.extend",
     ]
+
+
+class ParallelPipeline(Pipeline):
+    def __init__(self) -> None:
+        self.barrier = threading.Barrier(2, timeout=10)
+
+    def create_tasks(self):
+        def wait_for_other_branch():
+            self.barrier.wait()
+            yield {"value": 1}
+
+        return {
+            "left": MapToNewTable(
+                table=Table("left"),
+                columns=[ValueColumn("value", "INT")],
+                fn=wait_for_other_branch,
+            ),
+            "right": MapToNewTable(
+                table=Table("right"),
+                columns=[ValueColumn("value", "INT")],
+                fn=wait_for_other_branch,
+            ),
+            "joined": CreateTableSql(
+                table=Table("joined"),
+                sql="""\
+                    CREATE TABLE {{table}} AS
+                    SELECT * FROM {{left}} UNION ALL SELECT * FROM {{right}}""",
+                locals={"left": self.outputof("left"), "right": self.outputof("right")},
+            ),
+            "broken": CreateTableSql(table=Table("broken"), sql="NOT SQL"),
+            "after_broken": CreateTableSql(
+                table=Table("after_broken"),
+                sql="CREATE TABLE {{table}} AS SELECT * FROM {{broken}}",
+                locals={"broken": self.outputof("broken")},
+            ),
+        }
+
+
+def test_run_parallel(engine: sqlalchemy.Engine):
+    if engine.dialect.name == "sqlite":
+        pytest.skip("SQLite doesn't support concurrent writers")
+
+    with ConnectionEnvironment(engine) as conn:
+        dag = ParallelPipeline().build_dag(conn.jinja.base)
+        sequence = dag.topological_sort()
+        assert sequence.predecessors(TreePath("joined")) == {
+            TreePath("left"),
+            TreePath("right"),
+        }
+
+        # Both branches must be running at the same time to pass the barrier
+        with pytest.raises(sqlalchemy.exc.DatabaseError):
+            sequence.run(conn.sqlalchemy, jobs=3)
+
+        for name in ["left", "right", "joined"]:
+            assert table_exists(conn, Table(name))
+        for name in ["broken", "after_broken"]:
+            assert not table_exists(conn, Table(name))
+
+
+def test_sort_filtered_dependencies(conn: ConnectionEnvironment):
+    dag = RootPipeline().build_dag(conn.jinja.base)
+    sequence = dag.sort_filtered([], [TreePath("aa"), TreePath("child", "extend")])
+
+    # Dependencies through tasks that were filtered out are kept
+    assert sequence.predecessors(TreePath("child", "extend")) == {TreePath("aa")}
+    assert sequence.predecessors(TreePath("aa")) == set()
+
+
+class TaggedPipeline(Pipeline):
+    def create_tasks(self):
+        return {
+            f"{tag}_{i}": CreateTableSql(
+                table=Table(f"{tag}_{i}"),
+                sql="CREATE TABLE {{table}}(id INT)",
+                resources={tag: weight},
+            )
+            for tag, weight in [("network", 1), ("heavy", 2)]
+            for i in range(3)
+        }
+
+
+def test_scheduler_resource_limits(conn: ConnectionEnvironment):
+    sequence = TaggedPipeline().build_dag(conn.jinja.base).topological_sort()
+    limits = {"network": 2, "heavy": 2}
+
+    lock = threading.Lock()
+    used = {"network": 0, "heavy": 0}
+    peak = {"network": 0, "heavy": 0}
+
+    def fake_run(named_task: NamedTask):
+        with lock:
+            for tag, weight in named_task.task.resources.items():
+                used[tag] += weight
+                peak[tag] = max(peak[tag], used[tag])
+        time.sleep(0.05)
+        with lock:
+            for tag, weight in named_task.task.resources.items():
+                used[tag] -= weight
+
+    results = list(Scheduler(sequence, jobs=6, limits=limits).map(fake_run))
+    assert len(results) == 6
+    assert all(error is None for _, error in results)
+    assert peak == limits
+
+    with pytest.raises(ValueError):
+        Scheduler(sequence, jobs=6, limits={"heavy": 1})
+
+
+def test_critical_path(conn: ConnectionEnvironment):
+    sequence = RootPipeline().build_dag(conn.jinja.base).topological_sort()
+    durations = {
+        TreePath("aa"): 1.0,
+        TreePath("bb"): 5.0,
+        TreePath("child", "join"): 2.0,
+    }
+
+    total, chain = sequence.critical_path(durations)
+    assert total == 7.0
+    assert [named_task.path for named_task in chain] == [
+        TreePath("bb"),
+        TreePath("child", "join"),
+        TreePath("child", "extend"),
+    ]
+
+    # The longer branch is started first, even though it comes later in the sequence
+    scheduler = Scheduler(sequence, jobs=1, durations=durations)
+    started = [named_task.path for named_task, _ in scheduler.map(lambda _: None)]
+    assert scheduler.priorities[TreePath("bb")] > scheduler.priorities[TreePath("aa")]
+    assert started[0] == TreePath("bb")
+
+
+def test_run_history(conn: ConnectionEnvironment):
+    history = RunHistory(recent=2)
+    assert history.expected_durations(conn.sqlalchemy) == {}
+
+    sequence = TaggedPipeline().build_dag(conn.jinja.base).topological_sort()
+    sequence.run(conn.sqlalchemy, history=history)
+
+    durations = history.expected_durations(conn.sqlalchemy)
+    assert set(durations) == {named_task.path for named_task in sequence.steps}
+    assert all(duration >= 0 for duration in durations.values())
+
+    # Tasks that are already done are not recorded again
+    sequence.run(conn.sqlalchemy, history=history)
+    assert conn.sqlalchemy.execute(
+        sqlalchemy.select(sqlalchemy.func.count()).select_from(history.table)
+    ).scalar_one() == len(sequence.steps)
+
+
+class StatsPipeline(Pipeline):
+    def create_tasks(self):
+        def double(value: int):
+            yield {"value": value, "doubled": value * 2}
+            yield {"value": value, "doubled": value * 2}
+
+        return {
+            "source": CreateTableSql(
+                table=Table("source"),
+                sql=[
+                    "CREATE TABLE {{table}}(value INT)",
+                    "INSERT INTO {{table}} VALUES (1), (2), (3)",
+                ],
+            ),
+            "doubled": MapToNewTable(
+                table=Table("doubled"),
+                columns=[ValueColumn("value", "INT"), ValueColumn("doubled", "INT")],
+                select="SELECT value FROM {{src}}",
+                locals={"src": self.outputof("source")},
+                fn=double,
+            ),
+        }
+
+
+def test_run_history_stats(conn: ConnectionEnvironment):
+    history = RunHistory()
+    sequence = StatsPipeline().build_dag(conn.jinja.base).topological_sort()
+
+    for _ in range(3):
+        sequence.redo(conn.sqlalchemy, history=history)
+
+    runs = history.runs(conn.sqlalchemy, TreePath("doubled"))
+    assert len(runs) == 3
+    assert all(run.rows_read == 3 and run.rows_written == 6 for run in runs)
+    assert all(run.db_time and run.db_time > 0 for run in runs)
+    assert all(run.finished_at >= run.started_at for run in runs)
+
+    (source_run,) = history.runs(conn.sqlalchemy, TreePath("source"), limit=1)
+    assert source_run.rows_read is None
+
+    recent = history.runs(conn.sqlalchemy, per_task=2)
+    assert len(recent) == 4
+    assert [run for run in recent if run.task == TreePath("doubled")] == runs[:2]
+
+    trends = {trend.last.task: trend for trend in history.trends(conn.sqlalchemy)}
+    assert set(trends) == {TreePath("source"), TreePath("doubled")}
+    assert trends[TreePath("doubled")].last == runs[0]
+    assert trends[TreePath("doubled")].median is not None
+
+
+def test_run_profile(conn: ConnectionEnvironment, tmp_path: Path):
+    profiler = TaskProfiler(tmp_path, backend="cprofile")
+    sequence = StatsPipeline().build_dag(conn.jinja.base).topological_sort()
+    sequence.run(conn.sqlalchemy, profiler=profiler)
+
+    stats = pstats.Stats(str(tmp_path / "doubled.pstats"))
+    functions = {function for _, _, function in stats.stats}  # type: ignore
+    assert "double" in functions
+    assert (tmp_path / "source.pstats").exists()
+
+    assert categorize(__file__, "double") == "user"
+    assert categorize(sqlalchemy.__file__, "execute") == "database"
+    assert categorize(ralsei.__file__, "render") == "ralsei"
+
+
+def test_profile_concurrent_warning(
+    conn: ConnectionEnvironment, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    def double(value: int):
+        yield {"doubled": value * 2}
+
+    task = MapToNewTable(
+        table=Table("doubled"),
+        columns=[ValueColumn("doubled", "INT")],
+        select="SELECT 1 AS value",
+        fn=double,
+        workers=2,
+    ).create(conn.jinja.base)
+    assert task.is_concurrent
+
+    profiler = TaskProfiler(tmp_path, backend="cprofile")
+    profiler.check_jobs(2)
+    with profiler.profile("doubled", task.is_concurrent):
+        pass
+
+    output = " ".join(capsys.readouterr().out.split())
+    assert "tasks will run one after another" in output
+    assert "time spent there is missing from the profile" in output
@@ -0,0 +1,112 @@
+import os
+import pytest
+from pathlib import Path
+from ralsei.jinja import SqlAdapter, SqlEnvironment, SqlEnvironmentWrapper, SqlFile
+from ralsei.types import Table, Identifier, ValueColumnRendered, IdColumn
+
+
+def test_template_cache():
+    env = SqlEnvironment()
+    source = "SELECT {{value}}"
+
+    assert env.render(source, value=1) == "SELECT 1"
+    assert env.render(source, value=2) == "SELECT 2"
+    assert env.cache_info().hits == 1
+    assert env.cache_info().misses == 1
+
+    # Templates with different globals don't share the cache entry
+    globals = {"value": 3}
+    assert env.from_string(source, globals).render() == "SELECT 3"
+    assert env.from_string(source, globals).render() == "SELECT 3"
+    assert env.from_string(source).render(value=4) == "SELECT 4"
+    assert env.cache_info().hits == 3
+    assert env.cache_info().currsize == 2
+
+    wrapper = SqlEnvironmentWrapper(env, {"value": 5})
+    assert wrapper.render(source) == "SELECT 5"
+
+    env.cache_clear()
+    assert env.cache_info().currsize == 0
+    assert env.cache_info().hits == 0
+
+
+def test_template_cache_disabled():
+    env = SqlEnvironment(template_cache_size=0)
+
+    assert env.render("SELECT {{value}}", value=1) == "SELECT 1"
+    assert env.render("SELECT {{value}}", value=2) == "SELECT 2"
+    assert env.cache_info().currsize == 0
+
+
+def test_render_primitives():
+    env = SqlEnvironment()
+    column = ValueColumnRendered("html", "TEXT")
+
+    assert env.render("{{table}}", table=Table("pages")) == '"pages"'
+    assert env.render("{{table}}", table=Table("pages", "crawl")) == '"crawl"."pages"'
+    assert env.render("{{name}}", name=Identifier('a"b')) == '"a""b"'
+    assert env.render("{{column.definition}}", column=column) == '"html" TEXT'
+    assert env.render("{{column.set_statement}}", column=column) == '"html" = :html'
+    assert env.render("{{id}}", id=IdColumn("id", 5)) == '"id" = 5'
+
+
+def test_adapter_dispatch_cache():
+    class Base:
+        pass
+
+    class Child(Base):
+        pass
+
+    adapter = SqlAdapter()
+    adapter.register_type(Base, lambda value: "base")
+    assert adapter.to_sql(Child()) == "base"
+
+    # Registering a more specific type invalidates the cached resolution
+    adapter.register_type(Child, lambda value: "child")
+    assert adapter.to_sql(Child()) == "child"
+    assert adapter.to_sql(Base()) == "base"
+
+    with pytest.raises(KeyError):
+        adapter.to_sql(1)
+
+
+def test_template_file(tmp_path: Path):
+    path = tmp_path.joinpath("select.sql")
+    path.write_text("SELECT {{value}}")
+
+    env = SqlEnvironment()
+    with pytest.raises(TypeError):
+        env.render(SqlFile("select.sql"), value=1)
+
+    env.set_template_dirs(tmp_path, bytecode_cache=False)
+    assert env.render(SqlFile("select.sql"), value=1) == "SELECT 1"
+    assert env.render(SqlFile("select.sql"), value=2) == "SELECT 2"
+    assert env.cache_info().hits == 1
+
+    # Modified files are reloaded
+    path.write_text("SELECT {{value}} + 1")
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+    assert env.render(SqlFile("select.sql"), value=1) == "SELECT 1 + 1"
+
+
+def test_wrapper_locals():
+    env = SqlEnvironment()
+    locals = {"table": "locals", "value": 1}
+    wrapper = SqlEnvironmentWrapper(env, locals)
+    source = "SELECT {{value}} FROM {{table}}"
+
+    assert wrapper.render(source) == "SELECT 1 FROM 'locals'"
+    assert wrapper.render(source, value=2) == "SELECT 2 FROM 'locals'"
+    assert env.cache_info().hits == 1
+
+    # Locals are not copied
+    locals["value"] = 3
+    assert wrapper.render(source) == "SELECT 3 FROM 'locals'"
+
+    template = wrapper.from_string(source, {"table": "globals"})
+    assert template.render() == "SELECT 3 FROM 'globals'"
+
+    # Other wrappers get their own template
+    other = SqlEnvironmentWrapper(env, {"table": "other", "value": 4})
+    assert other.render(source) == "SELECT 4 FROM 'other'"
+    assert env.cache_info().misses == 3
@@ -1,12 +1,26 @@
+import asyncio
+import os
+import threading
+import time
+from operator import length_hint
 import pytest
 from ralsei import (
     ConnectionEnvironment,
     Table,
+    View,
+    Pipeline,
     MapToNewColumns,
     ValueColumn,
+    Sql,
     compose_one,
     pop_id_fields,
 )
+from ralsei.task import ROW_CONTEXT_ATRRIBUTE
+from ralsei.db_actions import table_exists, index_exists
+from ralsei.contextmanagers import (
+    reusable_asynccontextmanager_const,
+    reusable_contextmanager_const,
+)
 import sqlalchemy
 
 from tests.db_helper import get_rows
@@ -127,3 +141,731 @@ def test_map_columns_continue(conn: ConnectionEnvironment):
     task.run(conn.sqlalchemy)
     assert task.exists(conn.sqlalchemy)
     assert get_rows(conn, table) == [(2, 4, True), (3, 6, True)]
+
+
+@pytest.mark.parametrize("bulk_update", [False, True])
+def test_map_columns_batched(engine: sqlalchemy.Engine, bulk_update: bool):
+    def failing(val: int):
+        if val < 10:
+            return {"doubled": val * 2}
+        else:
+            raise RuntimeError()
+
+    table = Table("test_map_columns_batched")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES (2),(5),(7),(12);",
+            ],
+            {"table": table},
+        )
+        conn.sqlalchemy.commit()
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} ORDER BY id",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(failing, pop_id_fields("id")),
+            batch_size=2,
+            bulk_update=bulk_update,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+        conn.sqlalchemy.rollback()
+
+        conn.render_execute(
+            "DELETE FROM {{table}} WHERE val >= 10;", {"table": table}
+        )
+        task.run(conn.sqlalchemy)
+        assert get_rows(conn, table, order_by=["id"]) == [
+            (1, 2, 4),
+            (2, 5, 10),
+            (3, 7, 14),
+        ]
+
+
+def test_map_columns_bulk_update_batch_size(conn: ConnectionEnvironment):
+    def double(val: int):
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_bulk_default")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(id INT PRIMARY KEY, val INT);",
+            "INSERT INTO {{table}}(id, val) VALUES (1, 2),(2, 5),(3, 12);",
+        ],
+        {"table": table},
+    )
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}}",
+        columns=[ValueColumn("doubled", "INT")],
+        fn=compose_one(double, pop_id_fields("id")),
+        bulk_update=True,
+    ).create(conn.jinja.base)
+
+    updates: list[str] = []
+
+    def count_updates(conn, cursor, statement: str, *_):
+        if statement.lstrip().startswith("UPDATE"):
+            updates.append(statement)
+
+    sqlalchemy.event.listen(conn.sqlalchemy, "before_cursor_execute", count_updates)
+    try:
+        task.run(conn.sqlalchemy)
+    finally:
+        sqlalchemy.event.remove(
+            conn.sqlalchemy, "before_cursor_execute", count_updates
+        )
+
+    # Without a batch size, bulk updates would be applied one row at a time
+    assert len(updates) == 1
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (1, 2, 4),
+        (2, 5, 10),
+        (3, 12, 24),
+    ]
+
+
+def test_map_columns_streamed(conn: ConnectionEnvironment):
+    def double(val: int):
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_streamed")
+    conn.render_executescript(
+        [
+            """\
+            CREATE TABLE {{table}}(
+                id {{dialect.autoincrement_key}},
+                val INT
+            );""",
+            "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+        ],
+        {"table": table, "values": [Sql(f"({i})") for i in range(20)]},
+    )
+    conn.sqlalchemy.commit()
+
+    rows = conn.execute_with_length_hint(
+        conn.jinja.render_sql("SELECT * FROM {{table}};", table=table), fetch_size=3
+    )
+    assert length_hint(rows) == 20
+    assert len(list(rows)) == 20
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}} ORDER BY id",
+        columns=[ValueColumn("doubled", "INT")],
+        fn=compose_one(double, pop_id_fields("id")),
+        is_done_column="__done",
+        fetch_size=3,
+        commit_every_rows=2,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (i + 1, i, i * 2, True) for i in range(20)
+    ]
+
+
+def test_map_columns_keyset(engine: sqlalchemy.Engine):
+    fail_on = {"val": 10}
+
+    def double(val: int):
+        if val == fail_on["val"]:
+            raise RuntimeError()
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_keyset")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+            ],
+            {"table": table, "values": [Sql(f"({i})") for i in range(20)]},
+        )
+        conn.sqlalchemy.commit()
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(double, pop_id_fields("id")),
+            is_done_column="__done",
+            keyset_size=3,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert not task.exists(conn.sqlalchemy)
+
+        fail_on["val"] = -1
+        task.run(conn.sqlalchemy)
+        assert task.exists(conn.sqlalchemy)
+        assert get_rows(conn, table, order_by=["id"]) == [
+            (i + 1, i, i * 2, True) for i in range(20)
+        ]
+
+
+def test_map_columns_claimed(engine: sqlalchemy.Engine):
+    calls: list[int] = []
+    errors: list[Exception] = []
+    lock = threading.Lock()
+    started = threading.Event()
+
+    def double(val: int):
+        with lock:
+            calls.append(val)
+        started.set()
+        time.sleep(0.005)
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_claimed")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+            ],
+            {"table": table, "values": [Sql(f"({i})") for i in range(30)]},
+        )
+        conn.sqlalchemy.commit()
+
+    def run_worker():
+        try:
+            with ConnectionEnvironment(engine) as conn:
+                task = MapToNewColumns(
+                    table=table,
+                    select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+                    columns=[ValueColumn("doubled", "INT")],
+                    fn=compose_one(double, pop_id_fields("id")),
+                    is_done_column="__done",
+                    claim_size=4,
+                    batch_size=4,
+                ).create(conn.jinja.base)
+                task.run(conn.sqlalchemy)
+        except Exception as err:
+            errors.append(err)
+
+    # The first worker creates the columns, the rest join in once it's running
+    workers = [threading.Thread(target=run_worker) for _ in range(3)]
+    workers[0].start()
+    started.wait(timeout=5)
+    for worker in workers[1:]:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert sorted(calls) == list(range(30))
+    with ConnectionEnvironment(engine) as conn:
+        assert [row[:4] for row in get_rows(conn, table, order_by=["id"])] == [
+            (i + 1, i, i * 2, True) for i in range(30)
+        ]
+
+
+def test_map_columns_marker_table(engine: sqlalchemy.Engine):
+    fail_on = {"val": 5}
+
+    def double(val: int):
+        if val == fail_on["val"]:
+            raise RuntimeError()
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_marker_table")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+            ],
+            {"table": table, "values": [Sql(f"({i})") for i in range(10)]},
+        )
+        conn.sqlalchemy.commit()
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}} ORDER BY id",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(double, pop_id_fields("id")),
+            is_done_table=Table("test_map_columns_markers"),
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert not task.exists(conn.sqlalchemy)
+        assert get_rows(conn, Table("test_map_columns_markers"), order_by=["id"]) == [
+            (i + 1,) for i in range(5)
+        ]
+
+        fail_on["val"] = -1
+        task.run(conn.sqlalchemy)
+        assert task.exists(conn.sqlalchemy)
+        assert get_rows(conn, table, order_by=["id"]) == [
+            (i + 1, i, i * 2) for i in range(10)
+        ]
+
+        task.delete(conn.sqlalchemy)
+        assert not table_exists(conn, Table("test_map_columns_markers"))
+
+
+def test_map_columns_output_table(engine: sqlalchemy.Engine):
+    fail_on = {"val": 5}
+
+    def double(val: int):
+        if val == fail_on["val"]:
+            raise RuntimeError()
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_output_source")
+    output_table = Table("test_map_columns_output")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+            ],
+            {"table": table, "values": [Sql(f"({i})") for i in range(10)]},
+        )
+        conn.sqlalchemy.commit()
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}} ORDER BY id",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(double, pop_id_fields("id")),
+            output_table=output_table,
+        ).create(conn.jinja.base)
+        assert task.output == View("test_map_columns_output_view")
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert not task.exists(conn.sqlalchemy)
+        assert get_rows(conn, output_table, order_by=["id"]) == [
+            (i + 1, i * 2) for i in range(5)
+        ]
+
+        fail_on["val"] = -1
+        task.run(conn.sqlalchemy)
+        assert task.exists(conn.sqlalchemy)
+        assert get_rows(conn, table, order_by=["id"]) == [
+            (i + 1, i) for i in range(10)
+        ]
+        assert get_rows(conn, task.output, order_by=["id"]) == [
+            (i + 1, i, i * 2) for i in range(10)
+        ]
+
+        task.delete(conn.sqlalchemy)
+        assert not table_exists(conn, output_table)
+        assert not table_exists(conn, task.output)
+        assert table_exists(conn, table)
+
+
+def test_map_columns_commit_every(engine: sqlalchemy.Engine):
+    def failing(val: int):
+        if val < 10:
+            return {"doubled": val * 2}
+        else:
+            raise RuntimeError()
+
+    table = Table("test_map_columns_commit_every")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES (2),(5),(7),(12);",
+            ],
+            {"table": table},
+        )
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}} ORDER BY id",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(failing, pop_id_fields("id")),
+            is_done_column="__success",
+            commit_every_rows=2,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert get_rows(conn, table, order_by=["id"]) == [
+            (1, 2, 4, True),
+            (2, 5, 10, True),
+            (3, 7, None, False),
+            (4, 12, None, False),
+        ]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_map_columns_workers(conn: ConnectionEnvironment, ordered: bool):
+    def double(val: int):
+        time.sleep(0.01 * (val % 3))
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_workers")
+    conn.render_executescript(
+        [
+            """\
+            CREATE TABLE {{table}}(
+                id {{dialect.autoincrement_key}},
+                val INT
+            );""",
+            "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+        ],
+        {"table": table, "values": [Sql(f"({i})") for i in range(20)]},
+    )
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+        columns=[ValueColumn("doubled", "INT")],
+        fn=compose_one(double, pop_id_fields("id")),
+        is_done_column="__done",
+        workers=4,
+        ordered=ordered,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (i + 1, i, i * 2, True) for i in range(20)
+    ]
+
+
+def test_map_columns_process(conn: ConnectionEnvironment):
+    @reusable_contextmanager_const
+    def worker_pid():
+        yield os.getpid()
+
+    def double(val: int, pid: int):
+        assert pid == os.getpid()
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_process")
+    conn.render_executescript(
+        [
+            """\
+            CREATE TABLE {{table}}(
+                id {{dialect.autoincrement_key}},
+                val INT
+            );""",
+            "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+        ],
+        {"table": table, "values": [Sql(f"({i})") for i in range(20)]},
+    )
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+        columns=[ValueColumn("doubled", "INT")],
+        fn=compose_one(double, pop_id_fields("id")),
+        context={"pid": worker_pid},
+        is_done_column="__done",
+        workers=2,
+        executor="process",
+        chunk_size=3,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (i + 1, i, i * 2, True) for i in range(20)
+    ]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_map_columns_workers_error(engine: sqlalchemy.Engine, executor: str):
+    def failing(val: int):
+        if val < 10:
+            return {"doubled": val * 2}
+        else:
+            raise RuntimeError()
+
+    table = Table("test_map_columns_workers_error")
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES (2),(5),(12),(7);",
+            ],
+            {"table": table},
+        )
+
+        task = MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}} ORDER BY id",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(failing, pop_id_fields("id")),
+            is_done_column="__success",
+            workers=2,
+            executor=executor,
+            chunk_size=2,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError) as exc_info:
+            task.run(conn.sqlalchemy)
+        assert getattr(exc_info.value, ROW_CONTEXT_ATRRIBUTE) == {"id": 3}
+
+    with ConnectionEnvironment(engine) as conn:
+        assert get_rows(conn, table, order_by=["id"])[:3] == [
+            (1, 2, 4, True),
+            (2, 5, 10, True),
+            (3, 12, None, False),
+        ]
+
+
+def test_map_columns_async(conn: ConnectionEnvironment):
+    @reusable_asynccontextmanager_const
+    async def multiplier():
+        yield 2
+
+    async def double(val: int, multiplier: int):
+        await asyncio.sleep(0.01 * (val % 3))
+        return {"doubled": val * multiplier}
+
+    table = Table("test_map_columns_async")
+    conn.render_executescript(
+        [
+            """\
+            CREATE TABLE {{table}}(
+                id {{dialect.autoincrement_key}},
+                val INT
+            );""",
+            "INSERT INTO {{table}}(val) VALUES {{values | join(', ')}};",
+        ],
+        {"table": table, "values": [Sql(f"({i})") for i in range(20)]},
+    )
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+        columns=[ValueColumn("doubled", "INT")],
+        fn=compose_one(double, pop_id_fields("id")),
+        context={"multiplier": multiplier},
+        is_done_column="__done",
+        workers=10,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (i + 1, i, i * 2, True) for i in range(20)
+    ]
+
+
+def test_map_columns_id_index(conn: ConnectionEnvironment):
+    def double(val: int):
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_id_index")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(id INT, val INT);",
+            "INSERT INTO {{table}}(id, val) VALUES (1, 2),(2, 5),(3, 12);",
+        ],
+        {"table": table},
+    )
+
+    def create_task(index_id_fields: bool):
+        return MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}}",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(double, pop_id_fields("id")),
+            index_id_fields=index_id_fields,
+        ).create(conn.jinja.base)
+
+    unindexed = create_task(False)
+    assert len(unindexed.diagnose(conn.sqlalchemy)) == 1
+
+    task = create_task(True)
+    task.run(conn.sqlalchemy)
+    assert index_exists(conn, table, ["id"])
+    assert task.diagnose(conn.sqlalchemy) == []
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (1, 2, 4),
+        (2, 5, 10),
+        (3, 12, 24),
+    ]
+
+    task.delete(conn.sqlalchemy)
+    assert not index_exists(conn, table, ["id"])
+
+
+def test_map_columns_id_index_new_session(engine: sqlalchemy.Engine):
+    def double(val: int):
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_id_index_session")
+
+    def create_task(conn: ConnectionEnvironment, keep_id_index: bool = True):
+        return MapToNewColumns(
+            table=table,
+            select="SELECT id, val FROM {{table}}",
+            columns=[ValueColumn("doubled", "INT")],
+            fn=compose_one(double, pop_id_fields("id")),
+            keep_id_index=keep_id_index,
+        ).create(conn.jinja.base)
+
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                "CREATE TABLE {{table}}(id INT, val INT);",
+                "INSERT INTO {{table}}(id, val) VALUES (1, 2),(2, 5),(3, 12);",
+            ],
+            {"table": table},
+        )
+        create_task(conn).run(conn.sqlalchemy)
+        conn.sqlalchemy.commit()
+
+    with ConnectionEnvironment(engine) as conn:
+        assert index_exists(conn, table, ["id"])
+        create_task(conn).delete(conn.sqlalchemy)
+        assert not index_exists(conn, table, ["id"])
+
+        # An index that existed before the run is kept by keep_id_index=False
+        conn.render_execute(
+            "CREATE INDEX {{name | identifier}} ON {{table}}(id);",
+            {"table": table, "name": "test_id_idx"},
+        )
+        create_task(conn, keep_id_index=False).run(conn.sqlalchemy)
+        assert index_exists(conn, table, ["id"])
+
+
+def test_map_columns_pending_index(conn: ConnectionEnvironment):
+    def double(val: int):
+        return {"doubled": val * 2}
+
+    table = Table("test_map_columns_pending_index")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(id INT PRIMARY KEY, val INT);",
+            "INSERT INTO {{table}}(id, val) VALUES (1, 2),(2, 5),(3, 12);",
+        ],
+        {"table": table},
+    )
+
+    task = MapToNewColumns(
+        table=table,
+        select="SELECT id, val FROM {{table}} WHERE NOT {{is_done}}",
+        columns=[ValueColumn("doubled", "INT")],
+        is_done_column="__success",
+        pending_index=True,
+        fn=compose_one(double, pop_id_fields("id")),
+    ).create(conn.jinja.base)
+
+    def index_names():
+        return {
+            index["name"]
+            for index in sqlalchemy.inspect(conn.sqlalchemy).get_indexes(table.name)
+        }
+
+    task.run(conn.sqlalchemy)
+    assert "test_map_columns_pending_index____success_idx" in index_names()
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (1, 2, 4, True),
+        (2, 5, 10, True),
+        (3, 12, 24, True),
+    ]
+
+    task.delete(conn.sqlalchemy)
+    assert index_names() == set()
+    assert get_rows(conn, table, order_by=["id"]) == [
+        (1, 2),
+        (2, 5),
+        (3, 12),
+    ]
+
+
+class SideTablePipeline(Pipeline):
+    def __init__(self, parse_output_table: bool) -> None:
+        self.parse_output_table = parse_output_table
+
+    def create_tasks(self):
+        def download(url: str):
+            return {"html": f"<h1>{url}</h1>"}
+
+        def parse(html: str):
+            return {"title": html.removeprefix("<h1>").removesuffix("</h1>")}
+
+        return {
+            "download": MapToNewColumns(
+                table=Table("pages"),
+                select="SELECT id, url FROM {{table}} WHERE NOT {{is_done}}",
+                columns=[ValueColumn("html", "TEXT")],
+                fn=compose_one(download, pop_id_fields("id")),
+                output_table=Table("pages_html"),
+            ),
+            "parse": MapToNewColumns(
+                table=self.outputof("download"),
+                select="SELECT id, html FROM {{table}} WHERE NOT {{is_done}}",
+                columns=[ValueColumn("title", "TEXT")],
+                fn=compose_one(parse, pop_id_fields("id")),
+                output_table=(
+                    Table("pages_title") if self.parse_output_table else None
+                ),
+            ),
+        }
+
+
+def test_map_columns_output_table_chain(conn: ConnectionEnvironment):
+    with pytest.raises(ValueError, match="output_table"):
+        SideTablePipeline(parse_output_table=False).build_dag(conn.jinja.base)
+
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(id INT PRIMARY KEY, url TEXT)",
+            "INSERT INTO {{table}} VALUES (1, 'a'), (2, 'b')",
+        ],
+        {"table": Table("pages")},
+    )
+    conn.sqlalchemy.commit()
+
+    dag = SideTablePipeline(parse_output_table=True).build_dag(conn.jinja.base)
+    dag.topological_sort().run(conn.sqlalchemy)
+
+    assert get_rows(conn, Table("pages_title_view"), order_by=["id"]) == [
+        (1, "a", "<h1>a</h1>", "a"),
+        (2, "b", "<h1>b</h1>", "b"),
+    ]
@@ -1,3 +1,6 @@
+import asyncio
+import multiprocessing
+from datetime import datetime, timedelta
 import pytest
 from ralsei import (
     ConnectionEnvironment,
@@ -9,6 +12,7 @@ from ralsei import (
     pop_id_fields,
 )
 from ralsei.db_actions import table_exists
+from ralsei.task._executor import ProcessRowExecutor, collect_rows
 import sqlalchemy
 
 from tests.db_helper import get_rows
@@ -116,6 +120,21 @@ def test_map_table_resumable(engine: sqlalchemy.Engine):
         assert not table_exists(conn, table)
 
 
+def test_map_table_resumable_requires_id_fields(conn: ConnectionEnvironment):
+    def double(val: int):
+        yield {"doubled": val * 2}
+
+    with pytest.raises(ValueError):
+        MapToNewTable(
+            source_table=Table("source_args"),
+            select="SELECT val FROM {{source}} WHERE NOT {{is_done}}",
+            table=Table("test_map_table_no_id_fields"),
+            columns=[ValueColumn("doubled", "INT")],
+            is_done_column="__success",
+            fn=double,
+        ).create(conn.jinja.base)
+
+
 def test_map_table_continue(conn: ConnectionEnvironment):
     table_source = Table("test_continue_source")
     table_dest = Table("test_continue_dest")
@@ -155,3 +174,460 @@ def test_map_table_continue(conn: ConnectionEnvironment):
     assert task.exists(conn.sqlalchemy)
     assert get_rows(conn, table_source) == [(2, True), (3, True)]
     assert get_rows(conn, table_dest) == [(4,), (6,)]
+
+
+def test_map_table_composite_markers(conn: ConnectionEnvironment):
+    table_source = Table("test_composite_source")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(a INT, b INT, PRIMARY KEY(a, b));",
+            "INSERT INTO {{table}} VALUES {{values | join(', ')}};",
+        ],
+        {
+            "table": table_source,
+            "values": [Sql(f"({a}, {b})") for a in range(3) for b in range(3)],
+        },
+    )
+
+    def multiply(a: int, b: int):
+        yield {"a": a, "b": b, "product": a * b}
+
+    table = Table("test_composite_dest")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT a, b FROM {{source}} WHERE NOT {{is_done}}",
+        table=table,
+        columns=[
+            ValueColumn("a", "INT"),
+            ValueColumn("b", "INT"),
+            ValueColumn("product", "INT"),
+        ],
+        is_done_column="__done",
+        fn=compose(multiply, pop_id_fields("a", "b", keep=True)),
+        batch_size=4,
+        commit_every_rows=4,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table_source, order_by=["a", "b"]) == [
+        (a, b, True) for a in range(3) for b in range(3)
+    ]
+    assert get_rows(conn, table, order_by=["a", "b"]) == [
+        (a, b, a * b) for a in range(3) for b in range(3)
+    ]
+
+
+def test_map_table_batches_with_markers(conn: ConnectionEnvironment):
+    table_source = Table("test_batches_source")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(num INT PRIMARY KEY);",
+            "INSERT INTO {{table}} VALUES {{values | join(', ')}};",
+        ],
+        {"table": table_source, "values": [Sql(f"({i})") for i in range(6)]},
+    )
+
+    def double(num: int):
+        yield {"doubled": num * 2}
+
+    table = Table("test_batches_dest")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT num FROM {{source}} WHERE NOT {{is_done}}",
+        table=table,
+        columns=[ValueColumn("doubled", "INT")],
+        is_done_column="__done",
+        fn=compose(double, pop_id_fields("num", keep=True)),
+        batch_size=3,
+    ).create(conn.jinja.base)
+
+    inserts: list[int] = []
+
+    def count_inserts(conn, cursor, statement: str, parameters, context, executemany):
+        if statement.lstrip().startswith(f'INSERT INTO "{table.name}"'):
+            inserts.append(len(parameters) if executemany else 1)
+
+    sqlalchemy.event.listen(conn.sqlalchemy, "before_cursor_execute", count_inserts)
+    try:
+        task.run(conn.sqlalchemy)
+    finally:
+        sqlalchemy.event.remove(
+            conn.sqlalchemy, "before_cursor_execute", count_inserts
+        )
+
+    assert inserts == [3, 3]
+    assert get_rows(conn, table, order_by=["doubled"]) == [(i * 2,) for i in range(6)]
+
+
+def test_map_table_marker_table(conn: ConnectionEnvironment):
+    table_source = Table("test_marker_table_source")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(num INT PRIMARY KEY);",
+            "INSERT INTO {{table}} VALUES (1), (2), (3);",
+            "CREATE TABLE {{markers}} AS SELECT num FROM {{table}} WHERE num = 1;",
+        ],
+        {"table": table_source, "markers": Table("test_marker_table_done")},
+    )
+
+    def double(num: int):
+        yield {"doubled": num * 2}
+
+    table = Table("test_marker_table_dest")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT num FROM {{source}} WHERE NOT {{is_done}}",
+        table=table,
+        columns=[ValueColumn("doubled", "INT")],
+        is_done_table=Table("test_marker_table_done"),
+        fn=compose(double, pop_id_fields("num", keep=True)),
+        batch_size=2,
+    ).create(conn.jinja.base)
+
+    assert not task.exists(conn.sqlalchemy)
+    task.run(conn.sqlalchemy)
+    assert task.exists(conn.sqlalchemy)
+    assert get_rows(conn, table_source) == [(1,), (2,), (3,)]
+    assert get_rows(conn, table, order_by=["doubled"]) == [(4,), (6,)]
+    assert get_rows(conn, Table("test_marker_table_done"), order_by=["num"]) == [
+        (1,),
+        (2,),
+        (3,),
+    ]
+
+    task.delete(conn.sqlalchemy)
+    assert not table_exists(conn, Table("test_marker_table_done"))
+
+
+def test_map_table_marker_table_remark(conn: ConnectionEnvironment):
+    table_source = Table("test_remark_source")
+    markers = Table("test_remark_done")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(num INT PRIMARY KEY);",
+            "INSERT INTO {{table}} VALUES (1), (2), (3);",
+            "CREATE TABLE {{markers}} AS SELECT num FROM {{table}} WHERE num = 1;",
+        ],
+        {"table": table_source, "markers": markers},
+    )
+
+    def double(num: int):
+        yield {"doubled": num * 2}
+
+    table = Table("test_remark_dest")
+    task = MapToNewTable(
+        source_table=table_source,
+        # Doesn't filter on is_done, so the first row is marked again
+        select="SELECT num FROM {{source}}",
+        table=table,
+        columns=[ValueColumn("doubled", "INT")],
+        is_done_table=markers,
+        fn=compose(double, pop_id_fields("num", keep=True)),
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["doubled"]) == [(2,), (4,), (6,)]
+    assert get_rows(conn, markers, order_by=["num"]) == [(1,), (2,), (3,)]
+
+
+@pytest.mark.parametrize("batch_size", [2, 100])
+def test_map_table_batched(engine: sqlalchemy.Engine, batch_size: int):
+    def failing(val: int):
+        yield {"doubled": val * 2}
+        yield {"doubled": val * 2 + 1}
+        if val >= 10:
+            raise RuntimeError()
+
+    table_source = Table("source_args")
+
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES (2),(5),(12);",
+            ],
+            {"table": table_source},
+        )
+
+        table = Table("test_map_table_batched")
+        task = MapToNewTable(
+            source_table=table_source,
+            select="SELECT id, val FROM {{source}} WHERE NOT {{is_done}} ORDER BY id",
+            table=table,
+            columns=[ValueColumn("doubled", "INT")],
+            is_done_column="__success",
+            fn=compose(failing, pop_id_fields("id")),
+            batch_size=batch_size,
+            commit_every_rows=1,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert get_rows(conn, table, order_by=["doubled"]) == [
+            (4,),
+            (5,),
+            (10,),
+            (11,),
+        ]
+        assert get_rows(conn, table_source, order_by=["id"]) == [
+            (1, 2, True),
+            (2, 5, True),
+            (3, 12, False),
+        ]
+
+
+def test_map_table_commit_every(engine: sqlalchemy.Engine):
+    def failing(val: int):
+        yield {"doubled": val * 2}
+        if val >= 10:
+            raise RuntimeError()
+
+    table_source = Table("source_args")
+
+    with ConnectionEnvironment(engine) as conn:
+        conn.render_executescript(
+            [
+                """\
+                CREATE TABLE {{table}}(
+                    id {{dialect.autoincrement_key}},
+                    val INT
+                );""",
+                "INSERT INTO {{table}}(val) VALUES (2),(5),(7),(12);",
+            ],
+            {"table": table_source},
+        )
+
+        table = Table("test_map_table_commit_every")
+        task = MapToNewTable(
+            source_table=table_source,
+            select="SELECT id, val FROM {{source}} WHERE NOT {{is_done}} ORDER BY id",
+            table=table,
+            columns=[ValueColumn("doubled", "INT")],
+            is_done_column="__success",
+            fn=compose(failing, pop_id_fields("id")),
+            batch_size=10,
+            commit_every_rows=2,
+        ).create(conn.jinja.base)
+
+        with pytest.raises(RuntimeError):
+            task.run(conn.sqlalchemy)
+
+    with ConnectionEnvironment(engine) as conn:
+        assert get_rows(conn, table) == [(4,), (10,)]
+        assert get_rows(conn, table_source, order_by=["id"]) == [
+            (1, 2, True),
+            (2, 5, True),
+            (3, 7, False),
+            (4, 12, False),
+        ]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_map_table_workers(conn: ConnectionEnvironment, ordered: bool):
+    def repeat(val: int):
+        for i in range(val % 3 + 1):
+            yield {"val": val, "i": i}
+
+    table_source = Table("source_args")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(val INT);",
+            "INSERT INTO {{table}} VALUES {{values | join(', ')}};",
+        ],
+        {"table": table_source, "values": [Sql(f"({i})") for i in range(10)]},
+    )
+
+    table = Table("test_map_table_workers")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT val FROM {{source}}",
+        table=table,
+        columns=[ValueColumn("val", "INT"), ValueColumn("i", "INT")],
+        fn=repeat,
+        workers=3,
+        ordered=ordered,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["val", "i"]) == [
+        (val, i) for val in range(10) for i in range(val % 3 + 1)
+    ]
+
+
+def test_map_table_async(conn: ConnectionEnvironment):
+    async def repeat(val: int):
+        for i in range(val % 3 + 1):
+            await asyncio.sleep(0)
+            yield {"i": i}
+
+    table_source = Table("source_args")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(val INT);",
+            "INSERT INTO {{table}} VALUES {{values | join(', ')}};",
+        ],
+        {"table": table_source, "values": [Sql(f"({i})") for i in range(10)]},
+    )
+
+    table = Table("test_map_table_async")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT val FROM {{source}}",
+        table=table,
+        columns=[ValueColumn("val", "INT"), ValueColumn("i", "INT")],
+        fn=compose(repeat, pop_id_fields("val", keep=True)),
+        workers=4,
+        ordered=False,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["val", "i"]) == [
+        (val, i) for val in range(10) for i in range(val % 3 + 1)
+    ]
+
+
+def test_map_table_process(conn: ConnectionEnvironment):
+    def repeat(val: int):
+        for i in range(val % 3 + 1):
+            yield {"val": val, "i": i}
+
+    table_source = Table("source_args")
+    conn.render_executescript(
+        [
+            "CREATE TABLE {{table}}(val INT);",
+            "INSERT INTO {{table}} VALUES {{values | join(', ')}};",
+        ],
+        {"table": table_source, "values": [Sql(f"({i})") for i in range(10)]},
+    )
+
+    table = Table("test_map_table_process")
+    task = MapToNewTable(
+        source_table=table_source,
+        select="SELECT val FROM {{source}}",
+        table=table,
+        columns=[ValueColumn("val", "INT"), ValueColumn("i", "INT")],
+        fn=repeat,
+        workers=2,
+        executor="process",
+        chunk_size=4,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["val", "i"]) == [
+        (val, i) for val in range(10) for i in range(val % 3 + 1)
+    ]
+
+
+@pytest.mark.parametrize("computed", [False, True])
+def test_map_table_copy(conn: ConnectionEnvironment, computed: bool):
+    names = ["plain", 'with "quotes", commas', "", None, "multi\nline"]
+
+    def make_rows():
+        for i, name in enumerate(names):
+            yield {"id": i, "name": name}
+
+    columns = [ValueColumn("id", "INT"), ValueColumn("name", "TEXT")]
+    if computed:
+        columns.append(ValueColumn("tag", "TEXT", Sql("UPPER('copied')")))
+
+    table = Table("test_map_table_copy")
+    task = MapToNewTable(
+        table=table,
+        columns=columns,
+        fn=make_rows,
+        batch_size=2,
+        use_copy=True,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    expected = [(i, name) for i, name in enumerate(names)]
+    if computed:
+        expected = [(*row, "COPIED") for row in expected]
+    assert get_rows(conn, table, order_by=["id"]) == expected
+
+
+def test_map_table_copy_types(conn: ConnectionEnvironment):
+    if conn.sqlalchemy.dialect.name != "postgresql":
+        pytest.skip("Arrays and JSON are only loaded with COPY on Postgres")
+
+    rows = [
+        {
+            "id": 1,
+            "tags": ["plain", 'a "quoted", {braced} \\ value', None, "NULL", ""],
+            "matrix": [[1, 2], [3, None]],
+            "data": {"key": [1, "two"], "quote": '"'},
+            "flag": True,
+            "at": datetime(2024, 1, 2, 3, 4, 5),
+            "took": timedelta(minutes=90),
+        },
+        {
+            "id": 2,
+            "tags": [],
+            "matrix": None,
+            "data": {},
+            "flag": False,
+            "at": None,
+            "took": None,
+        },
+    ]
+
+    def make_rows():
+        yield from rows
+
+    table = Table("test_map_table_copy_types")
+    task = MapToNewTable(
+        table=table,
+        columns=[
+            ValueColumn("id", "INT"),
+            ValueColumn("tags", "TEXT[]"),
+            ValueColumn("matrix", "INT[][]"),
+            ValueColumn("data", "JSONB"),
+            ValueColumn("flag", "BOOLEAN"),
+            ValueColumn("at", "TIMESTAMP"),
+            ValueColumn("took", "INTERVAL"),
+        ],
+        fn=make_rows,
+        use_copy=True,
+    ).create(conn.jinja.base)
+
+    task.run(conn.sqlalchemy)
+    assert get_rows(conn, table, order_by=["id"]) == [
+        tuple(row.values()) for row in rows
+    ]
+
+    with pytest.raises(TypeError):
+        MapToNewTable(
+            table=Table("test_map_table_copy_object"),
+            columns=[ValueColumn("value", "TEXT")],
+            fn=lambda: iter([{"value": object()}]),
+            use_copy=True,
+        ).create(conn.jinja.base).run(conn.sqlalchemy)
+
+
+def repeat_picklable(val: int):
+    for i in range(val % 3 + 1):
+        yield {"val": val, "i": i}
+
+
+def test_process_executor_spawn():
+    executor = ProcessRowExecutor(
+        workers=2, chunk_size=4, mp_context=multiprocessing.get_context("spawn")
+    )
+    with executor.map(
+        collect_rows(repeat_picklable),
+        ({"val": val} for val in range(10)),
+        {},
+        set(),
+    ) as results:
+        rows = [row for _, result in results for row in result()]
+
+    assert rows == [
+        {"val": val, "i": i} for val in range(10) for i in range(val % 3 + 1)
+    ]